@@ -0,0 +1,98 @@
+# apps/accounts/auth_cache.py
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from apps.companies.models import Company
+from .models import User
+
+# JWT autentifikācijas lietotāja kešs: īsu laiku tiek kešots tikai autentifikācijas / atļauju momentuzņēmums
+# (AUTH_SNAPSHOT_FIELDS - bez paroles, slepenās atbildes u.c. personas datiem),
+# atslēga = lietotāja ID + "autentifikācijas versija" + tokena jti. Bloķēšana, dzēšana, lomas / uzņēmuma maiņa
+# (jebkura User saglabāšana) un uzņēmuma bloķēšana / dzēšana nomaina versiju (sk. signals.py), tāpēc vecie
+# ieraksti vairs netiek nolasīti un paši izkrīt pēc TTL.
+# Kešs: settings.AUTH_USER_CACHE_ALIAS (LocMem = procesa lokāls; Redis = kopīgs visiem procesiem).
+
+# Lauki, ko lasa autentifikācija un atļaujas; pārējie kešotā lietotāja lauki ir atlikti (ielādē no DB pēc pieprasījuma)
+AUTH_SNAPSHOT_FIELDS = ("id", "role", "company_id", "is_blocked", "is_active", "deleted_at", "token_epoch")
+COMPANY_SNAPSHOT_FIELDS = ("id", "is_active", "is_blocked", "deleted_at", "time_zone")
+
+def _cache():
+    return caches[getattr(settings, "AUTH_USER_CACHE_ALIAS", "default")]
+
+def _ttl() -> int:
+    return getattr(settings, "AUTH_USER_CACHE_TTL", 60)
+
+def _version_key(user_id) -> str:
+    return f"auth:version:{user_id}"
+
+def _user_key(user_id, version: str, token_id: str) -> str:
+    return f"auth:user:{user_id}:{version}:{token_id}"
+
+def _get_version(cache, user_id) -> str:
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex[:12]
+        if not cache.add(key, version, None):
+            version = cache.get(key) or version
+    return version
+
+def _snapshot(user: User) -> tuple:
+    company = user.company if user.company_id else None
+    return (
+        tuple(getattr(user, f) for f in AUTH_SNAPSHOT_FIELDS),
+        tuple(getattr(company, f) for f in COMPANY_SNAPSHOT_FIELDS) if company is not None else None,
+    )
+
+def _from_values(model, field_names: tuple, values: tuple):
+    # from_db sagaida vērtības modeļa lauku secībā
+    by_name = dict(zip(field_names, values))
+    names = [f.attname for f in model._meta.concrete_fields if f.attname in by_name]
+    return model.from_db(model.objects.db, names, [by_name[n] for n in names])
+
+def _from_snapshot(snapshot: tuple) -> User:
+    # Kā ar only(): from_db saglabā ielādēto stāvokli (_loaded_auth_state), save() bez update_fields raksta tikai
+    # momentuzņēmuma laukus - tāpēc rakstīšanai jāielādē svaiga instance
+    user_values, company_values = snapshot
+    user = _from_values(User, AUTH_SNAPSHOT_FIELDS, user_values)
+    if company_values is not None:
+        company = _from_values(Company, COMPANY_SNAPSHOT_FIELDS, company_values)
+        User._meta.get_field("company").set_cached_value(user, company)
+    return user
+
+def get_auth_user(user_id, validated_token, loader):
+    """
+    Atgriež lietotāju no kešotā momentuzņēmuma vai ielādē to ar loader() un saglabā momentuzņēmumu
+    (ne ilgāk par tokena derīgumu). loader() var izmest AuthenticationFailed - tad nekas netiek kešots.
+    """
+    ttl = _ttl()
+    if ttl <= 0:
+        return loader()
+    cache = _cache()
+    version = _get_version(cache, user_id)
+    key = _user_key(user_id, version, validated_token.get("jti", ""))
+    snapshot = cache.get(key)
+    if snapshot is not None:
+        return _from_snapshot(snapshot)
+    user = loader()
+    exp = validated_token.get("exp")
+    timeout = min(ttl, int(exp - time.time())) if exp else ttl
+    if timeout > 0:
+        cache.set(key, _snapshot(user), timeout)
+    return user
+
+def invalidate_auth_users(user_ids):
+    """
+    Nomaina lietotāju autentifikācijas versiju pēc transakcijas commit
+    (paralēls pieprasījums nepaspēj nokešot vēl neapstiprinātus datus ar jauno versiju).
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    transaction.on_commit(
+        lambda: _cache().set_many({_version_key(uid): uuid.uuid4().hex[:12] for uid in user_ids}, None)
+    )
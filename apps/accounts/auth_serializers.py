@@ -1,6 +1,7 @@
 from django.contrib.auth import authenticate
 from rest_framework import serializers
 from apps.accounts.models import User
+from .throttling import hash_slot
 
 
 class EmailTokenObtainPairSerializer(serializers.Serializer):
@@ -24,7 +25,8 @@ class EmailTokenObtainPairSerializer(serializers.Serializer):
             raise serializers.ValidationError({"detail": "Lietotāja profils ir bloķēts."})
 
         # 3) Pārbauda paroles atbilstību
-        authed = authenticate(username=user.username, password=password)
+        with hash_slot():
+            authed = authenticate(username=user.username, password=password)
         if not authed:
             raise serializers.ValidationError({"detail": "Nepareiza parole."})
 
@@ -11,6 +11,8 @@ from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from .auth_serializers import EmailTokenObtainPairSerializer
+from .throttling import AuthRateThrottle
+from .tokens import AuthRefreshToken
 
 ACCESS_COOKIE = "access_token"
 REFRESH_COOKIE = "refresh_token"
@@ -28,7 +30,10 @@ def clear_jwt_cookies(response: Response):
     response.delete_cookie(REFRESH_COOKIE, samesite="Lax")
 
 class EmailLoginView(APIView):
+    # Vecs (atsaukts) access cookie netiek pārbaudīts
+    authentication_classes = []
     permission_classes = [AllowAny]
+    throttle_classes = [AuthRateThrottle]
 
     def post(self, request):
         # Autentifikacija ar e-pastu (USER_002)
@@ -36,7 +41,7 @@ class EmailLoginView(APIView):
         s.is_valid(raise_exception=True)
 
         user = s.validated_data["user"]
-        refresh = RefreshToken.for_user(user)
+        refresh = AuthRefreshToken.for_user(user)
         payload = {"detail": "Pierakstīšanās notika veiksmīgi.", "requires_company_creation": False, "requires_profile_completion": False}
         if user.role == "company_admin" and not user.company_id:
             payload["requires_company_creation"] = True
@@ -47,6 +52,8 @@ class EmailLoginView(APIView):
         return resp
 
 class RefreshCookieView(APIView):
+    # Bez access tokena pārbaudes: atsaukts / beidzies access cookie nedrīkst bloķēt jauna tokena saņemšanu
+    authentication_classes = []
     permission_classes = [AllowAny]
 
     def post(self, request):
@@ -54,18 +61,19 @@ class RefreshCookieView(APIView):
         if not refresh_token:
             return Response({"detail": "Refresh tokens nav atrasts."}, status=status.HTTP_401_UNAUTHORIZED)
         try:
-            refresh = RefreshToken(refresh_token)
+            refresh = AuthRefreshToken(refresh_token)
         except TokenError:
             return Response({"detail": "Refresh tokens nav derīgs."}, status=status.HTTP_401_UNAUTHORIZED)
 
         user_id = refresh.payload.get("user_id")
-        user = get_user_model().objects.filter(id=user_id, is_active=True).first()
+        user = get_user_model().objects.select_related("company").filter(id=user_id, is_active=True).first()
         if not user or getattr(user, "deleted_at", None) is not None or getattr(user, "is_blocked", False):
             resp = Response({"detail": "Lietotājs nav aktīvs."}, status=status.HTTP_401_UNAUTHORIZED)
             clear_jwt_cookies(resp)
             return resp
 
-        new_refresh = RefreshToken.for_user(user)
+        # Jauns tokens ar aktuālajiem claims (loma, uzņēmums, epoha) no DB
+        new_refresh = AuthRefreshToken.for_user(user)
         resp = Response(status=status.HTTP_200_OK)
         set_jwt_cookies(resp, new_refresh)
         return resp
@@ -77,7 +85,7 @@ class LogoutCookieView(APIView):
         token_str = request.COOKIES.get(REFRESH_COOKIE) or request.data.get("refresh")
         if token_str:
             try:
-                token = RefreshToken(token_str)
+                token = AuthRefreshToken(token_str)
                 token.blacklist()
             except TokenError:
                 pass
@@ -1,7 +1,12 @@
 # apps/accounts/authentication.py
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework.exceptions import AuthenticationFailed
 
+from .auth_cache import get_auth_user
+from .tokens import ClaimsUser, has_claims, is_revoked
+
 ACCESS_COOKIE = "access_token"
 
 class StrictJWTAuthentication(JWTAuthentication):
@@ -17,8 +22,21 @@ class StrictJWTAuthentication(JWTAuthentication):
         validated_token = self.get_validated_token(raw_token)
         return self.get_user(validated_token), validated_token
 
+    def _load_user(self, user_id):
+        # Lietotājs kopā ar uzņēmumu vienā vaicājumā (atļaujas pārbauda user.company)
+        user = self.user_model.objects.select_related("company").filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        return user
+
     def get_user(self, validated_token):
-        user = super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        # Īslaicīgs kešs (sk. auth_cache.py); pārbaudes tiek veiktas arī kešotajam lietotājam
+        user = get_auth_user(user_id, validated_token, lambda: self._load_user(user_id))
 
         if getattr(user, "is_blocked", False):
             raise AuthenticationFailed("Lietotājs ir bloķēts.")
@@ -26,4 +44,19 @@ class StrictJWTAuthentication(JWTAuthentication):
         if getattr(user, "deleted_at", None) is not None or not user.is_active:
             raise AuthenticationFailed("Lietotājs ir dzēsts vai neaktīvs.")
 
+        if is_revoked(validated_token, user.token_epoch):
+            raise AuthenticationFailed("Tokens ir atsaukts.", code="token_revoked")
+
         return user
+
+class ClaimsJWTAuthentication(StrictJWTAuthentication):
+    # Lasīšanas skatiem: request.user = ClaimsUser no tokena claims, bez User / Company vaicājumiem.
+    # Atsaukumu pārbauda pēc keša atsaukumu kopas (sk. tokens.py); veci tokeni bez claims - kā StrictJWTAuthentication.
+    def get_user(self, validated_token):
+        if not has_claims(validated_token):
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        if is_revoked(validated_token):
+            raise AuthenticationFailed("Tokens ir atsaukts.", code="token_revoked")
+        return ClaimsUser(validated_token)
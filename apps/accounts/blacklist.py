@@ -0,0 +1,154 @@
+# apps/accounts/blacklist.py
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+# Refresh tokenu melnā saraksta pārbaude bez DB vaicājuma katram refresh:
+# procesa Bloom filtrs ar neiztecējušo atsaukto tokenu JTI. Filtrs nekad nedod kļūdaini negatīvu atbildi
+# tokeniem, kas tajā ielikti, tāpēc "nav filtrā" = nav atsaukts; "ir filtrā" tiek pārbaudīts DB (kļūdaini pozitīvie).
+# Citu procesu atsaukumi tiek ielasīti inkrementāli (BlacklistedToken.id > pēdējais redzētais) ne retāk kā ik
+# BLACKLIST_FILTER_SYNC_SECONDS; filtrs tiek pārbūvēts no jauna ik BLACKLIST_FILTER_REBUILD_SECONDS
+# (izkrīt iztecējušie tokeni). Pārbūve notiek bez procesa slēdzenes (citi pieprasījumi pa to laiku lieto veco filtru),
+# gatavais filtrs tiek nomainīts zem slēdzenes.
+
+# Ielasot no jauna, pārklājas pēdējie N ID: paralēlas transakcijas var apstiprināt mazāku ID vēlāk par lielāku
+SYNC_OVERLAP_IDS = 100
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Dubultā jaukšana: k pozīcijas no viena 128 bitu blake2b
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+class RevokedTokenFilter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._bloom: BloomFilter | None = None
+        self._last_id = 0
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._rebuilding = False
+        # Šajā procesā atsauktie JTI pārbūves laikā - tiek pielikti jaunajam filtram
+        self._added: list[str] = []
+
+    def _build(self) -> tuple[BloomFilter, int]:
+        # Bez slēdzenes: var ielasīt ļoti daudz rindu
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).values_list("id", "token__jti")
+        jtis = []
+        last_id = 0
+        for pk, jti in rows.order_by().iterator(chunk_size=10000):
+            jtis.append(jti)
+            last_id = max(last_id, pk)
+        # Rezerve jauniem atsaukumiem līdz nākamajai pārbūvei
+        bloom = BloomFilter(max(len(jtis) * 2, getattr(settings, "BLACKLIST_FILTER_MIN_CAPACITY", 10000)))
+        for jti in jtis:
+            bloom.add(jti)
+        return bloom, last_id
+
+    def _rebuild(self, now: float):
+        try:
+            bloom, last_id = self._build()
+        except BaseException:
+            with self._lock:
+                self._rebuilding = False
+                self._added = []
+            raise
+        with self._lock:
+            for jti in self._added:
+                bloom.add(jti)
+            self._bloom, self._last_id, self._built_at = bloom, last_id, now
+            self._rebuilding = False
+            self._added = []
+            # Atsaukumi, kas apstiprināti būves laikā (vecajā filtrā jau sinhronizēti)
+            self._sync(now)
+
+    def _sync(self, now: float):
+        rows = (
+            BlacklistedToken.objects.filter(id__gt=self._last_id - SYNC_OVERLAP_IDS)
+            .order_by("id")
+            .values_list("id", "token__jti")
+        )
+        for pk, jti in rows:
+            if jti not in self._bloom:
+                self._bloom.add(jti)
+            self._last_id = max(self._last_id, pk)
+        self._synced_at = now
+
+    def might_be_revoked(self, jti: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            rebuild = not self._rebuilding and (
+                self._bloom is None
+                or now - self._built_at >= getattr(settings, "BLACKLIST_FILTER_REBUILD_SECONDS", 3600)
+                or self._bloom.count > self._bloom.capacity
+            )
+            if rebuild:
+                self._rebuilding = True
+            else:
+                if self._bloom is None:
+                    # Pirmā būve notiek citā pavedienā - pārbauda DB
+                    return True
+                if now - self._synced_at >= getattr(settings, "BLACKLIST_FILTER_SYNC_SECONDS", 2):
+                    self._sync(now)
+                return jti in self._bloom
+        self._rebuild(now)
+        with self._lock:
+            return jti in self._bloom
+
+    def add(self, jti: str):
+        # Atsaukts šajā procesā - redzams uzreiz (citiem procesiem - pēc sinhronizācijas)
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+            if self._rebuilding:
+                self._added.append(jti)
+
+revoked_tokens = RevokedTokenFilter()
+
+def is_blacklisted(jti: str) -> bool:
+    # DB pārbaude tikai tad, ja filtrs JTI var saturēt
+    return revoked_tokens.might_be_revoked(jti) and BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+def prune_expired_tokens(batch_size: int = 1000) -> tuple[int, int]:
+    """
+    Dzēš iztecējušos refresh tokenus porcijās (expires_at indekss); melnā saraksta ieraksti tiek dzēsti kaskādē.
+    Atgriež (izdzēsti OutstandingToken, izdzēsti BlacklistedToken).
+    """
+    outstanding = blacklisted = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+            .order_by()
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return outstanding, blacklisted
+        _, per_model = OutstandingToken.objects.filter(id__in=ids).delete()
+        outstanding += per_model.get(OutstandingToken._meta.label, 0)
+        blacklisted += per_model.get(BlacklistedToken._meta.label, 0)
@@ -0,0 +1,14 @@
+# apps/accounts/management/commands/prune_refresh_tokens.py
+from django.core.management.base import BaseCommand
+
+from apps.accounts.blacklist import prune_expired_tokens
+
+class Command(BaseCommand):
+    help = "Dzēš iztecējušos refresh tokenus (OutstandingToken + BlacklistedToken) porcijās. Palaist periodiski (cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        outstanding, blacklisted = prune_expired_tokens(batch_size=options["batch_size"])
+        self.stdout.write(f"Izdzēsti tokeni: {outstanding} (no tiem melnajā sarakstā: {blacklisted})")
@@ -0,0 +1,23 @@
+# Indekss simplejwt OutstandingToken.expires_at (trešās puses modelis, tāpēc RunSQL):
+# iztecējušo tokenu dzēšana porcijās (prune_refresh_tokens) un atsaukto JTI filtra pārbūve.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY nedrīkst būt transakcijā (lielas tabulas netiek bloķētas rakstīšanai)
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0006_user_token_epoch'),
+        ('token_blacklist', '0013_alter_blacklistedtoken_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "token_outstanding_expires_at_idx" '
+                'ON "token_blacklist_outstandingtoken" ("expires_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "token_outstanding_expires_at_idx";',
+        ),
+    ]
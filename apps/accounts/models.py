@@ -55,6 +55,36 @@ class User(AbstractUser):
     secret_answer = models.CharField(max_length=255, blank=True, default="")
     profile_completed = models.BooleanField(default=False)
 
+    # Access tokenu "epoha": tiek palielināta, kad mainās kāds no AUTH_STATE_FIELDS (vai uzņēmuma statuss);
+    # tokeni ar mazāku epohu ir atsaukti (sk. tokens.py)
+    token_epoch = models.PositiveIntegerField(default=0)
+
+    # Lauki, kas ir ietverti access tokena claims / nosaka piekļuvi
+    AUTH_STATE_FIELDS = ("role", "company_id", "is_blocked", "is_active", "deleted_at")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Atceramies ielādēto stāvokli, lai pēc save() zinātu, vai tokeni jāatsauc
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_auth_state = instance.auth_state()
+        return instance
+
+    def auth_state(self) -> tuple:
+        return tuple(self.__dict__.get(f) for f in self.AUTH_STATE_FIELDS)
+
+    def save(self, *args, **kwargs):
+        # token_epoch maina tikai revoke_user_tokens (atomārs UPDATE). Pilns save() no agrāk ielādētas instances
+        # to pārrakstītu ar veco vērtību un atsauktie tokeni atkal derētu - tāpēc tas tiek rakstīts tikai,
+        # ja norādīts update_fields
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                f.name
+                for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != "token_epoch" and f.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
     def soft_delete(self):
         self.deleted_at = timezone.now()
         self.is_active = False
@@ -8,9 +8,11 @@ from rest_framework.permissions import AllowAny
 
 from .serializers import PasswordResetRequestSerializer, PasswordResetConfirmSerializer
 from .password_reset import token_generator
+from .throttling import AuthRateThrottle, hash_slot
 
 class PasswordResetRequestView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [AuthRateThrottle]
 
     def post(self, request):
         s = PasswordResetRequestSerializer(data=request.data)
@@ -34,13 +36,16 @@ class PasswordResetRequestView(APIView):
 
 class PasswordResetConfirmView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [AuthRateThrottle]
+    rate_limit_field = "uid"
 
     def post(self, request):
         s = PasswordResetConfirmSerializer(data=request.data)
         s.is_valid(raise_exception=True)
 
         user = s.validated_data["user"]
-        user.set_password(s.validated_data["new_password"])
+        with hash_slot():
+            user.set_password(s.validated_data["new_password"])
         user.save(update_fields=["password"])
 
         return Response({"code": "P_013", "detail": "Parole ir veiksmīgi atiestatīta."}, status=status.HTTP_200_OK)
@@ -6,6 +6,7 @@ from rest_framework import serializers
 
 from apps.accounts.models import User, SecretQuestion
 from .password_reset import token_generator
+from .throttling import hash_slot
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -51,8 +52,9 @@ class RegisterSerializer(serializers.ModelSerializer):
 
         user = User(**validated_data)
         user.is_active = True
-        user.set_password(password)
-        user.secret_answer = make_password(secret_answer)
+        with hash_slot():
+            user.set_password(password)
+            user.secret_answer = make_password(secret_answer)
         user.profile_completed = True  # kad slepenais jautājums un atbilde ir iestatīti
         user.save()
 
@@ -223,7 +225,9 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         if not token_generator.check_token(user, token):
             raise serializers.ValidationError({"detail": "Nederīgs vai beidzies tokens."})
 
-        if not check_password(answer, user.secret_answer):
+        with hash_slot():
+            answer_ok = check_password(answer, user.secret_answer)
+        if not answer_ok:
             raise serializers.ValidationError({"detail": "Slepenā atbilde ir nepareiza."})
 
         validate_password(new_password)
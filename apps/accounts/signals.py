@@ -0,0 +1,40 @@
+# apps/accounts/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.companies.models import Company
+from .auth_cache import invalidate_auth_users
+from .models import User
+from .tokens import publish_epochs, revoke_user_tokens
+
+def _auth_state_changed(instance, created: bool) -> bool:
+    old_state = getattr(instance, "_loaded_auth_state", None)
+    instance._loaded_auth_state = instance.auth_state()
+    return not created and old_state is not None and old_state != instance._loaded_auth_state
+
+@receiver(post_save, sender=User)
+def _user_saved(sender, instance, created, **kwargs):
+    # Bloķēšana, dzēšana, loma, uzņēmums -> izsniegtie access tokeni (claims) vairs nav derīgi
+    if _auth_state_changed(instance, created):
+        epochs = revoke_user_tokens([instance.pk])
+        # Instancē - jaunā epoha (tokeni, kas tiks izsniegti no šīs instances, piem., AuthRefreshToken.for_user)
+        instance.token_epoch = epochs.get(instance.pk, instance.token_epoch)
+    # Jebkura maiņa -> kešotais autentifikācijas lietotājs vairs nav derīgs
+    invalidate_auth_users([instance.pk])
+
+@receiver(post_delete, sender=User)
+def _user_deleted(sender, instance, **kwargs):
+    # DB rindas vairs nav - atsaucam tikai keša kopā
+    publish_epochs({instance.pk: instance.token_epoch + 1})
+    invalidate_auth_users([instance.pk])
+
+@receiver(post_save, sender=Company)
+def _company_saved(sender, instance, created, **kwargs):
+    changed = _auth_state_changed(instance, created)
+    if created:
+        return
+    user_ids = list(User.objects.all_with_deleted().filter(company_id=instance.pk).values_list("id", flat=True))
+    # Uzņēmuma bloķēšana / deaktivizācija / soft-delete maina tā lietotāju company_active claim
+    if changed:
+        revoke_user_tokens(user_ids)
+    invalidate_auth_users(user_ids)
@@ -0,0 +1,157 @@
+# apps/accounts/throttling.py
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.throttling import BaseThrottle
+
+# Autentifikācijas galapunktu aizsardzība (pieteikšanās, reģistrācija, paroles atiestatīšana):
+#  - token bucket pa IP un pa identitāti (e-pasts / uid) -> 429 ar Retry-After, pirms tiek rēķināts paroles hash;
+#  - paroles hash (PBKDF2) aprēķinu skaits procesā ir ierobežots (hash_slot); ja brīva vieta neatbrīvojas
+#    AUTH_HASH_WAIT_SECONDS laikā, pieprasījums tiek noraidīts ar 503, nevis aizņem vēl vienu CPU.
+# Spaiņu glabātuve maināma ar settings.AUTH_RATE_LIMIT_STORE: MemoryRateLimitStore (procesā) vai
+# CacheRateLimitStore (Django kešs; Redis - kopīgi limiti visiem procesiem).
+
+def _take(tokens: float, updated: float, now: float, capacity: int, per_second: float) -> tuple[float, float]:
+    # Atgriež (atlikušie žetoni, gaidīšana sekundēs; 0 = atļauts)
+    tokens = min(capacity, tokens + max(0.0, now - updated) * per_second)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / per_second
+
+class RateLimitStore(ABC):
+    @abstractmethod
+    def consume(self, key: str, capacity: int, per_second: float) -> float:
+        # Paņem vienu žetonu; atgriež gaidīšanu sekundēs (0 = atļauts)
+        ...
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Procesa lokāli spaiņi; vecākie (LRU) tiek izmesti - pēc ilgākas neaktivitātes spainis tāpat būtu pilns.
+    Katram atslēgas veidam (prefikss līdz ":" - ip / id) savs LRU, lai daudz dažādu IP nevarētu izspiest
+    (un tā atiestatīt) identitātes spaiņus.
+    """
+
+    def __init__(self, max_keys: int | None = None):
+        self._buckets: dict[str, OrderedDict[str, tuple[float, float]]] = {}
+        self._lock = threading.Lock()
+        self._max_keys = max_keys or getattr(settings, "AUTH_RATE_LIMIT_MAX_KEYS", 100000)
+
+    def consume(self, key: str, capacity: int, per_second: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            buckets = self._buckets.setdefault(key.partition(":")[0], OrderedDict())
+            tokens, updated = buckets.pop(key, (capacity, now))
+            tokens, wait = _take(tokens, updated, now, capacity, per_second)
+            buckets[key] = (tokens, now)
+            while len(buckets) > self._max_keys:
+                buckets.popitem(last=False)
+        return wait
+
+class CacheRateLimitStore(RateLimitStore):
+    """
+    Spaiņi Django kešā (AUTH_RATE_LIMIT_CACHE_ALIAS). Lasīšana + rakstīšana nav atomāra - paralēli pieprasījumi
+    var paņemt par dažiem žetoniem vairāk; ierobežojuma mērķim (CPU aizsardzība) tas ir pieņemami.
+    """
+
+    def __init__(self, alias: str | None = None):
+        self._cache = caches[alias or getattr(settings, "AUTH_RATE_LIMIT_CACHE_ALIAS", "default")]
+
+    def consume(self, key: str, capacity: int, per_second: float) -> float:
+        now = time.time()
+        cache_key = f"ratelimit:{key}"
+        tokens, updated = self._cache.get(cache_key) or (capacity, now)
+        tokens, wait = _take(tokens, updated, now, capacity, per_second)
+        # Pēc tam, kad spainis būtu pilns, ieraksts vairs nav vajadzīgs
+        self._cache.set(cache_key, (tokens, now), int(capacity / per_second) + 1)
+        return wait
+
+_store: RateLimitStore | None = None
+_store_lock = threading.Lock()
+
+def get_rate_limit_store() -> RateLimitStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(
+                    getattr(settings, "AUTH_RATE_LIMIT_STORE", "apps.accounts.throttling.MemoryRateLimitStore")
+                )()
+    return _store
+
+class AuthRateThrottle(BaseThrottle):
+    """
+    Divi spaiņi: pa klienta IP un pa identitāti no pieprasījuma datiem (view.rate_limit_field, noklusējums "email"),
+    lai viena konta minēšana no daudzām IP arī tiktu ierobežota.
+    """
+
+    def allow_request(self, request, view):
+        store = get_rate_limit_store()
+        ip_wait = store.consume(
+            f"ip:{self.get_ident(request)}",
+            settings.AUTH_RATE_IP_BURST,
+            settings.AUTH_RATE_IP_PER_MINUTE / 60,
+        )
+        identity_wait = 0.0
+        identity = self._identity(request, view)
+        if identity:
+            identity_wait = store.consume(
+                f"id:{identity}",
+                settings.AUTH_RATE_IDENTITY_BURST,
+                settings.AUTH_RATE_IDENTITY_PER_MINUTE / 60,
+            )
+        self._wait = max(ip_wait, identity_wait)
+        return self._wait == 0
+
+    def _identity(self, request, view) -> str | None:
+        field = getattr(view, "rate_limit_field", "email")
+        value = request.data.get(field) if hasattr(request.data, "get") else None
+        if not isinstance(value, str) or not value.strip():
+            return None
+        return hashlib.sha256(value.strip().lower().encode()).hexdigest()[:32]
+
+    def wait(self):
+        return self._wait
+
+class AuthOverloaded(APIException):
+    # Visas paroles hash vietas aizņemtas ilgāk par AUTH_HASH_WAIT_SECONDS
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Serveris šobrīd ir noslogots. Lūdzu, mēģiniet vēlreiz pēc brīža."
+    default_code = "auth_overloaded"
+
+    def __init__(self, wait: int = 1):
+        super().__init__()
+        # DRF exception handler pievieno Retry-After galveni
+        self.wait = wait
+
+_hash_semaphore: threading.BoundedSemaphore | None = None
+_hash_lock = threading.Lock()
+
+def _get_hash_semaphore() -> threading.BoundedSemaphore:
+    global _hash_semaphore
+    if _hash_semaphore is None:
+        with _hash_lock:
+            if _hash_semaphore is None:
+                _hash_semaphore = threading.BoundedSemaphore(getattr(settings, "AUTH_MAX_CONCURRENT_HASHES", 2))
+    return _hash_semaphore
+
+@contextmanager
+def hash_slot():
+    # Ierobežo paralēlos paroles hash aprēķinus procesā (authenticate / check_password / set_password)
+    semaphore = _get_hash_semaphore()
+    if not semaphore.acquire(timeout=getattr(settings, "AUTH_HASH_WAIT_SECONDS", 2)):
+        raise AuthOverloaded()
+    try:
+        yield
+    finally:
+        semaphore.release()
@@ -0,0 +1,113 @@
+# apps/accounts/tokens.py
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .blacklist import is_blacklisted, revoked_tokens
+from .models import User
+
+# Pašpietiekami access tokeni: role, uzņēmums, uzņēmuma statuss un tokena epoha ir claims, tāpēc lasīšanas
+# skati (ClaimsJWTAuthentication) var pārbaudīt atļaujas bez User / Company vaicājumiem.
+# Atsaukšana: lietotāja piekļuves stāvokļa (bloķēšana, dzēšana, loma, uzņēmums) vai uzņēmuma statusa maiņa
+# palielina User.token_epoch un ieraksta jauno epohu kešā (AUTH_USER_CACHE_ALIAS) uz access tokena mūžu.
+# Tokens ar mazāku epohu tiek noraidīts (401) - frontends to atjauno ar refresh, kas ielasa lietotāju no DB.
+# Vairākiem procesiem kešam jābūt kopīgam (Redis), citādi atsaukums redzams tikai procesā, kurā tas notika.
+
+CLAIM_ROLE = "role"
+CLAIM_COMPANY = "company_id"
+CLAIM_COMPANY_ACTIVE = "company_active"
+CLAIM_EPOCH = "epoch"
+
+def _cache():
+    return caches[getattr(settings, "AUTH_USER_CACHE_ALIAS", "default")]
+
+def _epoch_key(user_id) -> str:
+    return f"auth:epoch:{user_id}"
+
+def _company_active(user: User) -> bool:
+    company = user.company if user.company_id else None
+    return bool(company and company.deleted_at is None and company.is_active and not company.is_blocked)
+
+class AuthRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user: User):
+        # Claims tiek nokopēti arī uz access tokenu (refresh.access_token)
+        token = super().for_user(user)
+        token[CLAIM_ROLE] = user.role
+        token[CLAIM_COMPANY] = user.company_id
+        token[CLAIM_COMPANY_ACTIVE] = _company_active(user)
+        token[CLAIM_EPOCH] = user.token_epoch
+        return token
+
+    def check_blacklist(self):
+        # Melnā saraksta pārbaude caur atsaukto JTI filtru (sk. blacklist.py)
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        revoked_tokens.add(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+class ClaimsUser(TokenUser):
+    """
+    Lietotājs tikai no access tokena claims (bez DB). Der skatiem, kas izmanto role / company_id,
+    nevis User modeļa instanci (piem., filter(user=...)).
+    """
+
+    is_blocked = False
+    deleted_at = None
+
+    @cached_property
+    def role(self) -> str:
+        return self.token.get(CLAIM_ROLE, "")
+
+    @cached_property
+    def company_id(self) -> int | None:
+        return self.token.get(CLAIM_COMPANY)
+
+    @cached_property
+    def company_active(self) -> bool:
+        return bool(self.token.get(CLAIM_COMPANY_ACTIVE))
+
+def has_claims(validated_token) -> bool:
+    # Tokeniem, kas izsniegti pirms claims ieviešanas, lietotājs jāielādē no DB
+    return CLAIM_EPOCH in validated_token
+
+def is_revoked(validated_token, current_epoch: int | None = None) -> bool:
+    """
+    Vai tokena epoha ir mazāka par pašreizējo. current_epoch - no DB (ja lietotājs jau ielādēts),
+    citādi no keša atsaukumu kopas (nav ieraksta = nav atsaukts).
+    """
+    epoch = validated_token.get(CLAIM_EPOCH)
+    if epoch is None:
+        return False
+    if current_epoch is None:
+        current_epoch = _cache().get(_epoch_key(validated_token[api_settings.USER_ID_CLAIM]))
+    return current_epoch is not None and epoch < current_epoch
+
+def revoke_user_tokens(user_ids) -> dict[int, int]:
+    """
+    Palielina lietotāju token_epoch un pēc commit ieraksta jaunās epohas atsaukumu kopā.
+    Atgriež {user_id: jaunā epoha}.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    qs = User.objects.all_with_deleted().filter(id__in=user_ids)
+    qs.update(token_epoch=F("token_epoch") + 1)
+    epochs = dict(qs.values_list("id", "token_epoch"))
+    publish_epochs(epochs)
+    return epochs
+
+def publish_epochs(epochs: dict[int, int]):
+    # Atsaukumu kopa: ieraksts vajadzīgs tikai tik ilgi, cik dzīvo vecie access tokeni
+    timeout = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    transaction.on_commit(lambda: _cache().set_many({_epoch_key(uid): e for uid, e in epochs.items()}, timeout))
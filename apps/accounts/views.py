@@ -3,17 +3,19 @@ from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 
 from apps.accounts.models import User
 from .serializers import RegisterSerializer, ProfileReadSerializer, ProfileUpdateSerializer
 from apps.accounts.models import SecretQuestion
 from .auth_views import set_jwt_cookies
+from .throttling import AuthRateThrottle
+from .tokens import AuthRefreshToken
 
 class RegisterView(generics.CreateAPIView):
     # USER_001: konta izveide (KL/UA)
     permission_classes = [AllowAny]
+    throttle_classes = [AuthRateThrottle]
     serializer_class = RegisterSerializer
 
     def create(self, request, *args, **kwargs):
@@ -23,7 +25,7 @@ class RegisterView(generics.CreateAPIView):
 
         # Ja izvēlēts ienākt uzreiz — uzliekam JWT cookies
         if getattr(user, "_auto_login", False):
-            refresh = RefreshToken.for_user(user)
+            refresh = AuthRefreshToken.for_user(user)
             resp = Response(
                 {
                     "code": "P_001",
@@ -43,13 +45,18 @@ class ProfileView(APIView):
     # USER_004 + USER_005
     permission_classes = [IsAuthenticated]
 
+    def _current_user(self, request) -> User:
+        # request.user var būt kešots autentifikācijas momentuzņēmums (līdz AUTH_USER_CACHE_TTL vecs, bez profila laukiem) -
+        # profilam un rakstīšanai lietotājs tiek ielādēts no DB, lai save() nepārrakstītu lomu / bloķēšanu / epohu
+        return User.objects.get(pk=request.user.pk)
+
     def get(self, request):
         # Profila datu apskate (USER_004)
-        return Response(ProfileReadSerializer(request.user).data, status=status.HTTP_200_OK)
+        return Response(ProfileReadSerializer(self._current_user(request)).data, status=status.HTTP_200_OK)
 
     def patch(self, request):
         # Profila datu rediģēšana (USER_005)
-        s = ProfileUpdateSerializer(instance=request.user, data=request.data, partial=True)
+        s = ProfileUpdateSerializer(instance=self._current_user(request), data=request.data, partial=True)
         s.is_valid(raise_exception=True)
         s.save()
         return Response({"code": "P_002", "detail": "Profila dati ir veiksmīgi atjaunināti."}, status=status.HTTP_200_OK)
@@ -74,7 +81,7 @@ class LogoutView(APIView):
             return Response({"detail": "Refresh tokens ir obligāts."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            token = RefreshToken(refresh)
+            token = AuthRefreshToken(refresh)
             token.blacklist()
         except Exception:
             return Response({"detail": "Nederīgs refresh tokens."}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_delete_companyworkinghour'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='time_zone',
+            field=models.CharField(default='UTC', max_length=64),
+        ),
+    ]
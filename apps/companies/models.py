@@ -1,4 +1,6 @@
 # apps/companies/models.py
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from django.db import models
 from django.utils import timezone
 from django.core.exceptions import ValidationError
@@ -39,6 +41,22 @@ class Company(models.Model):
 
     created_at = models.DateTimeField(default=timezone.now, editable=False)
 
+    # IANA laika josla (piem., Europe/Riga) - statistikas grupēšanai pa vietējām dienām / stundām
+    time_zone = models.CharField(max_length=64, default="UTC")
+
+    # Statusi, kas ir ietverti lietotāju access tokenos (company_active claim)
+    AUTH_STATE_FIELDS = ("is_active", "is_blocked", "deleted_at")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Atceramies ielādēto statusu, lai pēc save() zinātu, vai lietotāju tokeni jāatsauc
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_auth_state = instance.auth_state()
+        return instance
+
+    def auth_state(self) -> tuple:
+        return tuple(self.__dict__.get(f) for f in self.AUTH_STATE_FIELDS)
+
     def soft_delete(self):
         # Soft-delete: atzīmē kā dzēstu un iestata neaktīvu
         self.deleted_at = timezone.now()
@@ -53,5 +71,12 @@ class Company(models.Model):
         # Darba laiki vairs netiek izmantoti; atvērtība = aktīvs un nebloķēts
         return self.is_active and not self.is_blocked
 
+    @property
+    def tzinfo(self) -> ZoneInfo:
+        try:
+            return ZoneInfo(self.time_zone)
+        except (ZoneInfoNotFoundError, ValueError):
+            return ZoneInfo("UTC")
+
     def __str__(self):
         return self.name
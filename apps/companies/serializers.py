@@ -1,4 +1,6 @@
 import re
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from rest_framework import serializers
 
 from .models import Company
@@ -60,6 +62,7 @@ class CompanyDetailSerializer(serializers.ModelSerializer):
             "is_active",
             "is_blocked",
             "deleted_at",
+            "time_zone",
         ]
         read_only_fields = ["is_blocked", "deleted_at"]
 
@@ -87,6 +90,7 @@ class CompanyCreateUpdateSerializer(serializers.ModelSerializer):
             "description",
             "logo",
             "is_active",
+            "time_zone",
         ]
         extra_kwargs = {"logo": {"required": False}}
 
@@ -138,6 +142,13 @@ class CompanyCreateUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Apraksts ir obligāts un līdz 1000 simboliem.")
         return value
 
+    def validate_time_zone(self, value):
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError("Nederīga laika josla (piem., Europe/Riga).")
+        return value
+
     def validate_logo(self, value):
         if value:
             return value
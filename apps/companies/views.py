@@ -1,4 +1,6 @@
+from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -17,6 +19,13 @@ from .serializers import (
 )
 
 
+def soft_delete_with_users(company: Company):
+    # Lietotāji ar vienu UPDATE (nevis soft_delete() katram); viņu tokenus atsauc uzņēmuma post_save signāls
+    with transaction.atomic():
+        User.objects.filter(company=company).update(deleted_at=timezone.now(), is_active=False)
+        company.soft_delete()
+
+
 def client_visible_queryset():
     """Publiski redzami uzņēmumi: aktīvi, nebloķēti, nav soft-delete."""
     return Company.objects.filter(
@@ -194,6 +203,7 @@ class CompanySoftDeleteMyView(APIView):
     """
 
     permission_classes = [IsAuthenticated, IsCompanyAdmin]
+    query_budget = 12
 
     def post(self, request):
         user: User = request.user
@@ -204,9 +214,7 @@ class CompanySoftDeleteMyView(APIView):
         if not company:
             raise NotFound("Uzņēmums nav atrasts.")
 
-        company.soft_delete()
-        for u in company.users.all():
-            u.soft_delete()
+        soft_delete_with_users(company)
 
         return Response({"detail": "Uzņēmuma profils ir dzēsts."}, status=status.HTTP_200_OK)
 
@@ -239,15 +247,14 @@ class AdminCompanySoftDeleteView(APIView):
     """
 
     permission_classes = [IsAuthenticated, IsSystemAdmin]
+    query_budget = 12
 
     def post(self, request, company_id: int):
         company = Company.objects.filter(id=company_id, deleted_at__isnull=True).first()
         if not company:
             raise NotFound("Uzņēmums nav atrasts.")
 
-        company.soft_delete()
-        for u in company.users.all():
-            u.soft_delete()
+        soft_delete_with_users(company)
 
         return Response({"detail": "Uzņēmums ir dzēsts."}, status=status.HTTP_200_OK)
 
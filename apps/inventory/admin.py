@@ -0,0 +1,17 @@
+# apps/inventory/admin.py
+from django.contrib import admin
+
+from .models import InventoryItem
+
+@admin.register(InventoryItem)
+class InventoryItemAdmin(admin.ModelAdmin):
+    # Atlikumu maina tikai API (korekcija / piegāde / norakstīšana), kas to ieraksta žurnālā (InventoryMovement);
+    # tieša labošana adminā apietu žurnālu un momentuzņēmumi vairs nesakristu ar atlikumu
+    list_display = ("name", "company", "quantity", "unit")
+    list_filter = ("company",)
+    search_fields = ("name",)
+    readonly_fields = ("quantity", "created_at")
+
+    def has_add_permission(self, request):
+        # Jaunai vienībai sākotnējais atlikums ir jānorāda, bet lauks šeit ir tikai lasāms - veido caur API
+        return False
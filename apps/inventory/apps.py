@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.inventory'
+
+    def ready(self):
+        # Noliktavas žurnāla sākuma momentuzņēmumi (signāli)
+        from . import signals  # noqa: F401
@@ -0,0 +1,122 @@
+# apps/inventory/ledger.py
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import DecimalField, Exists, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import InventoryItem, InventoryMovement, InventorySnapshot
+
+# Noliktavas žurnāls (InventoryMovement) un momentuzņēmumi (InventorySnapshot).
+# Visas atlikuma izmaiņas (piegāde, korekcija, norakstīšana) tiek ierakstītas tajā pašā transakcijā un zem tās pašas
+# InventoryItem rindas slēdzenes kā quantity maiņa - tāpēc momentuzņēmums (atlikums + last_movement_id) ir konsekvents.
+
+def record_movements(movements: Iterable[InventoryMovement]):
+    # Viens INSERT visiem ierakstiem (žurnāls tikai papildinās, rindas netiek mainītas)
+    movements = [m for m in movements if m.quantity_change]
+    if movements:
+        InventoryMovement.objects.bulk_create(movements)
+
+def _decimal_sum(expr):
+    return Coalesce(expr, Value(Decimal("0")), output_field=DecimalField(max_digits=12, decimal_places=3))
+
+def stock_at(
+    at: datetime, company_id: int | None = None, inventory_item_ids: Iterable[int] | None = None
+) -> dict[int, Decimal]:
+    """
+    Atgriež noliktavā esošo daudzumu laikā `at` (inventory_item_id -> quantity) vienā vaicājumā:
+    pēdējais momentuzņēmums līdz `at` + atlikuma izmaiņas žurnālā pēc tā (rezervācijas netiek skaitītas).
+    Vienības bez momentuzņēmuma līdz `at` netiek iekļautas - to vēsture sākas ar pirmo momentuzņēmumu
+    (izveides brīdis vai, esošajām vienībām, žurnāla ieviešanas migrācija).
+    """
+    snapshot = InventorySnapshot.objects.filter(inventory_item_id=OuterRef("pk"), taken_at__lte=at).order_by(
+        "-taken_at", "-id"
+    )
+    tail = (
+        InventoryMovement.objects.filter(
+            inventory_item_id=OuterRef("pk"),
+            kind__in=InventoryMovement.STOCK_KINDS,
+            created_at__lte=at,
+            id__gt=OuterRef("base_movement_id"),
+        )
+        .values("inventory_item_id")
+        .annotate(total=Sum("quantity_change"))
+        .values("total")[:1]
+    )
+
+    qs = InventoryItem.objects.filter(Exists(snapshot))
+    if company_id is not None:
+        qs = qs.filter(company_id=company_id)
+    if inventory_item_ids is not None:
+        qs = qs.filter(id__in=set(inventory_item_ids))
+
+    rows = (
+        qs.annotate(
+            base_movement_id=Coalesce(Subquery(snapshot.values("last_movement_id")[:1]), Value(0)),
+            base_quantity=_decimal_sum(Subquery(snapshot.values("quantity")[:1])),
+        )
+        .annotate(tail_quantity=_decimal_sum(Subquery(tail)))
+        .values_list("id", "base_quantity", "tail_quantity")
+    )
+    return {item_id: base + change for item_id, base, change in rows}
+
+def take_snapshots(batch_size: int = 500) -> int:
+    """
+    Izveido momentuzņēmumu katrai vienībai, kurai kopš iepriekšējā ir jauni žurnāla ieraksti
+    (periodisks uzdevums, sk. komandu snapshot_inventory). Apstrādā porcijās pēc ID, katru savā transakcijā.
+    Atgriež izveidoto momentuzņēmumu skaitu.
+    """
+    last_snapshot = InventorySnapshot.objects.filter(inventory_item_id=OuterRef("pk")).order_by("-taken_at", "-id")
+    last_movement = (
+        InventoryMovement.objects.filter(inventory_item_id=OuterRef("pk"))
+        .values("inventory_item_id")
+        .annotate(last=Max("id"))
+        .values("last")[:1]
+    )
+
+    created = 0
+    after_id = 0
+    while True:
+        with transaction.atomic():
+            # Vispirms tikai bloķēšana (pēc ID secības). Atlikums un pēdējais žurnāla ID tiek nolasīti otrā vaicājumā:
+            # tajā pašā FOR UPDATE vaicājumā pēc gaidīšanas uz slēdzeni quantity būtu jau apstiprinātā versija,
+            # bet Max(id) apakšvaicājums - no momentuzņēmuma pirms gaidīšanas, un izmaiņa tiktu ieskaitīta divreiz.
+            ids = list(
+                InventoryItem.objects.select_for_update()
+                .filter(id__gt=after_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            items = list(
+                InventoryItem.objects.filter(id__in=ids)
+                .order_by("id")
+                .annotate(
+                    snapshot_movement_id=Subquery(last_snapshot.values("last_movement_id")[:1]),
+                    last_movement_id=Coalesce(Subquery(last_movement), Value(0)),
+                )
+                .values_list("id", "quantity", "snapshot_movement_id", "last_movement_id")
+            )
+            now = timezone.now()
+            snapshots = [
+                InventorySnapshot(
+                    inventory_item_id=item_id,
+                    quantity=quantity,
+                    last_movement_id=last_movement_id,
+                    taken_at=now,
+                )
+                for item_id, quantity, snapshot_movement_id, last_movement_id in items
+                if snapshot_movement_id is None or last_movement_id > snapshot_movement_id
+            ]
+            InventorySnapshot.objects.bulk_create(snapshots)
+        created += len(snapshots)
+        after_id = ids[-1]
+        if len(ids) < batch_size:
+            break
+    return created
@@ -0,0 +1,14 @@
+# apps/inventory/management/commands/snapshot_inventory.py
+from django.core.management.base import BaseCommand
+
+from apps.inventory.ledger import take_snapshots
+
+class Command(BaseCommand):
+    help = "Izveido noliktavas atlikumu momentuzņēmumus vienībām ar jauniem žurnāla ierakstiem. Palaist periodiski (cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        created = take_snapshots(batch_size=options["batch_size"])
+        self.stdout.write(f"Izveidoti momentuzņēmumi: {created}")
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def initial_snapshots(apps, schema_editor):
+    # Sākuma punkts žurnālam: esošo vienību pašreizējais atlikums (pirms tam vēstures nav)
+    InventoryItem = apps.get_model("inventory", "InventoryItem")
+    InventorySnapshot = apps.get_model("inventory", "InventorySnapshot")
+    InventorySnapshot.objects.bulk_create(
+        [
+            InventorySnapshot(inventory_item_id=item_id, quantity=qty)
+            for item_id, qty in InventoryItem.objects.values_list("id", "quantity")
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_inventoryreservation'),
+        ('orders', '0002_remove_order_client_remove_order_last_modified_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('RCV', 'Piegāde'), ('ADJ', 'Korekcija'), ('CON', 'Norakstīšana'), ('RSV', 'Rezervācija'), ('REL', 'Rezervācijas atbrīvošana')], max_length=3)),
+                ('quantity_change', models.DecimalField(decimal_places=3, max_digits=12)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inventory_movements', to=settings.AUTH_USER_MODEL)),
+                ('inventory_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='inventory.inventoryitem')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inventory_movements', to='orders.order')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['inventory_item', 'created_at'], name='inventory_i_invento_04b724_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='InventorySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=3, max_digits=12)),
+                ('last_movement_id', models.BigIntegerField(default=0)),
+                ('taken_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('inventory_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='inventory.inventoryitem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['inventory_item', '-taken_at'], name='inventory_i_invento_23a0c0_idx')],
+            },
+        ),
+        migrations.RunPython(initial_snapshots, migrations.RunPython.noop),
+    ]
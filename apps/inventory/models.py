@@ -24,3 +24,65 @@ class InventoryItem(models.Model):
 
     def __str__(self):
         return f"{self.company_id}: {self.name} ({self.unit})"
+
+class InventoryReservation(models.Model):
+    # Rezervācija (hold): pasūtījuma noformēšanas brīdī piesaistīts sastāvdaļas daudzums.
+    # Pabeidzot pasūtījumu tā pārvēršas norakstīšanā; atceļot vai beidzoties termiņam - tiek atbrīvota (dzēsta).
+    inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name="reservations")
+    order = models.ForeignKey("orders.Order", on_delete=models.CASCADE, related_name="inventory_reservations")
+    amount = models.DecimalField(max_digits=12, decimal_places=3)
+
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ("order", "inventory_item")
+
+    def __str__(self):
+        return f"Hold order={self.order_id} item={self.inventory_item_id} amount={self.amount}"
+
+class InventoryMovement(models.Model):
+    # Tikai pievienojams (append-only) noliktavas žurnāls: katra atlikuma vai rezervāciju izmaiņa ir atsevišķs ieraksts.
+    # InventoryItem.quantity paliek "karstais" pašreizējais atlikums; vēsture un audits tiek lasīti no šejienes.
+    class Kind(models.TextChoices):
+        RECEIPT = "RCV", "Piegāde"
+        ADJUSTMENT = "ADJ", "Korekcija"
+        CONSUMPTION = "CON", "Norakstīšana"
+        RESERVATION = "RSV", "Rezervācija"
+        RELEASE = "REL", "Rezervācijas atbrīvošana"
+
+    # Tikai šie veidi maina noliktavā esošo daudzumu (rezervācijas to neietekmē)
+    STOCK_KINDS = (Kind.RECEIPT, Kind.ADJUSTMENT, Kind.CONSUMPTION)
+
+    inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name="movements")
+    kind = models.CharField(max_length=3, choices=Kind.choices)
+    # Atlikuma izmaiņa (+ piegāde, - norakstīšana); rezervācijai - rezervētais daudzums ar mīnusa zīmi
+    quantity_change = models.DecimalField(max_digits=12, decimal_places=3)
+
+    order = models.ForeignKey(
+        "orders.Order", null=True, blank=True, on_delete=models.SET_NULL, related_name="inventory_movements"
+    )
+    created_by = models.ForeignKey(
+        "accounts.User", null=True, blank=True, on_delete=models.SET_NULL, related_name="inventory_movements"
+    )
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["inventory_item", "created_at"])]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} item={self.inventory_item_id} {self.quantity_change}"
+
+class InventorySnapshot(models.Model):
+    # Periodisks atlikuma momentuzņēmums: atlikums laikā T = snapshot.quantity + žurnāla "aste" pēc last_movement_id
+    inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name="snapshots")
+    quantity = models.DecimalField(max_digits=12, decimal_places=3)
+    # Lielākais InventoryMovement.id, kas jau iekļauts quantity (0 - neviens)
+    last_movement_id = models.BigIntegerField(default=0)
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["inventory_item", "-taken_at"])]
+
+    def __str__(self):
+        return f"Snapshot item={self.inventory_item_id} {self.quantity} @ {self.taken_at:%Y-%m-%d %H:%M}"
@@ -1,8 +1,12 @@
 from rest_framework.permissions import BasePermission
 from apps.accounts.models import User
+from apps.accounts.tokens import ClaimsUser
 
 
 def _company_is_active(user: User) -> bool:
+    # ClaimsUser (tokena claims) - statuss ir tokenā, bez uzņēmuma vaicājuma
+    if isinstance(user, ClaimsUser):
+        return user.company_active
     company = getattr(user, "company", None)
     if not company:
         return False
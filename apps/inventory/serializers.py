@@ -61,3 +61,16 @@ class InventoryUpdateEmployeeSerializer(serializers.ModelSerializer):
         if value <= 0:
             raise serializers.ValidationError("Daudzumam jābūt pozitīvam.")
         return value
+
+class InventoryReceiptSerializer(serializers.Serializer):
+    # INV_005: piegāde - pieskaitāmais daudzums
+    quantity = serializers.DecimalField(max_digits=12, decimal_places=3)
+
+    def validate_quantity(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Daudzumam jābūt pozitīvam.")
+        return value
+
+class InventoryStockAtQuerySerializer(serializers.Serializer):
+    # INV_006: laika punkts (ISO 8601), kuram aprēķina atlikumu
+    at = serializers.DateTimeField()
@@ -0,0 +1,13 @@
+# apps/inventory/signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import InventoryItem, InventorySnapshot
+
+@receiver(post_save, sender=InventoryItem)
+def _inventory_created(sender, instance, created, **kwargs):
+    # Jaunai vienībai sākotnējais atlikums kļūst par pirmo momentuzņēmumu (žurnāla sākuma punkts)
+    if created:
+        InventorySnapshot.objects.create(
+            inventory_item=instance, quantity=instance.quantity, taken_at=instance.created_at
+        )
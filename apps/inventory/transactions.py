@@ -0,0 +1,102 @@
+# apps/inventory/transactions.py
+import functools
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+# Noliktavu mainošās transakcijas (norakstīšana, rezervācijas, statusa maiņa).
+# Noteikumi: noliktavas rindas vienmēr bloķē pēc primārās atslēgas secības (sk. menu.services.available_stock),
+# bet deadlock / serialization kļūdas gadījumā visa transakcija tiek atkārtota ar nejaušu (jitter) aizturi.
+
+TRANSIENT_SQLSTATES = {
+    "40P01": "deadlocks",
+    "40001": "serialization_failures",
+}
+
+_stats_lock = threading.Lock()
+_stats = {
+    "attempts": 0,
+    "retries": 0,
+    "deadlocks": 0,
+    "serialization_failures": 0,
+    "gave_up": 0,
+    "lock_acquisitions": 0,
+    "lock_wait_seconds": 0.0,
+}
+
+class ConcurrentUpdateError(APIException):
+    # Pēc visiem mēģinājumiem transakcija joprojām konfliktē ar paralēlu izmaiņu
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Dati tiek vienlaikus mainīti. Lūdzu, mēģiniet vēlreiz."
+    default_code = "concurrent_update"
+
+def _bump(key: str, value=1):
+    with _stats_lock:
+        _stats[key] += value
+
+def get_transaction_stats() -> dict:
+    """Procesa skaitītāji: mēģinājumi, atkārtojumi, deadlock/serialization kļūdas un bloķēšanas gaidīšanas laiks."""
+    with _stats_lock:
+        return dict(_stats)
+
+def reset_transaction_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0.0 if key == "lock_wait_seconds" else 0
+
+@contextmanager
+def timed_lock():
+    # Mēra SELECT ... FOR UPDATE ilgumu (ietver gaidīšanu uz citu transakciju slēdzenēm)
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        with _stats_lock:
+            _stats["lock_acquisitions"] += 1
+            _stats["lock_wait_seconds"] += time.monotonic() - started
+
+def _transient_kind(exc: OperationalError) -> str | None:
+    cause = exc.__cause__
+    sqlstate = getattr(cause, "sqlstate", None) or getattr(cause, "pgcode", None)
+    return TRANSIENT_SQLSTATES.get(sqlstate)
+
+def atomic_with_retry(func=None, *, attempts: int | None = None, base_delay: float = 0.05, max_delay: float = 1.0):
+    """
+    Dekorators: izpilda funkciju transaction.atomic() blokā un deadlock / serialization kļūdas
+    gadījumā atkārto to (eksponenciāla aizture ar pilnu jitter). Pēc pēdējā mēģinājuma - ConcurrentUpdateError (409).
+    Ja izsaukums jau notiek ārējā transakcijā, atkārtot nevar (ārējā transakcija ir pārtraukta) - izpilda vienreiz.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if transaction.get_connection().in_atomic_block:
+                with transaction.atomic():
+                    return fn(*args, **kwargs)
+
+            max_attempts = attempts or getattr(settings, "INVENTORY_TX_ATTEMPTS", 3)
+            for attempt in range(1, max_attempts + 1):
+                _bump("attempts")
+                try:
+                    with transaction.atomic():
+                        return fn(*args, **kwargs)
+                except OperationalError as exc:
+                    kind = _transient_kind(exc)
+                    if kind is None:
+                        raise
+                    _bump(kind)
+                    if attempt == max_attempts:
+                        _bump("gave_up")
+                        raise ConcurrentUpdateError() from exc
+                    _bump("retries")
+                    time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1))))
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -1,6 +1,13 @@
 # apps/inventory/urls.py
 from django.urls import path
-from .views import InventoryListView, InventoryCreateView, InventoryUpdateView, InventoryDeleteView
+from .views import (
+    InventoryListView,
+    InventoryCreateView,
+    InventoryUpdateView,
+    InventoryDeleteView,
+    InventoryReceiptView,
+    InventoryStockAtView,
+)
 
 urlpatterns = [
     # INV_001
@@ -14,4 +21,10 @@ urlpatterns = [
 
     # INV_004
     path("<int:item_id>/delete/", InventoryDeleteView.as_view()),
+
+    # INV_005
+    path("<int:item_id>/receive/", InventoryReceiptView.as_view()),
+
+    # INV_006
+    path("stock-at/", InventoryStockAtView.as_view()),
 ]
@@ -1,4 +1,6 @@
 # apps/inventory/views.py
+from django.db import transaction
+from django.db.models import F
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -6,20 +8,27 @@ from rest_framework import status
 from rest_framework.exceptions import PermissionDenied, NotFound
 
 from apps.accounts.models import User
-from .models import InventoryItem
+from apps.accounts.authentication import ClaimsJWTAuthentication
+from apps.menu.services import schedule_availability_refresh
+from .ledger import record_movements, stock_at
+from .models import InventoryItem, InventoryMovement
 from .permissions import IsCompanyStaff, IsCompanyAdmin
 from .serializers import (
     InventoryListSerializer,
     InventoryCreateSerializer,
     InventoryUpdateAdminSerializer,
     InventoryUpdateEmployeeSerializer,
+    InventoryReceiptSerializer,
+    InventoryStockAtQuerySerializer,
 )
 
 class InventoryListView(APIView):
     """
     INV_001: apskatīt noliktavas vienību sarakstu (UA/DA)
     """
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated, IsCompanyStaff]
+    query_budget = 4
 
     def get(self, request):
         user: User = request.user
@@ -49,6 +58,7 @@ class InventoryCreateView(APIView):
             return Response({"detail": "Noliktavas vienība ar šādu nosaukumu jau eksistē."},
                             status=status.HTTP_400_BAD_REQUEST)
 
+        # Sākotnējais atlikums tiek saglabāts kā pirmais momentuzņēmums (sk. signals)
         InventoryItem.objects.create(company_id=user.company_id, **s.validated_data)
         return Response({"code": "P_001", "detail": "Noliktavas vienība ir izveidota."},
                         status=status.HTTP_201_CREATED)
@@ -61,12 +71,14 @@ class InventoryUpdateView(APIView):
     """
     permission_classes = [IsAuthenticated, IsCompanyStaff]
 
+    @transaction.atomic
     def put(self, request, item_id: int):
         user: User = request.user
         if not user.company_id:
             raise PermissionDenied("Lietotājam nav uzņēmuma.")
 
-        item = InventoryItem.objects.filter(id=item_id, company_id=user.company_id).first()
+        # Rinda tiek bloķēta, lai korekcijas starpība žurnālā atbilstu faktiskajai izmaiņai
+        item = InventoryItem.objects.select_for_update().filter(id=item_id, company_id=user.company_id).first()
         if not item:
             raise NotFound("Noliktavas vienība nav atrasta.")
 
@@ -86,7 +98,12 @@ class InventoryUpdateView(APIView):
             s = InventoryUpdateEmployeeSerializer(instance=item, data=request.data)
 
         s.is_valid(raise_exception=True)
+        old_quantity = item.quantity
         s.save()
+        record_movements(
+            [InventoryMovement(inventory_item=item, kind=InventoryMovement.Kind.ADJUSTMENT,
+                               quantity_change=item.quantity - old_quantity, created_by=user)]
+        )
 
         return Response({"code": "P_002", "detail": "Noliktavas vienība ir atjaunināta."},
                         status=status.HTTP_200_OK)
@@ -109,3 +126,57 @@ class InventoryDeleteView(APIView):
         item.delete()
         return Response({"code": "P_004", "detail": "Noliktavas vienība ir dzēsta."},
                         status=status.HTTP_200_OK)
+
+class InventoryReceiptView(APIView):
+    """
+    INV_005: reģistrēt piegādi - pieskaita daudzumu atlikumam (UA/DA)
+    """
+    permission_classes = [IsAuthenticated, IsCompanyStaff]
+
+    @transaction.atomic
+    def post(self, request, item_id: int):
+        user: User = request.user
+        if not user.company_id:
+            raise PermissionDenied("Lietotājam nav uzņēmuma.")
+
+        s = InventoryReceiptSerializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        amount = s.validated_data["quantity"]
+
+        # Pieskaitām ar F(), bez nolasīšanas-pārrakstīšanas; rinda paliek bloķēta līdz commit
+        updated = InventoryItem.objects.filter(id=item_id, company_id=user.company_id).update(
+            quantity=F("quantity") + amount
+        )
+        if not updated:
+            raise NotFound("Noliktavas vienība nav atrasta.")
+
+        record_movements(
+            [InventoryMovement(inventory_item_id=item_id, kind=InventoryMovement.Kind.RECEIPT,
+                               quantity_change=amount, created_by=user)]
+        )
+        # update() nesūta signālus
+        schedule_availability_refresh(inventory_item_ids=[item_id])
+        return Response({"code": "P_002", "detail": "Noliktavas vienība ir atjaunināta."},
+                        status=status.HTTP_200_OK)
+
+class InventoryStockAtView(APIView):
+    """
+    INV_006: noliktavas atlikums norādītajā laikā (?at=ISO 8601) no momentuzņēmuma + žurnāla (UA/DA)
+    """
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated, IsCompanyStaff]
+    query_budget = 4
+
+    def get(self, request):
+        user: User = request.user
+        if not user.company_id:
+            raise PermissionDenied("Lietotājam nav uzņēmuma.")
+
+        s = InventoryStockAtQuerySerializer(data=request.query_params)
+        s.is_valid(raise_exception=True)
+        at = s.validated_data["at"]
+
+        quantities = stock_at(at, company_id=user.company_id)
+        items = InventoryItem.objects.filter(id__in=quantities.keys()).order_by("name").values("id", "name", "unit")
+        data = [{**item, "quantity": str(quantities[item["id"]])} for item in items]
+        return Response({"at": at, "items": data}, status=status.HTTP_200_OK)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MenuConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.menu'
+
+    def ready(self):
+        # Ēdienkartes keša invalidācija (signāli)
+        from . import signals  # noqa: F401
@@ -0,0 +1,45 @@
+# apps/menu/cache.py
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Publiskās ēdienkartes kešs: katram uzņēmumam ir "ēdienkartes versija".
+# Jebkura izmaiņa (produkts, kategorija, recepte, noliktava, uzņēmuma statuss) nomaina versiju,
+# tāpēc vecie ieraksti vairs netiek nolasīti un paši izkrīt pēc TTL.
+MENU_CACHE_TTL = getattr(settings, "MENU_CACHE_TTL", 60 * 60)
+
+def _version_key(company_id: int) -> str:
+    return f"menu:version:{company_id}"
+
+def _data_key(company_id: int, version: str) -> str:
+    return f"menu:data:{company_id}:{version}"
+
+def _new_version() -> str:
+    return uuid.uuid4().hex[:12]
+
+def get_menu_version(company_id: int) -> str:
+    # Ja versijas nav (pirmā reize vai izmesta no keša), izveidojam jaunu
+    key = _version_key(company_id)
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(key, version, None):
+            version = cache.get(key) or version
+    return version
+
+def bump_menu_version(company_id: int | None):
+    """
+    Nomaina uzņēmuma ēdienkartes versiju pēc transakcijas commit,
+    lai paralēls pieprasījums nepaspētu nokešot vēl neapstiprinātus datus ar jauno versiju.
+    """
+    if not company_id:
+        return
+    transaction.on_commit(lambda: cache.set(_version_key(company_id), _new_version(), None))
+
+def get_cached_menu(company_id: int, version: str):
+    return cache.get(_data_key(company_id, version))
+
+def set_cached_menu(company_id: int, version: str, entry: dict):
+    cache.set(_data_key(company_id, version), entry, MENU_CACHE_TTL)
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_availability(apps, schema_editor):
+    # Sākotnējā aizpilde: min(atlikums // daudzums) katram produktam (bez receptes => 0)
+    Product = apps.get_model("menu", "Product")
+    RecipeItem = apps.get_model("menu", "RecipeItem")
+    ProductAvailability = apps.get_model("menu", "ProductAvailability")
+
+    per_product = {pid: [] for pid in Product.objects.values_list("id", flat=True)}
+    for product_id, amount, stock in RecipeItem.objects.values_list("product_id", "amount", "inventory_item__quantity"):
+        per_product[product_id].append(int(stock // amount) if amount and amount > 0 and stock is not None else 0)
+
+    ProductAvailability.objects.bulk_create(
+        [ProductAvailability(product_id=pid, quantity=max(min(vals), 0) if vals else 0) for pid, vals in per_product.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_alter_recipecomponent_unique_together_and_more'),
+        ('menu', '0003_alter_product_photo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductAvailability',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='availability', serialize=False, to='menu.product')),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_availability, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,15 @@
 # apps/menu/models.py
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.dispatch import Signal
 from django.utils import timezone
 
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
+# Produkta cena mainīta (Product.save); argumenti: product, old_price.
+# QuerySet.update(price=...) šo signālu nesūta.
+product_price_changed = Signal()
+
 def product_photo_path(instance, filename: str) -> str:
     # Saglabājam pēc company_id; nelietojam instance.id, lai ceļš neveidotos ar None pirms pirmā saglabāšanas cikla
     return f"products/{instance.company_id}/{filename}"
@@ -56,11 +61,25 @@ class Product(models.Model):
         unique_together = ("company", "name")
         ordering = ["name"]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Atceramies ielādēto cenu, lai save() zinātu, vai tā mainīta
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_price = instance.__dict__.get("price")
+        return instance
+
     def clean(self):
         # Cena nedrīkst būt negatīva
         if self.price is not None and self.price <= 0:
             raise ValidationError("Cena par vienību ir jābūt pozitīvai vērtībai.")
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        old_price = getattr(self, "_loaded_price", None)
+        self._loaded_price = self.price
+        if old_price is not None and old_price != self.price:
+            product_price_changed.send(sender=Product, product=self, old_price=old_price)
+
     def __str__(self):
         return f"{self.company_id}: {self.name}"
 
@@ -77,3 +96,13 @@ class RecipeItem(models.Model):
         # Daudzumam jābūt pozitīvam
         if self.amount is not None and self.amount <= 0:
             raise ValidationError("Sastāvdaļas daudzumam jābūt pozitīvam.")
+
+class ProductAvailability(models.Model):
+    # Denormalizēts "cik vienības var pagatavot" (min(atlikums // daudzums) pa receptes rindām).
+    # Uztur menu.services.refresh_product_availability, kad mainās noliktava vai recepte.
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name="availability")
+    quantity = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.product_id}: {self.quantity}"
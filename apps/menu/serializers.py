@@ -4,6 +4,7 @@ from apps.accounts.models import User
 from apps.inventory.models import InventoryItem
 
 from .models import MenuCategory, Product, RecipeItem
+from .services import schedule_availability_refresh
 
 class RecipeItemInputSerializer(serializers.Serializer):
     # Ievadei: sastāvdaļa + daudzums
@@ -158,6 +159,8 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
                 for row in recipe_data
             ]
             RecipeItem.objects.bulk_create(items)
+            # bulk_create nesūta signālus - pieejamību (un ēdienkartes versiju) atjaunojam paši
+            schedule_availability_refresh(product_ids=[product.id])
         return product
 
     def update(self, instance, validated_data):
@@ -175,6 +178,7 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
                     for row in recipe_data
                 ]
                 RecipeItem.objects.bulk_create(items)
+                schedule_availability_refresh(product_ids=[instance.id])
             # recipe_data == [] => neviens pieprasījums nemaina recepti
 
         return instance
@@ -4,8 +4,14 @@ from __future__ import annotations
 from decimal import Decimal
 from typing import Iterable
 
-from apps.inventory.models import InventoryItem
-from .models import Product, RecipeItem
+from django.db import transaction
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.inventory.models import InventoryItem, InventoryReservation
+from apps.inventory.transactions import timed_lock
+from .cache import bump_menu_version
+from .models import MenuCategory, Product, ProductAvailability, RecipeItem
 
 def compute_available_quantities(products: Iterable[Product]) -> dict[int, int]:
     """
@@ -17,26 +23,85 @@ def compute_available_quantities(products: Iterable[Product]) -> dict[int, int]:
         return {}
 
     product_ids = [p.id for p in product_list]
-    # Prefetch receptes rindas ar krājumu daudzumiem, lai minimizētu vaicājumus.
+    # Lasām denormalizēto tabulu (ProductAvailability); trūkstošās rindas aprēķinām no receptēm.
+    available = dict(
+        ProductAvailability.objects.filter(product_id__in=product_ids).values_list("product_id", "quantity")
+    )
+    missing = [pid for pid in product_ids if pid not in available]
+    if missing:
+        available.update(_compute_live_quantities(missing))
+    return available
+
+def _reserved_amount(inventory_item_ref: str):
+    # Aktīvo rezervāciju summa sastāvdaļai (korelēts apakšvaicājums, 0 ja nav)
+    reserved = (
+        InventoryReservation.objects.filter(inventory_item_id=OuterRef(inventory_item_ref))
+        .values("inventory_item_id")
+        .annotate(total=Sum("amount"))
+        .values("total")[:1]
+    )
+    return Coalesce(
+        Subquery(reserved),
+        Value(Decimal("0")),
+        output_field=DecimalField(max_digits=12, decimal_places=3),
+    )
+
+def _free_stock(ri: RecipeItem) -> Decimal:
+    # Brīvais atlikums = noliktavā esošais - citu pasūtījumu rezervētais
+    return (ri.inventory_item.quantity or Decimal("0")) - (getattr(ri, "reserved", None) or Decimal("0"))
+
+def available_stock(
+    inventory_item_ids: Iterable[int], lock: bool = False, company_id: int | None = None
+) -> dict[int, Decimal]:
+    """
+    Atgriež brīvo atlikumu (quantity - rezervācijas) norādītajām noliktavas vienībām.
+    lock=True bloķē rindas (SELECT FOR UPDATE) pēc ID secības - lietojams pirms rezervāciju izveides
+    vai norakstīšanas. Vienības, kas neeksistē (vai nepieder company_id), rezultātā netiek iekļautas.
+    """
+    ids = set(inventory_item_ids)
+    if not ids:
+        return {}
+    qs = InventoryItem.objects.filter(id__in=ids).order_by("id")
+    if company_id is not None:
+        qs = qs.filter(company_id=company_id)
+    if lock:
+        # Vispirms tikai bloķēšana: rezervāciju apakšvaicājums tajā pašā FOR UPDATE vaicājumā tiktu nolasīts
+        # no vaicājuma momentuzņēmuma (pirms gaidīšanas uz slēdzeni) un neredzētu tikko apstiprinātās rezervācijas.
+        # Atlikums un rezervācijas tiek nolasīti otrā vaicājumā ar jaunu momentuzņēmumu (READ COMMITTED).
+        with timed_lock():
+            ids = list(qs.select_for_update().values_list("id", flat=True))
+        if not ids:
+            return {}
+        qs = InventoryItem.objects.filter(id__in=ids)
+    rows = qs.annotate(reserved=_reserved_amount("id")).values_list("id", "quantity", "reserved")
+    return {pk: quantity - reserved for pk, quantity, reserved in rows}
+
+def _compute_live_quantities(product_ids: list[int]) -> dict[int, int]:
+    # Prefetch receptes rindas ar krājumu daudzumiem un rezervācijām, lai minimizētu vaicājumus.
     recipes = (
         RecipeItem.objects.select_related("inventory_item")
         .filter(product_id__in=product_ids)
+        .annotate(reserved=_reserved_amount("inventory_item_id"))
         .order_by("product_id")
     )
 
+    return _available_from_recipe_rows(product_ids, recipes)
+
+def _available_from_recipe_rows(product_ids: Iterable[int], recipes: Iterable[RecipeItem]) -> dict[int, int]:
+    # Kopīgā daļa: min(atlikums // daudzums) jau ielādētām receptes rindām (ar inventory_item).
     available: dict[int, int] = {pid: 0 for pid in product_ids}
 
     # Veidojiet katra produkta min (daudzums// daudzums) dažādās sastāvdaļās.
-    per_product_values: dict[int, list[int]] = {pid: [] for pid in product_ids}
+    per_product_values: dict[int, list[int]] = {pid: [] for pid in available}
     for ri in recipes:
         if not ri.inventory_item:
             continue
-        qty: Decimal = ri.inventory_item.quantity or Decimal("0")
+        qty: Decimal = _free_stock(ri)
         # Izvairieties no dalīšanas ar nulli; nederīgas receptes tiek uzskatītas par nepieejamām.
         if ri.amount is None or ri.amount <= 0:
             per_product_values.setdefault(ri.product_id, []).append(0)
             continue
-        per_product_values.setdefault(ri.product_id, []).append(int(qty // ri.amount))
+        per_product_values.setdefault(ri.product_id, []).append(max(int(qty // ri.amount), 0))
 
     for pid, vals in per_product_values.items():
         if vals:
@@ -46,3 +111,179 @@ def compute_available_quantities(products: Iterable[Product]) -> dict[int, int]:
             available[pid] = 0
 
     return available
+
+def load_recipe_rows(product_ids: Iterable[int]) -> list[RecipeItem]:
+    """
+    Ielādē visu norādīto produktu receptes rindas kopā ar noliktavas atlikumiem un rezervācijām
+    (ri.reserved) vienā vaicājumā.
+    """
+    ids = set(product_ids)
+    if not ids:
+        return []
+    return list(
+        RecipeItem.objects.select_related("inventory_item")
+        .filter(product_id__in=ids)
+        .annotate(reserved=_reserved_amount("inventory_item_id"))
+        .order_by("product_id", "inventory_item_id")
+    )
+
+def compute_ingredient_demand(
+    lines: Iterable[tuple[int, int]], recipe_rows: Iterable[RecipeItem]
+) -> tuple[dict[int, Decimal], set[int]]:
+    """
+    Saskaita kopējo sastāvdaļu patēriņu visām pozīcijām (product_id, quantity).
+    Atgriež (inventory_item_id -> kopējais daudzums, produktu ID bez receptes).
+    """
+    qty_by_product: dict[int, int] = {}
+    for product_id, qty in lines:
+        qty_by_product[product_id] = qty_by_product.get(product_id, 0) + qty
+
+    demand: dict[int, Decimal] = {}
+    with_recipe: set[int] = set()
+    for ri in recipe_rows:
+        qty = qty_by_product.get(ri.product_id)
+        if qty is None:
+            continue
+        with_recipe.add(ri.product_id)
+        demand[ri.inventory_item_id] = demand.get(ri.inventory_item_id, Decimal("0")) + ri.amount * qty
+
+    missing_recipe = set(qty_by_product) - with_recipe
+    return demand, missing_recipe
+
+def check_cart_demand(
+    lines: Iterable[tuple[int, int]], lock: bool = False
+) -> tuple[dict[int, Decimal], set[int]]:
+    """
+    Pārbauda visu groza pozīciju (product_id, quantity) pieejamību kopā, nevis katru atsevišķi.
+    Sastāvdaļu pieprasījums tiek summēts pa visām pozīcijām, tāpēc divi produkti ar kopīgu
+    sastāvdaļu nevar kopā pārsniegt brīvo atlikumu (atlikums - rezervācijas).
+    Bez lock receptes un atlikumi tiek ielādēti vienā vaicājumā; ar lock noliktavas rindas
+    tiek bloķētas pēc ID secības, un atlikums ar rezervācijām tiek nolasīts atsevišķā vaicājumā pēc tam,
+    kad slēdzenes iegūtas (sk. available_stock).
+    Atgriež (sastāvdaļu pieprasījums, produktu ID, kurus nevar izpildīt).
+    """
+    line_list = [(pid, qty) for pid, qty in lines]
+    if not line_list:
+        return {}, set()
+
+    recipe_rows = load_recipe_rows(pid for pid, _ in line_list)
+    demand, shortages = compute_ingredient_demand(line_list, recipe_rows)
+
+    if lock:
+        stock = available_stock(demand.keys(), lock=True)
+    else:
+        stock = {ri.inventory_item_id: _free_stock(ri) for ri in recipe_rows}
+
+    short_items = {inv_id for inv_id, need in demand.items() if need > stock.get(inv_id, Decimal("0"))}
+    for ri in recipe_rows:
+        if ri.amount is None or ri.amount <= 0 or ri.inventory_item_id in short_items:
+            shortages.add(ri.product_id)
+
+    return demand, shortages
+
+def find_cart_shortages(lines: Iterable[tuple[int, int]], lock: bool = False) -> set[int]:
+    """
+    Atgriež produktu ID, kurus nevar izpildīt (nav receptes vai nepietiek kādas sastāvdaļas).
+    Sk. check_cart_demand.
+    """
+    return check_cart_demand(lines, lock=lock)[1]
+
+def build_public_menu(company_id: int) -> list[dict]:
+    """
+    Saliek klienta ēdienkarti (aktīvās kategorijas + pagatavojamie produkti) ar diviem vaicājumiem:
+    kategorijas un produkti kopā ar denormalizēto pieejamību (ProductAvailability). Grupēšana notiek atmiņā.
+    Produkti bez receptes vai ar nulles pieejamību netiek iekļauti.
+    Foto tiek atgriezts kā relatīvs URL - absolūto adresi veido skats.
+    """
+    categories = list(MenuCategory.objects.filter(company_id=company_id, is_active=True).order_by("name"))
+    if not categories:
+        return []
+
+    products = list(
+        Product.objects.filter(
+            company_id=company_id,
+            is_available=True,
+            category_id__in=[c.id for c in categories],
+        )
+        .select_related("availability")
+        .order_by("name", "id")
+    )
+
+    available_map: dict[int, int] = {}
+    missing = []
+    for p in products:
+        try:
+            available_map[p.id] = p.availability.quantity
+        except ProductAvailability.DoesNotExist:
+            missing.append(p.id)
+    if missing:
+        # Vēl nav pārrēķināts (piem., pirms commit) - aprēķinām no receptēm
+        available_map.update(_compute_live_quantities(missing))
+
+    by_category: dict[int, list[dict]] = {c.id: [] for c in categories}
+    for p in products:
+        available_qty = available_map.get(p.id, 0)
+        # Atklāt tikai tos produktus, kurus faktiski var ražot tagad (bez receptes => 0)
+        if available_qty <= 0:
+            continue
+        by_category[p.category_id].append(
+            {
+                "id": p.id,
+                "name": p.name,
+                "price": str(p.price),
+                "is_available": p.is_available,
+                "available_quantity": available_qty,
+                "photo": p.photo.url if p.photo else None,
+            }
+        )
+
+    return [
+        {
+            "id": cat.id,
+            "name": cat.name,
+            "description": cat.description,
+            "products": by_category[cat.id],
+        }
+        for cat in categories
+    ]
+
+@transaction.atomic
+def refresh_product_availability(product_ids: Iterable[int] = (), inventory_item_ids: Iterable[int] = ()):
+    """
+    Pārrēķina ProductAvailability norādītajiem produktiem un visiem produktiem, kuru receptē ir
+    norādītās noliktavas vienības (reversais indekss RecipeItem.inventory_item).
+    Pārējie produkti netiek aiztikti.
+    """
+    ids = set(product_ids)
+    inv_ids = set(inventory_item_ids)
+    if inv_ids:
+        ids.update(RecipeItem.objects.filter(inventory_item_id__in=inv_ids).values_list("product_id", flat=True))
+    if not ids:
+        return
+
+    # Bloķējam esošās rindas (pēc PK secības), lai paralēli pārrēķini nepārrakstītu cits cita rezultātu ar vecākiem datiem
+    list(ProductAvailability.objects.select_for_update().filter(product_id__in=ids).order_by("product_id").values_list("pk"))
+
+    # Produkts var būt jau dzēsts (piem., receptes rindas kaskādes dzēšana)
+    existing = dict(Product.objects.filter(id__in=ids).values_list("id", "company_id"))
+    if not existing:
+        return
+
+    quantities = _compute_live_quantities(list(existing))
+    ProductAvailability.objects.bulk_create(
+        [ProductAvailability(product_id=pid, quantity=max(qty, 0)) for pid, qty in quantities.items()],
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=["quantity", "updated_at"],
+    )
+
+    # Ēdienkartes kešu nomainām tikai pēc tam, kad jaunā pieejamība ir saglabāta
+    for company_id in set(existing.values()):
+        bump_menu_version(company_id)
+
+def schedule_availability_refresh(product_ids: Iterable[int] = (), inventory_item_ids: Iterable[int] = ()):
+    # Pārrēķinām pēc commit, lai lasītu jau apstiprinātus atlikumus
+    product_ids, inventory_item_ids = list(product_ids), list(inventory_item_ids)
+    if not product_ids and not inventory_item_ids:
+        return
+    transaction.on_commit(lambda: refresh_product_availability(product_ids, inventory_item_ids))
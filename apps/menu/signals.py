@@ -0,0 +1,35 @@
+# apps/menu/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.companies.models import Company
+from apps.inventory.models import InventoryItem
+from .cache import bump_menu_version
+from .models import MenuCategory, Product, RecipeItem
+from .services import schedule_availability_refresh
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=MenuCategory)
+@receiver([post_save, post_delete], sender=InventoryItem)
+def _menu_source_changed(sender, instance, **kwargs):
+    # Produkts, kategorija vai noliktavas atlikums mainīts -> publiskā ēdienkarte jāpārbūvē
+    bump_menu_version(instance.company_id)
+
+@receiver(post_save, sender=InventoryItem)
+def _inventory_saved(sender, instance, **kwargs):
+    # Pārrēķina pieejamību tikai produktiem, kuri lieto šo sastāvdaļu
+    schedule_availability_refresh(inventory_item_ids=[instance.id])
+
+@receiver([post_save, post_delete], sender=RecipeItem)
+def _recipe_changed(sender, instance, **kwargs):
+    if RecipeItem.product.is_cached(instance):
+        company_id = instance.product.company_id
+    else:
+        company_id = Product.objects.filter(id=instance.product_id).values_list("company_id", flat=True).first()
+    bump_menu_version(company_id)
+    schedule_availability_refresh(product_ids=[instance.product_id])
+
+@receiver(post_save, sender=Company)
+def _company_changed(sender, instance, **kwargs):
+    # Bloķēšana / deaktivizācija / soft-delete maina ēdienkartes publisko pieejamību
+    bump_menu_version(instance.id)
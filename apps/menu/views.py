@@ -1,4 +1,5 @@
 # apps/menu/views.py
+from django.utils.http import parse_etags
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
@@ -6,6 +7,7 @@ from rest_framework import status
 from rest_framework.exceptions import PermissionDenied, NotFound
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
+from apps.accounts.authentication import ClaimsJWTAuthentication
 from apps.accounts.models import User
 from apps.companies.models import Company
 from apps.inventory.models import InventoryItem
@@ -19,11 +21,8 @@ from .serializers import (
 )
 from .permissions import IsCompanyAdmin
 from .utils import parse_recipe
-from .services import compute_available_quantities
-
-def company_public_available(company_id: int) -> bool:
-    # Klientam uzņēmumam jābūt aktīvam, nebloķētam un ne soft-deleted
-    return Company.objects.filter(id=company_id, deleted_at__isnull=True, is_active=True, is_blocked=False).exists()
+from .services import build_public_menu, compute_available_quantities, schedule_availability_refresh
+from .cache import get_cached_menu, get_menu_version, set_cached_menu
 
 class MenuView(APIView):
     """
@@ -31,64 +30,20 @@ class MenuView(APIView):
     - Klients: tikai aktīvās kategorijas + pieejamie produkti
     - UA: visas kategorijas + visi produkti savam uzņēmumam
     """
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [AllowAny]
+    query_budget = 6
 
     def get(self, request, company_id: int):
-        company = Company.objects.filter(id=company_id, deleted_at__isnull=True).first()
-        if not company:
-            raise NotFound("Uzņēmums nav atrasts.")
-
         user = request.user
 
         # Klients
         if not (user.is_authenticated and user.role == User.Role.COMPANY_ADMIN):
-            # Pārbauda, vai uzņēmums ir publiski pieejams
-            if not company_public_available(company_id):
-                raise PermissionDenied("Uzņēmuma ēdienkarte nav pieejama.")
-
-            categories = MenuCategory.objects.filter(company=company, is_active=True).order_by("name")
-            data = []
-            product_ids = [p.id for p in Product.objects.filter(company=company, is_available=True)]
-            recipe_ids = set(
-                RecipeItem.objects.filter(product_id__in=product_ids).values_list("product_id", flat=True).distinct()
-            )
-            for cat in categories:
-                products = list(
-                    Product.objects.filter(company=company, category=cat, is_available=True)
-                    .order_by("name")
-                    .prefetch_related("recipe_items__inventory_item")
-                )
-                available_map = compute_available_quantities(products)
-
-                products_payload = []
-                for p in products:
-                    # ja nav receptes – nerādam klientam
-                    if p.id not in recipe_ids:
-                        continue
-                    available_qty = available_map.get(p.id, 0)
-                    # Atklāt tikai tos produktus, kurus faktiski var ražot tagad
-                    if available_qty <= 0:
-                        continue
-                    products_payload.append(
-                        {
-                            "id": p.id,
-                            "name": p.name,
-                            "price": str(p.price),
-                            "is_available": p.is_available,
-                            "available_quantity": available_qty,
-                            "photo": request.build_absolute_uri(p.photo.url) if p.photo else None,
-                        }
-                    )
-
-                data.append(
-                    {
-                        "id": cat.id,
-                        "name": cat.name,
-                        "description": cat.description,
-                        "products": products_payload,
-                    }
-                )
-            return Response(MenuPublicSerializer({"categories": data}, context={"request": request}).data, status=status.HTTP_200_OK)
+            return self._public_menu(request, company_id)
+
+        company = Company.objects.filter(id=company_id, deleted_at__isnull=True).first()
+        if not company:
+            raise NotFound("Uzņēmums nav atrasts.")
 
         # Uzņēmuma administrators
         if user.company_id != company_id:
@@ -96,7 +51,7 @@ class MenuView(APIView):
 
         categories = MenuCategory.objects.filter(company=company).order_by("name")
         products = list(
-            Product.objects.filter(company=company).order_by("name").prefetch_related("recipe_items__inventory_item")
+            Product.objects.filter(company=company).order_by("name")
         )
         available_map = compute_available_quantities(products)
 
@@ -117,6 +72,42 @@ class MenuView(APIView):
         }
         return Response(MenuAdminSerializer(admin_payload, context={"request": request}).data, status=status.HTTP_200_OK)
 
+    def _public_menu(self, request, company_id: int):
+        # Publiskā ēdienkarte tiek kešota pēc uzņēmuma ēdienkartes versijas (sk. cache.py)
+        version = get_menu_version(company_id)
+        entry = get_cached_menu(company_id, version)
+        if entry is None:
+            company = Company.objects.filter(id=company_id, deleted_at__isnull=True).first()
+            if not company:
+                raise NotFound("Uzņēmums nav atrasts.")
+            # Pārbauda, vai uzņēmums ir publiski pieejams
+            is_open = company.is_open_now()
+            entry = {"is_open": is_open, "categories": build_public_menu(company.id) if is_open else []}
+            set_cached_menu(company_id, version, entry)
+
+        if not entry["is_open"]:
+            raise PermissionDenied("Uzņēmuma ēdienkarte nav pieejama.")
+
+        etag = f'"menu-{company_id}-{version}"'
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        data = [
+            {
+                **cat,
+                "products": [
+                    {**p, "photo": request.build_absolute_uri(p["photo"]) if p["photo"] else None}
+                    for p in cat["products"]
+                ],
+            }
+            for cat in entry["categories"]
+        ]
+        return Response(
+            MenuPublicSerializer({"categories": data}, context={"request": request}).data,
+            status=status.HTTP_200_OK,
+            headers={"ETag": etag},
+        )
+
 class CategoryCreateView(APIView):
     """
     MENU_005: pievienot kategoriju
@@ -299,6 +290,8 @@ class ProductRecipeView(APIView):
         items = [RecipeItem(product=product, inventory_item_id=r["inventory_item_id"], amount=r["amount"]) for r in cleaned]
         if items:
             RecipeItem.objects.bulk_create(items)
+        # bulk_create nesūta signālus - pieejamību (un ēdienkartes versiju) atjaunojam paši
+        schedule_availability_refresh(product_ids=[product.id])
 
         recipe = RecipeItem.objects.filter(product=product).select_related("inventory_item").order_by("id")
         rows = [
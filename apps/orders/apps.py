@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.orders'
+
+    def ready(self):
+        # Groza kopsummu pārrēķins, mainoties produkta cenai (signāli)
+        from . import signals  # noqa: F401
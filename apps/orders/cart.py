@@ -0,0 +1,216 @@
+# apps/orders/cart.py
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils.module_loading import import_string
+
+from apps.menu.models import Product
+from .models import Cart, CartItem
+
+# Groza glabātuve (ORDER_001 / ORDER_008). Maināma ar settings.CART_STORE:
+#  - DatabaseCartStore (noklusējums): Cart / CartItem tabulas ar denormalizētām kopsummām;
+#  - CacheCartStore: atslēga-vērtība kešā (Redis / LocMem) ar TTL - grozs nonāk DB tikai kā Order (checkout).
+# Skats (CartView / CheckoutView) strādā tikai ar šo interfeisu.
+
+class CartStore(ABC):
+    @abstractmethod
+    def get_lines(self, user, company_id: int) -> dict[int, int]:
+        # product_id -> daudzums
+        ...
+
+    @abstractmethod
+    def get_view(self, user, company_id: int) -> dict:
+        # {"items": [{id, product_id, product_name, quantity, unit_price}], "total_amount": Decimal}
+        ...
+
+    @abstractmethod
+    def set_item(self, user, company_id: int, product: Product, quantity: int) -> Decimal:
+        # Pievieno produktu vai nomaina tā daudzumu; atgriež groza summu
+        ...
+
+    @abstractmethod
+    def remove_item(self, user, company_id: int, product_id: int) -> Decimal | None:
+        # Atgriež groza summu (None, ja groza nav)
+        ...
+
+    @abstractmethod
+    def clear(self, user, company_id: int):
+        # Izsauc checkout transakcijā; grozs pazūd tikai tad, ja transakcija tiek apstiprināta
+        ...
+
+def _view_row(item_id: int, product: Product, quantity: int) -> dict:
+    return {
+        "id": item_id,
+        "product_id": product.id,
+        "product_name": product.name,
+        "quantity": quantity,
+        "unit_price": product.price,
+    }
+
+class DatabaseCartStore(CartStore):
+    # Groza rinda tiek bloķēta, tāpēc paralēli pieprasījumi vienam grozam kopsummas nesabojā,
+    # un pēc izmaiņas nav jāpārlasa visas pozīcijas.
+
+    def _locked_cart(self, user, company_id: int, create: bool) -> Cart | None:
+        qs = Cart.objects.select_for_update()
+        if create:
+            return qs.get_or_create(user=user, company_id=company_id)[0]
+        return qs.filter(user=user, company_id=company_id).first()
+
+    def _apply_delta(self, cart: Cart, qty_delta: int, price: Decimal):
+        cart.item_count += qty_delta
+        cart.total_amount += price * qty_delta
+        cart.save(update_fields=["item_count", "total_amount", "updated_at"])
+
+    def get_lines(self, user, company_id: int) -> dict[int, int]:
+        return dict(
+            CartItem.objects.filter(cart__user=user, cart__company_id=company_id).values_list("product_id", "quantity")
+        )
+
+    def get_view(self, user, company_id: int) -> dict:
+        cart = Cart.objects.filter(user=user, company_id=company_id).first()
+        if cart is None:
+            return {"items": [], "total_amount": Decimal("0.00")}
+        items = cart.items.select_related("product").order_by("id")
+        return {
+            "items": [_view_row(item.id, item.product, item.quantity) for item in items],
+            "total_amount": cart.total_amount,
+        }
+
+    @transaction.atomic
+    def set_item(self, user, company_id: int, product: Product, quantity: int) -> Decimal:
+        cart = self._locked_cart(user, company_id, create=True)
+        # Cena tiek pārlasīta pēc groza bloķēšanas: skats produktu ielādēja agrāk, un paralēla cenas maiņa
+        # (recalculate_cart_totals) šo grozu vēl neredz, ja produkta tajā nebija
+        price = Product.objects.values_list("price", flat=True).get(pk=product.pk)
+        old_qty = CartItem.objects.filter(cart=cart, product=product).values_list("quantity", flat=True).first()
+        if old_qty is None:
+            CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+            old_qty = 0
+        elif old_qty != quantity:
+            CartItem.objects.filter(cart=cart, product=product).update(quantity=quantity)
+        if old_qty != quantity:
+            self._apply_delta(cart, quantity - old_qty, price)
+        return cart.total_amount
+
+    @transaction.atomic
+    def remove_item(self, user, company_id: int, product_id: int) -> Decimal | None:
+        cart = self._locked_cart(user, company_id, create=False)
+        if cart is None:
+            return None
+        row = CartItem.objects.filter(cart=cart, product_id=product_id).values_list("quantity", "product__price").first()
+        if row is not None:
+            CartItem.objects.filter(cart=cart, product_id=product_id).delete()
+            self._apply_delta(cart, -row[0], row[1])
+        return cart.total_amount
+
+    def clear(self, user, company_id: int):
+        Cart.objects.filter(user=user, company_id=company_id).delete()
+
+class CacheCartStore(CartStore):
+    """
+    Grozs kešā: {product_id: [daudzums, cena pievienošanas brīdī]} ar TTL (CART_TTL_SECONDS, atjaunojas pie izmaiņām).
+    Summa pie izmaiņām tiek rēķināta no saglabātajām cenām; get_view ielādē produktus un pārrēķina pēc
+    aktuālajām cenām (checkout vienmēr lieto aktuālās cenas). Lasīšana + rakstīšana nav atomāra - tas pats
+    lietotājs paralēlos pieprasījumos vienam grozam var pārrakstīt pēdējo izmaiņu.
+    Testiem un vienam procesam pietiek ar LocMemCache; vairākiem procesiem - kopīgs kešs (Redis).
+    """
+
+    def __init__(self, alias: str | None = None, ttl: int | None = None):
+        self._cache = caches[alias or getattr(settings, "CART_CACHE_ALIAS", "default")]
+        self._ttl = ttl or getattr(settings, "CART_TTL_SECONDS", 7 * 24 * 60 * 60)
+
+    def _key(self, user, company_id: int) -> str:
+        return f"cart:{user.pk}:{company_id}"
+
+    def _load(self, user, company_id: int) -> dict[int, list]:
+        return self._cache.get(self._key(user, company_id)) or {}
+
+    def _store(self, user, company_id: int, lines: dict[int, list]):
+        if lines:
+            self._cache.set(self._key(user, company_id), lines, self._ttl)
+        else:
+            self._cache.delete(self._key(user, company_id))
+
+    def _total(self, lines: dict[int, list]) -> Decimal:
+        return sum((Decimal(price) * qty for qty, price in lines.values()), Decimal("0.00"))
+
+    def get_lines(self, user, company_id: int) -> dict[int, int]:
+        return {pid: qty for pid, (qty, _) in self._load(user, company_id).items()}
+
+    def get_view(self, user, company_id: int) -> dict:
+        lines = self._load(user, company_id)
+        products = Product.objects.filter(company_id=company_id).in_bulk(lines.keys()) if lines else {}
+        # Dzēsti produkti izkrīt; cenas tiek atjaunotas uz aktuālajām
+        fresh = {pid: [qty, str(products[pid].price)] for pid, (qty, _) in lines.items() if pid in products}
+        if fresh != lines:
+            self._store(user, company_id, fresh)
+        return {
+            "items": [_view_row(pid, products[pid], qty) for pid, (qty, _) in fresh.items()],
+            "total_amount": self._total(fresh),
+        }
+
+    def set_item(self, user, company_id: int, product: Product, quantity: int) -> Decimal:
+        lines = self._load(user, company_id)
+        lines[product.id] = [quantity, str(product.price)]
+        self._store(user, company_id, lines)
+        return self._total(lines)
+
+    def remove_item(self, user, company_id: int, product_id: int) -> Decimal | None:
+        lines = self._load(user, company_id)
+        if not lines:
+            return None
+        lines.pop(product_id, None)
+        self._store(user, company_id, lines)
+        return self._total(lines)
+
+    def clear(self, user, company_id: int):
+        key = self._key(user, company_id)
+        transaction.on_commit(lambda: self._cache.delete(key))
+
+_store: CartStore | None = None
+_store_lock = threading.Lock()
+
+def get_cart_store() -> CartStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(getattr(settings, "CART_STORE", "apps.orders.cart.DatabaseCartStore"))()
+    return _store
+
+def recalculate_cart_totals(product_ids: Iterable[int] | None = None, cart_ids: Iterable[int] | None = None) -> int:
+    """
+    Pārrēķina DB grozu kopsummas no pozīcijām ar vienu UPDATE (grozi, kuros ir kāds no product_ids, vai norādītie
+    cart_ids; bez filtriem - visi). Atgriež atjaunināto grozu skaitu.
+    """
+    items = CartItem.objects.filter(cart_id=OuterRef("pk")).values("cart_id")
+    count = items.annotate(n=Sum("quantity")).values("n")
+    total = items.annotate(
+        s=Sum(
+            ExpressionWrapper(
+                F("quantity") * F("product__price"), output_field=DecimalField(max_digits=12, decimal_places=2)
+            )
+        )
+    ).values("s")
+
+    qs = Cart.objects.all()
+    if product_ids is not None:
+        qs = qs.filter(id__in=CartItem.objects.filter(product_id__in=set(product_ids)).values("cart_id"))
+    if cart_ids is not None:
+        qs = qs.filter(id__in=set(cart_ids))
+    return qs.update(
+        item_count=Coalesce(Subquery(count), Value(0), output_field=IntegerField()),
+        total_amount=Coalesce(
+            Subquery(total), Value(Decimal("0")), output_field=DecimalField(max_digits=12, decimal_places=2)
+        ),
+    )
@@ -0,0 +1,213 @@
+# apps/orders/events.py
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils.module_loading import import_string
+from psycopg import sql
+
+from .serializers import OrderKanbanSerializer
+
+# Pasūtījumu notikumi reāllaika Kanban plūsmai (ORDER_009, SSE).
+# Kanāls = uzņēmums; notikumi: created, status_changed, canceled (+ resync, ja klients atpaliek).
+# Brokeris ir maināms (settings.ORDER_EVENTS_BROKER):
+#  - InProcessBroker (noklusējums): tikai viena procesa ietvaros (viens uvicorn process, sk. docker-compose.yml);
+#  - PostgresBroker: vairāki procesi / serveri - notikumi caur Postgres LISTEN/NOTIFY.
+
+logger = logging.getLogger(__name__)
+
+EVENT_CREATED = "created"
+EVENT_STATUS_CHANGED = "status_changed"
+EVENT_CANCELED = "canceled"
+EVENT_RESYNC = "resync"
+
+_event_ids = itertools.count(1)
+
+class Subscription(ABC):
+    # Viena klienta abonements; get() atgriež None, ja timeout laikā nav notikumu (heartbeat)
+    @abstractmethod
+    async def get(self, timeout: float) -> dict | None: ...
+
+    @abstractmethod
+    def close(self): ...
+
+class OrderEventBroker(ABC):
+    @abstractmethod
+    def publish(self, channel: str, message: dict):
+        # Drīkst izsaukt no sinhronā koda (jebkurā pavedienā)
+        ...
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> Subscription:
+        # Izsauc no asinhronā koda (notikumu cilpā, kurā tiks lasīts abonements)
+        ...
+
+class _QueueSubscription(Subscription):
+    def __init__(self, broker: "InProcessBroker", channel: str, max_queue: int):
+        self._broker = broker
+        self._channel = channel
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def push(self, message: dict):
+        try:
+            self._loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # Notikumu cilpa jau aizvērta (klients atvienojies bez close)
+            self.close()
+
+    def _put(self, message: dict):
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Lēns klients: izmetam uzkrāto un liekam pārlādēt Kanban (GET) - atmiņa paliek ierobežota
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait({"id": next(_event_ids), "event": EVENT_RESYNC, "order": None})
+
+    async def get(self, timeout: float) -> dict | None:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self._broker._unsubscribe(self._channel, self)
+
+class InProcessBroker(OrderEventBroker):
+    def __init__(self, max_queue: int | None = None):
+        self._max_queue = max_queue or getattr(settings, "ORDER_EVENTS_MAX_QUEUE", 100)
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, set[_QueueSubscription]] = {}
+
+    def publish(self, channel: str, message: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for sub in subscribers:
+            sub.push(message)
+
+    def subscribe(self, channel: str) -> Subscription:
+        sub = _QueueSubscription(self, channel, self._max_queue)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(sub)
+        return sub
+
+    def _unsubscribe(self, channel: str, sub: _QueueSubscription):
+        with self._lock:
+            subs = self._subscribers.get(channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[channel]
+
+    def subscriber_count(self, channel: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+# Postgres NOTIFY ziņas garuma ierobežojums ir 8000 baitu
+PG_NOTIFY_MAX_BYTES = 7900
+
+class PostgresBroker(InProcessBroker):
+    """
+    Vairāku procesu brokeris: publish() -> pg_notify(ORDER_EVENTS_PG_CHANNEL, {"channel", "message"}).
+    Katrā procesā viens fona pavediens ar atsevišķu DB savienojumu klausās (LISTEN) un nodod notikumus šī procesa
+    abonentiem. Pēc (atkārtotas) pieslēgšanās visiem abonentiem tiek nosūtīts resync - notikumi varēja pazust.
+    """
+
+    def __init__(self, max_queue: int | None = None, pg_channel: str | None = None):
+        super().__init__(max_queue)
+        self._pg_channel = pg_channel or getattr(settings, "ORDER_EVENTS_PG_CHANNEL", "order_events")
+        self._listener: threading.Thread | None = None
+        self._listening = threading.Event()
+        self._stopped = threading.Event()
+
+    def publish(self, channel: str, message: dict):
+        payload = json.dumps({"channel": channel, "message": message}, cls=DjangoJSONEncoder)
+        if len(payload.encode()) > PG_NOTIFY_MAX_BYTES:
+            # Pārāk liels notikums - klienti pārlādē Kanban paši
+            resync = {"id": message["id"], "event": EVENT_RESYNC, "order": None}
+            payload = json.dumps({"channel": channel, "message": resync})
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self._pg_channel, payload])
+
+    def subscribe(self, channel: str) -> Subscription:
+        self._start_listener()
+        return super().subscribe(channel)
+
+    def close(self):
+        # Aptur klausītāju (testi / procesa beigas)
+        self._stopped.set()
+        if self._listener is not None:
+            self._listener.join()
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="order-events-listener", daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        while not self._stopped.is_set():
+            conn = connections.create_connection(DEFAULT_DB_ALIAS)
+            try:
+                conn.ensure_connection()
+                raw = conn.connection
+                raw.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self._pg_channel)))
+                self._listening.set()
+                self._resync_all()
+                while not self._stopped.is_set():
+                    for notify in raw.notifies(timeout=1.0):
+                        self._dispatch(notify.payload)
+            except Exception:
+                logger.exception("Pasūtījumu notikumu klausītājs atvienojās, pieslēdzas atkārtoti")
+                time.sleep(1)
+            finally:
+                self._listening.clear()
+                conn.close()
+
+    def _dispatch(self, payload: str):
+        data = json.loads(payload)
+        InProcessBroker.publish(self, data["channel"], data["message"])
+
+    def _resync_all(self):
+        with self._lock:
+            channels = list(self._subscribers)
+        for channel in channels:
+            InProcessBroker.publish(self, channel, {"id": next(_event_ids), "event": EVENT_RESYNC, "order": None})
+
+_broker: OrderEventBroker | None = None
+_broker_lock = threading.Lock()
+
+def get_broker() -> OrderEventBroker:
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(
+                    getattr(settings, "ORDER_EVENTS_BROKER", "apps.orders.events.InProcessBroker")
+                )()
+    return _broker
+
+def company_channel(company_id: int) -> str:
+    return f"company:{company_id}"
+
+def publish_order_event(order, event: str):
+    """
+    Nosūta pasūtījuma notikumu uzņēmuma kanālā pēc transakcijas commit
+    (atceltas transakcijas notikumi netiek nosūtīti).
+    """
+    # Tie paši lauki kā Kanban sarakstā - klients var atjaunināt karti bez papildu GET
+    payload = dict(OrderKanbanSerializer(order).data)
+    channel = company_channel(order.company_id)
+    transaction.on_commit(
+        lambda: get_broker().publish(channel, {"id": next(_event_ids), "event": event, "order": payload})
+    )
@@ -0,0 +1,80 @@
+# apps/orders/idempotency.py
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+# Idempotency-Key galvene (ORDER_008): klients atkārtotam POST padod to pašu atslēgu.
+# Ieraksts tiek izveidots pieprasījuma transakcijā, tāpēc:
+#  - veiksmīga atbilde tiek saglabāta kopā ar pasūtījumu un atkārtojumam tiek atgriezta bez atkārtotas apstrādes;
+#  - paralēls pieprasījums ar to pašu atslēgu gaida uz unikālā indeksa, līdz pirmais beidzas, un saņem tā atbildi;
+#  - kļūdas gadījumā (rollback) ieraksts pazūd un atkārtojums tiek apstrādāts no jauna.
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+def _request_hash(data) -> str:
+    raw = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def get_idempotency_key(request) -> str | None:
+    key = request.headers.get(HEADER, "").strip()
+    if not key:
+        return None
+    if len(key) > MAX_KEY_LENGTH:
+        raise ValidationError({"code": "P_010", "detail": f"{HEADER} ir pārāk gara."})
+    return key
+
+def begin(user, key: str, data) -> tuple[IdempotencyKey, Response | None]:
+    """
+    Jāizsauc transakcijā. Atgriež (ieraksts, saglabātā atbilde vai None).
+    Ja atbilde ir None, izsaucējs apstrādā pieprasījumu un izsauc complete().
+    """
+    request_hash = _request_hash(data)
+    now = timezone.now()
+    expires_at = now + timedelta(hours=getattr(settings, "IDEMPOTENCY_KEY_TTL_HOURS", 24))
+    record, created = IdempotencyKey.objects.get_or_create(
+        user=user, key=key, defaults={"request_hash": request_hash, "expires_at": expires_at}
+    )
+    if created:
+        return record, None
+
+    if record.expires_at <= now:
+        # Beigusies atslēga (vēl nav izdzēsta) - izmantojam no jauna
+        record.request_hash = request_hash
+        record.response_status = None
+        record.response_body = None
+        record.expires_at = expires_at
+        record.save(update_fields=["request_hash", "response_status", "response_body", "expires_at"])
+        return record, None
+
+    if record.request_hash != request_hash:
+        raise ValidationError({"code": "P_010", "detail": f"{HEADER} jau izmantota ar citiem pieprasījuma datiem."})
+    return record, Response(record.response_body, status=record.response_status, headers={"Idempotent-Replayed": "true"})
+
+def complete(record: IdempotencyKey, response: Response) -> Response:
+    record.response_status = response.status_code
+    record.response_body = response.data
+    record.save(update_fields=["response_status", "response_body"])
+    return response
+
+def purge_expired(batch_size: int = 1000) -> int:
+    """
+    Dzēš beigušās atslēgas porcijās (expires_at indekss). Atgriež izdzēsto skaitu.
+    """
+    deleted = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,207 @@
+# apps/orders/kitchen.py
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+
+from .models import Order, OrderStatusEvent
+from .stats import STAGES
+
+# Virtuves noslodze (ORDER_011) un gaidīšanas laika novērtējums klientu ēdienkartei.
+# Skaitītāji tiek uzturēti kešā inkrementāli pēc katras statusa maiņas commit (record_kitchen_transition):
+#  - aktīvo pasūtījumu skaits pa statusiem (cache.incr / decr),
+#  - pabeigto pasūtījumu skaits pa minūtēm (caurlaidība),
+#  - pēdējie posmu ilgumi (ierobežots saraksts procentilēm).
+# Nolasīšana neveic DB vaicājumus; tikai ja keša vēl nav (vai beidzies KITCHEN_RESEED_SECONDS),
+# uzņēmuma stāvoklis vienreiz tiek ielasīts no DB (tas arī izlabo iespējamo skaitītāju nobīdi).
+
+ACTIVE_STATUSES = (Order.Status.NEW, Order.Status.IN_PROGRESS, Order.Status.READY)
+
+def _window_minutes() -> int:
+    return getattr(settings, "KITCHEN_WINDOW_MINUTES", 60)
+
+def _max_samples() -> int:
+    return getattr(settings, "KITCHEN_MAX_SAMPLES", 200)
+
+def _seeded_key(company_id: int) -> str:
+    return f"kitchen:seeded:{company_id}"
+
+def _count_key(company_id: int, status: str) -> str:
+    return f"kitchen:count:{company_id}:{status}"
+
+def _samples_key(company_id: int, stage: str) -> str:
+    return f"kitchen:samples:{company_id}:{stage}"
+
+def _done_key(company_id: int, minute: int) -> str:
+    return f"kitchen:done:{company_id}:{minute}"
+
+def _minute(ts: float) -> int:
+    return int(ts // 60)
+
+def _ttl() -> int:
+    # Skaitītāji dzīvo ilgāk par pārlasīšanas intervālu, lai starp pārlasīšanām tie neizkristu
+    return max(_window_minutes() * 60, getattr(settings, "KITCHEN_RESEED_SECONDS", 600)) * 2
+
+def _trim(samples: list, now: float) -> list:
+    cutoff = now - _window_minutes() * 60
+    return [s for s in samples if s[0] >= cutoff][-_max_samples():]
+
+def _seed(company_id: int):
+    """
+    Ielasa uzņēmuma virtuves stāvokli no DB (3 vaicājumi pa indeksiem) un saglabā kešā.
+    """
+    now = timezone.now()
+    since = now - timedelta(minutes=_window_minutes())
+    counts = dict(
+        Order.objects.filter(company_id=company_id, status__in=ACTIVE_STATUSES)
+        .values("status")
+        .annotate(n=Count("id"))
+        .values_list("status", "n")
+        .order_by()
+    )
+    events = (
+        OrderStatusEvent.objects.filter(
+            company_id=company_id,
+            to_status__in=STAGES.values(),
+            created_at__gte=since,
+            elapsed_seconds__isnull=False,
+        )
+        .order_by("created_at")
+        .values_list("to_status", "created_at", "elapsed_seconds")
+    )
+    samples = {stage: [] for stage in STAGES}
+    stage_by_status = {to_status: stage for stage, to_status in STAGES.items()}
+    for to_status, created_at, elapsed in events:
+        samples[stage_by_status[to_status]].append((created_at.timestamp(), elapsed))
+    done = (
+        OrderStatusEvent.objects.filter(company_id=company_id, to_status=Order.Status.DONE, created_at__gte=since)
+        .annotate(m=TruncMinute("created_at"))
+        .values("m")
+        .annotate(n=Count("id"))
+        .values_list("m", "n")
+        .order_by()
+    )
+
+    ttl = _ttl()
+    ts = now.timestamp()
+    values = {_count_key(company_id, s): counts.get(s, 0) for s in ACTIVE_STATUSES}
+    values.update({_samples_key(company_id, stage): _trim(rows, ts) for stage, rows in samples.items()})
+    values.update({_done_key(company_id, _minute(m.timestamp())): n for m, n in done})
+    cache.set_many(values, ttl)
+    cache.set(_seeded_key(company_id), True, getattr(settings, "KITCHEN_RESEED_SECONDS", 600))
+
+def is_cached(company_id: int) -> bool:
+    return bool(cache.get(_seeded_key(company_id)))
+
+def _incr(key: str, delta: int) -> bool:
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Atslēga izkritusi no keša - stāvoklis nav pilnīgs, nākamā nolasīšana to ielasīs no jauna
+        return False
+    return True
+
+def record_kitchen_transition(company_id: int, from_status: str, to_status: str, elapsed_seconds: float | None):
+    """
+    Papildina keša skaitītājus ar vienu statusa maiņu (izsauc pēc transakcijas commit).
+    Ja uzņēmuma stāvoklis vēl nav kešā, neko nedara - nākamā nolasīšana to ielasīs no DB, ieskaitot šo maiņu.
+    """
+    if not is_cached(company_id):
+        return
+    ok = True
+    if from_status in ACTIVE_STATUSES:
+        ok &= _incr(_count_key(company_id, from_status), -1)
+    if to_status in ACTIVE_STATUSES:
+        ok &= _incr(_count_key(company_id, to_status), 1)
+
+    now = time.time()
+    if to_status == Order.Status.DONE:
+        key = _done_key(company_id, _minute(now))
+        if not cache.add(key, 1, _ttl()):
+            ok &= _incr(key, 1)
+
+    stage = next((s for s, st in STAGES.items() if st == to_status), None)
+    if stage and elapsed_seconds is not None:
+        # Lasīšana + rakstīšana nav atomāra: paralēlā maiņā var pazust viens paraugs (procentilēm nebūtiski)
+        key = _samples_key(company_id, stage)
+        samples = cache.get(key) or []
+        samples.append((now, elapsed_seconds))
+        cache.set(key, _trim(samples, now), _ttl())
+
+    if not ok:
+        cache.delete(_seeded_key(company_id))
+
+def _percentile(values: list[float], p: float) -> float | None:
+    # Lineārā interpolācija (tāpat kā PostgreSQL percentile_cont)
+    if not values:
+        return None
+    values = sorted(values)
+    pos = (len(values) - 1) * p
+    lower = int(pos)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (pos - lower)
+
+def kitchen_load(company_id: int) -> dict:
+    """
+    Pašreizējā virtuves noslodze: aktīvie pasūtījumi pa statusiem, posmu p50/p95 slīdošajā logā,
+    pabeigtie pasūtījumi stundā un jauna pasūtījuma gaidīšanas novērtējums (sekundēs).
+    """
+    if not is_cached(company_id):
+        _seed(company_id)
+
+    now = time.time()
+    window = _window_minutes()
+    current = _minute(now)
+    minutes = range(current - window + 1, current + 1)
+    keys = (
+        [_count_key(company_id, s) for s in ACTIVE_STATUSES]
+        + [_samples_key(company_id, stage) for stage in STAGES]
+        + [_done_key(company_id, m) for m in minutes]
+    )
+    data = cache.get_many(keys)
+
+    counts = {s: max(0, data.get(_count_key(company_id, s), 0)) for s in ACTIVE_STATUSES}
+    stages = {}
+    for stage in STAGES:
+        elapsed = [e for _, e in _trim(data.get(_samples_key(company_id, stage), []), now)]
+        stages[stage] = {
+            "count": len(elapsed),
+            "p50": _percentile(elapsed, 0.5),
+            "p95": _percentile(elapsed, 0.95),
+        }
+    done = sum(data.get(_done_key(company_id, m), 0) for m in minutes)
+    orders_per_hour = round(done * 60 / window, 1)
+
+    return {
+        "window_minutes": window,
+        "active": counts,
+        "stages": stages,
+        "orders_per_hour": orders_per_hour,
+        "estimated_wait_seconds": _estimate_wait(counts, stages, orders_per_hour),
+    }
+
+def _estimate_wait(counts: dict, stages: dict, orders_per_hour: float) -> float | None:
+    """
+    Jauna pasūtījuma gaidīšana līdz "Gatavs": rindas laiks + pagatavošanas p50.
+    Rindas laiks = lielākais no vēsturiskā rindas p50 un laika, kas vajadzīgs pašreizējās rindas (NEW) apstrādei
+    ar pašreizējo caurlaidību.
+    """
+    queue_p50 = stages["queue"]["p50"]
+    prep_p50 = stages["prep"]["p50"]
+    if queue_p50 is None and prep_p50 is None:
+        return None
+    queue = queue_p50 or 0
+    if orders_per_hour:
+        queue = max(queue, counts[Order.Status.NEW] * 3600 / orders_per_hour)
+    return round(queue + (prep_p50 or 0))
+
+def public_wait_estimate(company_id: int) -> dict:
+    # Klientu ēdienkartei - tikai novērtējums (bez iekšējiem skaitītājiem)
+    load = kitchen_load(company_id)
+    return {"estimated_wait_seconds": load["estimated_wait_seconds"], "active_orders": sum(load["active"].values())}
@@ -0,0 +1,14 @@
+# apps/orders/management/commands/expire_inventory_holds.py
+from django.core.management.base import BaseCommand
+
+from apps.orders.services import expire_inventory_reservations
+
+class Command(BaseCommand):
+    help = "Atbrīvo noliktavas rezervācijas (holds), kurām beidzies termiņš. Palaist periodiski (cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        released = expire_inventory_reservations(batch_size=options["batch_size"])
+        self.stdout.write(f"Atbrīvotas rezervācijas: {released}")
@@ -0,0 +1,14 @@
+# apps/orders/management/commands/purge_idempotency_keys.py
+from django.core.management.base import BaseCommand
+
+from apps.orders.idempotency import purge_expired
+
+class Command(BaseCommand):
+    help = "Dzēš beigušās Idempotency-Key atslēgas (checkout). Palaist periodiski (cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(batch_size=options["batch_size"])
+        self.stdout.write(f"Izdzēstas atslēgas: {deleted}")
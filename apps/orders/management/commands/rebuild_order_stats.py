@@ -0,0 +1,21 @@
+# apps/orders/management/commands/rebuild_order_stats.py
+from django.core.management.base import BaseCommand
+
+from apps.companies.models import Company
+from apps.orders.stats import rebuild_order_stats
+
+class Command(BaseCommand):
+    help = "Pārrēķina pasūtījumu statistikas dienas kopsavilkumus no pasūtījumu vēstures (sākotnējā aizpilde)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, help="Tikai norādītajam uzņēmumam (ID)")
+
+    def handle(self, *args, **options):
+        company_ids = Company.objects.order_by("id").values_list("id", flat=True)
+        if options["company"]:
+            company_ids = company_ids.filter(id=options["company"])
+
+        # Katrs uzņēmums savā transakcijā, lai neturētu slēdzenes uz visu tabulu
+        for company_id in company_ids:
+            days = rebuild_order_stats(company_id)
+            self.stdout.write(f"Uzņēmums {company_id}: {days} dienas")
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_delete_companyworkinghour'),
+        ('menu', '0004_productavailability'),
+        ('orders', '0002_remove_order_client_remove_order_last_modified_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('canceled_count', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_daily_stats', to='companies.company')),
+            ],
+            options={
+                'unique_together': {('company', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_daily_stats', to='companies.company')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='menu.product')),
+            ],
+            options={
+                'unique_together': {('company', 'day', 'product')},
+            },
+        ),
+    ]
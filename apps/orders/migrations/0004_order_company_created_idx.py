@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0004_company_time_zone'),
+        ('orders', '0003_order_daily_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['company', 'created_at'], name='order_company_created_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:02
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_updated_at(apps, schema_editor):
+    # Esošajiem pasūtījumiem pēdējā zināmā izmaiņa = pabeigšana vai izveide
+    Order = apps.get_model("orders", "Order")
+    Order.objects.update(updated_at=Coalesce("completed_at", "created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_company_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['company', 'status', 'created_at'], name='order_company_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['company', 'updated_at'], name='order_company_updated_idx'),
+        ),
+    ]
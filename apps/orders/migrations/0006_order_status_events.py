@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_status_changed_at(apps, schema_editor):
+    # Precīzs laiks nav zināms - pēdējā zināmā izmaiņa (pabeigšana vai izveide)
+    Order = apps.get_model("orders", "Order")
+    Order.objects.update(status_changed_at=Coalesce("completed_at", "created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0004_company_time_zone'),
+        ('orders', '0005_order_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='status_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(fill_status_changed_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='OrderStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('NEW', 'Jauns'), ('INP', 'Tiek gatavots'), ('RDY', 'Gatavs'), ('DON', 'Pabeigts'), ('CAN', 'Atcelts')], max_length=3)),
+                ('to_status', models.CharField(choices=[('NEW', 'Jauns'), ('INP', 'Tiek gatavots'), ('RDY', 'Gatavs'), ('DON', 'Pabeigts'), ('CAN', 'Atcelts')], max_length=3)),
+                ('elapsed_seconds', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='order_status_events', to=settings.AUTH_USER_MODEL)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_status_events', to='companies.company')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='orders.order')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'to_status', 'created_at'], name='orders_orde_company_6aa510_idx')],
+            },
+        ),
+    ]
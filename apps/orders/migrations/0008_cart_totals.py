@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:07
+
+from django.db import migrations, models
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_cart_totals(apps, schema_editor):
+    Cart = apps.get_model("orders", "Cart")
+    CartItem = apps.get_model("orders", "CartItem")
+    items = CartItem.objects.filter(cart_id=OuterRef("pk")).values("cart_id")
+    line = ExpressionWrapper(F("quantity") * F("product__price"), output_field=DecimalField(max_digits=12, decimal_places=2))
+    Cart.objects.update(
+        item_count=Coalesce(Subquery(items.annotate(n=Sum("quantity")).values("n")), Value(0)),
+        total_amount=Coalesce(
+            Subquery(items.annotate(s=Sum(line)).values("s")),
+            Value(0),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(fill_cart_totals, migrations.RunPython.noop),
+    ]
@@ -7,6 +7,9 @@ class Cart(models.Model):
     # Grozs ir piesaistīts klientam un uzņēmumam
     user = models.ForeignKey("accounts.User", on_delete=models.CASCADE, related_name="carts")
     company = models.ForeignKey("companies.Company", on_delete=models.CASCADE, related_name="carts")
+    # Denormalizētas kopsummas: tiek mainītas kopā ar pozīcijām (cart.py) un pārrēķinātas, mainoties produkta cenai
+    item_count = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -58,6 +61,20 @@ class Order(models.Model):
 
     created_at = models.DateTimeField(default=timezone.now, editable=False)
     completed_at = models.DateTimeField(null=True, blank=True)
+    # Pēdējās izmaiņas laiks (Kanban ?since=); saglabājot ar update_fields, tas jānorāda sarakstā
+    updated_at = models.DateTimeField(auto_now=True)
+    # Kad pasūtījums nonāca pašreizējā statusā (laiks statusā, OrderStatusEvent.elapsed_seconds)
+    status_changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # Uzņēmuma pasūtījumi laika intervālā (statistika, kanban) bez visas vēstures skenēšanas
+        indexes = [
+            models.Index(fields=["company", "created_at"], name="order_company_created_idx"),
+            models.Index(fields=["company", "status", "created_at"], name="order_company_status_idx"),
+            models.Index(fields=["company", "updated_at"], name="order_company_updated_idx"),
+            # Kanban pabeigto / atcelto logs (status IN (DONE, CANCELED), completed_at >= ...)
+            models.Index(fields=["company", "status", "completed_at"], name="order_company_completed_idx"),
+        ]
 
     def set_status(self, new_status: str):
         # Statusa maiņas noteikumi (ORDER_005)
@@ -94,3 +111,68 @@ class OrderItem(models.Model):
             raise ValidationError("Daudzumam jābūt pozitīvam.")
         if self.unit_price <= 0:
             raise ValidationError("Cenai jābūt pozitīvai.")
+
+class OrderStatusEvent(models.Model):
+    # Statusa maiņu audits: katra pāreja tiek ierakstīta tajā pašā transakcijā, kurā mainās statuss.
+    # elapsed_seconds = cik ilgi pasūtījums bija iepriekšējā statusā (NEW->INP: gaidīšana rindā,
+    # INP->RDY: pagatavošana, RDY->DON: izsniegšana); izveides ierakstam - None.
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="status_events")
+    company = models.ForeignKey("companies.Company", on_delete=models.CASCADE, related_name="order_status_events")
+    from_status = models.CharField(max_length=3, choices=Order.Status.choices, blank=True)
+    to_status = models.CharField(max_length=3, choices=Order.Status.choices)
+    elapsed_seconds = models.FloatField(null=True, blank=True)
+    changed_by = models.ForeignKey(
+        "accounts.User", null=True, blank=True, on_delete=models.SET_NULL, related_name="order_status_events"
+    )
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["company", "to_status", "created_at"])]
+
+    def __str__(self):
+        return f"Order {self.order_id}: {self.from_status or '-'} -> {self.to_status}"
+
+class OrderDailyStats(models.Model):
+    # Dienas kopsavilkums (rollup) statistikai: tiek papildināts, kad pasūtījums kļūst Pabeigts vai Atcelts.
+    # Diena = pasūtījuma izveides datums (settings.TIME_ZONE), tāpat kā iepriekšējā sales_by_day grafikā.
+    company = models.ForeignKey("companies.Company", on_delete=models.CASCADE, related_name="order_daily_stats")
+    day = models.DateField()
+    orders_count = models.PositiveIntegerField(default=0)  # pabeigtie pasūtījumi
+    canceled_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("company", "day")
+
+    def __str__(self):
+        return f"{self.company_id} {self.day}: {self.orders_count} / {self.revenue}"
+
+class ProductDailyStats(models.Model):
+    # Pārdotais produkta daudzums dienā (tikai pabeigtie pasūtījumi)
+    company = models.ForeignKey("companies.Company", on_delete=models.CASCADE, related_name="product_daily_stats")
+    product = models.ForeignKey("menu.Product", on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+    quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("company", "day", "product")
+
+    def __str__(self):
+        return f"{self.company_id} {self.day} product={self.product_id}: {self.quantity}"
+
+class IdempotencyKey(models.Model):
+    # Idempotency-Key ieraksts (ORDER_008): atkārtots pieprasījums ar to pašu atslēgu saņem saglabāto atbildi.
+    # Tiek izveidots tajā pašā transakcijā kā pasūtījums; beigušos dzēš `manage.py purge_idempotency_keys`.
+    user = models.ForeignKey("accounts.User", on_delete=models.CASCADE, related_name="idempotency_keys")
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+    def __str__(self):
+        return f"{self.user_id}:{self.key} -> {self.response_status}"
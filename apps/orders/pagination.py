@@ -0,0 +1,49 @@
+# apps/orders/pagination.py
+import base64
+from datetime import datetime
+
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+# Keyset (kursora) lapošana pēc (created_at, id) dilstošā secībā: katra lapa ir viens indeksa diapazons,
+# tāpēc ātrums nav atkarīgs no tā, cik tālu lapots (atšķirībā no OFFSET).
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_raw, pk_raw = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        created_at = parse_datetime(created_raw)
+        pk = int(pk_raw)
+    except (ValueError, UnicodeDecodeError):
+        created_at = None
+    if created_at is None:
+        raise ValidationError({"code": "P_010", "detail": "Nederīgs lapošanas kursors."})
+    return created_at, pk
+
+def parse_limit(value, default: int, maximum: int, name: str = "limit") -> int:
+    if value in (None, ""):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({"code": "P_010", "detail": f"Nederīgs {name}."})
+    return max(1, min(limit, maximum))
+
+def keyset_page(qs: QuerySet, cursor: str | None, limit: int) -> tuple[list, str | None]:
+    """
+    Atgriež (lapas objekti, nākamās lapas kursors vai None). Ielādē limit + 1 rindu, lai zinātu, vai ir nākamā lapa.
+    """
+    qs = qs.order_by("-created_at", "-id")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    rows = list(qs[: limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
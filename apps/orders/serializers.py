@@ -1,7 +1,13 @@
 # apps/orders/serializers.py
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import serializers
 from apps.menu.models import Product
-from .models import Cart, CartItem, Order, OrderItem
+from .models import Order, OrderItem
 
 class CartItemInputSerializer(serializers.Serializer):
     # Ievadei grozam: produkts + daudzums
@@ -13,13 +19,13 @@ class CartItemInputSerializer(serializers.Serializer):
             raise serializers.ValidationError("Daudzumam jābūt pozitīvam.")
         return value
 
-class CartItemViewSerializer(serializers.ModelSerializer):
-    product_name = serializers.CharField(source="product.name", read_only=True)
-    unit_price = serializers.DecimalField(source="product.price", max_digits=12, decimal_places=2, read_only=True)
-
-    class Meta:
-        model = CartItem
-        fields = ["id", "product_id", "product_name", "quantity", "unit_price"]
+class CartItemViewSerializer(serializers.Serializer):
+    # Groza pozīcija no glabātuves (cart.py) - neatkarīgi no tā, vai grozs ir DB vai kešā
+    id = serializers.IntegerField()
+    product_id = serializers.IntegerField()
+    product_name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    unit_price = serializers.DecimalField(max_digits=12, decimal_places=2)
 
 class CartViewSerializer(serializers.Serializer):
     # Groza skatam: items + total
@@ -52,12 +58,92 @@ class OrderClientSerializer(serializers.ModelSerializer):
             "items", "total_amount", "order_type", "notes",
         ]
 
+class OrderClientSummarySerializer(serializers.ModelSerializer):
+    # ORDER_003 (?summary=1): saraksta rinda bez pozīcijām; item_count = kopējais vienību skaits (anotācija)
+    company_name = serializers.CharField(source="company.name", read_only=True)
+    item_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ["id", "created_at", "company_name", "status", "total_amount", "order_type", "item_count"]
+
 class OrderKanbanSerializer(serializers.ModelSerializer):
     # ORDER_004: uzņēmuma Kanban skatam
     class Meta:
         model = Order
-        fields = ["id", "created_at", "order_type", "total_amount", "status"]
+        fields = ["id", "created_at", "completed_at", "updated_at", "order_type", "total_amount", "status"]
 
 class OrderStatusChangeSerializer(serializers.Serializer):
     # ORDER_005: mainīt statusu
     new_status = serializers.ChoiceField(choices=Order.Status.choices)
+    # Statuss, ko redzēja klients (Kanban kartīte); ja tas jau mainījies => 409
+    expected_status = serializers.ChoiceField(choices=Order.Status.choices, required=False)
+
+class OrderBulkStatusChangeSerializer(serializers.Serializer):
+    # ORDER_013: mainīt vairāku pasūtījumu statusu
+    order_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=settings.ORDER_BULK_MAX_ORDERS
+    )
+    new_status = serializers.ChoiceField(choices=Order.Status.choices)
+
+    def validate_order_ids(self, value):
+        # Dublikāti tiek apstrādāti vienreiz (secība saglabājas)
+        return list(dict.fromkeys(value))
+
+class OrderStatsQuerySerializer(serializers.Serializer):
+    # ORDER_007: statistikas intervāls. from/to - datums (vietējā diena, "to" ieskaitot) vai datums ar laiku.
+    # Laika josla: tz parametrs vai uzņēmuma time_zone (context["company_tz"]).
+    GRANULARITIES = ("hour", "day", "week", "month")
+    MAX_HOURLY_DAYS = 31
+    DEFAULT_DAYS = 7
+
+    date_from = serializers.CharField(required=False)
+    date_to = serializers.CharField(required=False)
+    granularity = serializers.ChoiceField(choices=GRANULARITIES, default="day")
+    tz = serializers.CharField(required=False)
+
+    def to_internal_value(self, data):
+        # Vaicājuma parametri ir "from" / "to" (Python atslēgvārds)
+        data = {
+            "date_from": data.get("from"),
+            "date_to": data.get("to"),
+            "granularity": data.get("granularity") or "day",
+            "tz": data.get("tz"),
+        }
+        return super().to_internal_value({k: v for k, v in data.items() if v not in (None, "")})
+
+    def validate_tz(self, value):
+        try:
+            return ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError("Nederīga laika josla.")
+
+    def _parse_bound(self, value: str, tz, end: bool) -> datetime:
+        try:
+            d = parse_date(value)
+            dt = None if d else parse_datetime(value)
+        except ValueError:
+            d = dt = None
+        if d is not None:
+            # Datums "to" ietver visu dienu => nākamās dienas sākums (neieskaitot)
+            if end:
+                d += timedelta(days=1)
+            return datetime.combine(d, time.min, tzinfo=tz)
+        if dt is None:
+            raise serializers.ValidationError("Datumam jābūt formātā YYYY-MM-DD vai ISO 8601.")
+        return dt if timezone.is_aware(dt) else timezone.make_aware(dt, tz)
+
+    def validate(self, attrs):
+        tz = attrs.get("tz") or self.context.get("company_tz") or ZoneInfo("UTC")
+        now = timezone.now()
+        start = self._parse_bound(attrs["date_from"], tz, end=False) if "date_from" in attrs else None
+        end = self._parse_bound(attrs["date_to"], tz, end=True) if "date_to" in attrs else now
+        if start is None:
+            # Pēc noklusējuma - pēdējās 7 vietējās dienas (ieskaitot šodienu)
+            local_today = timezone.localtime(end, tz).date()
+            start = datetime.combine(local_today - timedelta(days=self.DEFAULT_DAYS - 1), time.min, tzinfo=tz)
+        if start >= end:
+            raise serializers.ValidationError({"from": "Sākumam jābūt pirms beigām."})
+        if attrs["granularity"] == "hour" and end - start > timedelta(days=self.MAX_HOURLY_DAYS):
+            raise serializers.ValidationError({"granularity": f"Pa stundām - ne vairāk kā {self.MAX_HOURLY_DAYS} dienas."})
+        return {"start": start, "end": end, "granularity": attrs["granularity"], "tz": tz}
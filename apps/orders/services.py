@@ -1,52 +1,361 @@
 # apps/orders/services.py
+from collections import defaultdict
+from datetime import timedelta
 from decimal import Decimal
+from typing import Iterable
+
+from django.conf import settings
 from django.db import transaction
-from django.db.models import F
-from rest_framework.exceptions import ValidationError
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Case, DecimalField, F, Value, When
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
 
-from apps.inventory.models import InventoryItem
+from apps.inventory.ledger import record_movements
+from apps.inventory.models import InventoryItem, InventoryMovement, InventoryReservation
+from apps.inventory.transactions import atomic_with_retry
 from apps.menu.models import RecipeItem
-from .models import Order
+from apps.menu.services import (
+    available_stock,
+    check_cart_demand,
+    compute_ingredient_demand,
+    schedule_availability_refresh,
+)
+from .kitchen import record_kitchen_transition
+from .events import EVENT_CANCELED, EVENT_STATUS_CHANGED, publish_order_event
+from .models import Order, OrderItem, OrderStatusEvent
+from .stats import record_order_canceled, record_order_completed, record_orders_completed
+
+class OrderStatusConflict(APIException):
+    # Pasūtījuma statusu kopš nolasīšanas jau nomainījis cits pieprasījums (piem., otra planšete)
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Pasūtījuma statuss jau ir mainīts. Lūdzu, atjaunojiet sarakstu."
+    default_code = "order_status_conflict"
 
 @transaction.atomic
-def consume_inventory_for_order(order: Order):
+def consume_inventory_for_orders(orders: list[Order], user=None) -> dict[int, str]:
+    """
+    Noraksta noliktavas vienības pēc receptēm vairākiem viena uzņēmuma pasūtījumiem (kad tie kļūst 'Pabeigts').
+    Vaicājumu skaits nav atkarīgs no pasūtījumu / pozīciju / sastāvdaļu skaita: viena pozīciju un viena receptes
+    ielāde, viena bloķēšana (pēc ID secības), viens UPDATE ar CASE visām sastāvdaļām un viens žurnāla INSERT.
+    Pasūtījumi tiek pārbaudīti ID secībā pret atlikušo brīvo atlikumu; ja kādam nepietiek (vai produktam nav
+    receptes), tas netiek norakstīts. Atgriež noraidītos: order_id -> kļūdas teksts.
+    """
+    if not orders:
+        return {}
+    lines_by_order: dict[int, list[tuple[int, int]]] = defaultdict(list)
+    for order_id, product_id, qty in OrderItem.objects.filter(order_id__in=[o.id for o in orders]).values_list(
+        "order_id", "product_id", "quantity"
+    ):
+        lines_by_order[order_id].append((product_id, qty))
+    recipe_rows = list(
+        RecipeItem.objects.filter(
+            product_id__in={pid for lines in lines_by_order.values() for pid, _ in lines}
+        ).only("product_id", "inventory_item_id", "amount")
+    )
+
+    # Savācam katra pasūtījuma patēriņu: inventory_item_id -> daudzums
+    rejected: dict[int, str] = {}
+    demand_by_order: dict[int, dict[int, Decimal]] = {}
+    for order in orders:
+        demand, missing_recipe = compute_ingredient_demand(lines_by_order.get(order.id, []), recipe_rows)
+        if missing_recipe:
+            # Ja produktam nav receptes, tas ir datu integritātes pārkāpums
+            rejected[order.id] = "Produkts bez receptes. Nevar pabeigt pasūtījumu."
+        else:
+            demand_by_order[order.id] = demand
+    if not demand_by_order:
+        return rejected
+
+    # Lock noliktavas rindas (pēc ID secības), lai nebūtu race condition
+    free_map = available_stock(
+        {inv_id for demand in demand_by_order.values() for inv_id in demand}, lock=True, company_id=orders[0].company_id
+    )
+    # Pasūtījuma paša rezervācijas ir daļa no tā patēriņa, tās netiek atskaitītas
+    holds_by_order: dict[int, dict[int, Decimal]] = defaultdict(dict)
+    for order_id, inv_id, amount in InventoryReservation.objects.filter(order_id__in=demand_by_order.keys()).values_list(
+        "order_id", "inventory_item_id", "amount"
+    ):
+        holds_by_order[order_id][inv_id] = holds_by_order[order_id].get(inv_id, Decimal("0")) + amount
+
+    required: dict[int, Decimal] = {}
+    accepted: list[Order] = []
+    for order in orders:
+        demand = demand_by_order.get(order.id)
+        if demand is None:
+            continue
+        own_holds = holds_by_order.get(order.id, {})
+        # Pārbauda, vai visas nepieciešamās vienības eksistē un pietiek
+        if any(inv_id not in free_map for inv_id in demand):
+            rejected[order.id] = "Noliktavas vienība nav atrasta."
+            continue
+        if any(free_map[inv_id] + own_holds.get(inv_id, Decimal("0")) < need for inv_id, need in demand.items()):
+            rejected[order.id] = "Nepietiek noliktavas atlikuma pasūtījuma pabeigšanai."
+            continue
+        for inv_id, need in demand.items():
+            free_map[inv_id] += own_holds.get(inv_id, Decimal("0")) - need
+            required[inv_id] = required.get(inv_id, Decimal("0")) + need
+        accepted.append(order)
+
+    # Noraksta noliktavu ar vienu UPDATE; rezervācijas pārvēršas norakstīšanā
+    if required:
+        InventoryItem.objects.filter(id__in=required.keys()).update(quantity=F("quantity") - _consumption_case(required))
+    with_holds = [order for order in accepted if holds_by_order.get(order.id)]
+    if with_holds:
+        InventoryReservation.objects.filter(order__in=with_holds).delete()
+
+    # Žurnālā: norakstīšana + rezervāciju atbrīvošana (tās pārvērtās norakstīšanā)
+    record_movements(
+        [
+            InventoryMovement(
+                inventory_item_id=inv_id, kind=InventoryMovement.Kind.CONSUMPTION, quantity_change=-need,
+                order=order, created_by=user,
+            )
+            for order in accepted
+            for inv_id, need in demand_by_order[order.id].items()
+        ]
+        + [
+            InventoryMovement(
+                inventory_item_id=inv_id, kind=InventoryMovement.Kind.RELEASE, quantity_change=amount,
+                order=order, created_by=user,
+            )
+            for order in with_holds
+            for inv_id, amount in holds_by_order[order.id].items()
+        ]
+    )
+
+    # update() nesūta signālus - pārrēķinām to produktu pieejamību, kuri lieto norakstītās sastāvdaļas
+    # (tas nomaina arī publiskās ēdienkartes versiju)
+    if required:
+        schedule_availability_refresh(inventory_item_ids=required.keys())
+    return rejected
+
+def consume_inventory_for_order(order: Order, user=None):
     """
     Noraksta noliktavas vienības pēc pasūtījuma receptēm.
     Izpildām tikai tad, kad pasūtījums kļūst 'Pabeigts'.
     Ja noliktavā nepietiek - atgriež P_010 un neveic nekādas izmaiņas.
     """
-    # Savācam kopējo patēriņu: inventory_item_id -> total_amount_to_consume
-    required: dict[int, Decimal] = {}
+    rejected = consume_inventory_for_orders([order], user=user)
+    if rejected:
+        raise ValidationError({"code": "P_010", "detail": rejected[order.id]})
 
-    order_items = order.items.select_related("product").all()
+def _status_event(order: Order, old_status: str, user, now) -> OrderStatusEvent:
+    # Sagatavo audita ierakstu (nesaglabā) un pēc commit papildina virtuves noslodzes skaitītājus (kitchen.py)
+    elapsed = (now - order.status_changed_at).total_seconds() if old_status else None
+    order.status_changed_at = now
+    company_id, to_status = order.company_id, order.status
+    transaction.on_commit(lambda: record_kitchen_transition(company_id, old_status, to_status, elapsed))
+    return OrderStatusEvent(
+        order=order,
+        company_id=order.company_id,
+        from_status=old_status,
+        to_status=order.status,
+        elapsed_seconds=elapsed,
+        changed_by=user,
+        created_at=now,
+    )
 
-    for oi in order_items:
-        recipe_items = RecipeItem.objects.filter(product=oi.product).all()
-        if recipe_items.count() == 0:
-            # Ja produktam nav receptes, tas ir datu integritātes pārkāpums
-            raise ValidationError({"code": "P_010", "detail": "Produkts bez receptes. Nevar pabeigt pasūtījumu."})
+def record_status_event(order: Order, old_status: str, user=None):
+    """
+    Ieraksta statusa pāreju auditā (izsaucējs saglabā order tajā pašā transakcijā).
+    elapsed_seconds = laiks iepriekšējā statusā; order.status_changed_at tiek pārcelts uz šo brīdi.
+    """
+    now = order.completed_at if order.status in {Order.Status.DONE, Order.Status.CANCELED} else timezone.now()
+    if not old_status:
+        now = order.created_at
+    _status_event(order, old_status, user, now).save()
 
-        for ri in recipe_items:
-            need = (ri.amount * oi.quantity)  # amount per 1 product * quantity ordered
-            required[ri.inventory_item_id] = required.get(ri.inventory_item_id, Decimal("0")) + need
+def _save_status(order: Order, old_status: str):
+    """
+    Saglabā jauno statusu ar nosacītu UPDATE ... WHERE status = old_status (optimistiska konkurence).
+    Ja paralēls pieprasījums statusu jau nomainījis, UPDATE neskar nevienu rindu => OrderStatusConflict (409)
+    un transakcija tiek atcelta (arī audita ieraksts). Rindas slēdzene tiek turēta tikai no šī UPDATE līdz commit.
+    """
+    order.updated_at = timezone.now()
+    updated = Order.objects.filter(id=order.id, status=old_status).update(
+        status=order.status,
+        completed_at=order.completed_at,
+        status_changed_at=order.status_changed_at,
+        updated_at=order.updated_at,
+    )
+    if not updated:
+        raise OrderStatusConflict()
 
-    # Lock noliktavas rindas, lai nebūtu race condition
-    inv_qs = (
-        InventoryItem.objects
-        .select_for_update()
-        .filter(company_id=order.company_id, id__in=required.keys())
+@atomic_with_retry
+def change_order_status(order_id: int, new_status: str, user=None, expected_status: str | None = None) -> Order:
+    """
+    ORDER_005: statusa maiņa vienā transakcijā ar noliktavas norakstīšanu (Gatavs -> Pabeigts).
+    Pasūtījums tiek nolasīts no jauna katrā mēģinājumā, jo deadlock gadījumā transakcija tiek atkārtota.
+    expected_status - statuss, ko redzēja klients; ja tas vairs nav aktuāls => OrderStatusConflict.
+    """
+    order = Order.objects.get(id=order_id)
+    old_status = order.status
+    if expected_status and expected_status != old_status:
+        raise OrderStatusConflict()
+
+    # Validē secību (NEW->INP->RDY->DONE)
+    order.set_status(new_status)
+    record_status_event(order, old_status, user=user)
+    _save_status(order, old_status)
+
+    # Ja pāreja ir Gatavs -> Pabeigts, norakstām noliktavu un papildinām statistikas kopsavilkumus
+    # (tikai pēc veiksmīga nosacītā UPDATE, tāpēc paralēls dubults "Pabeigts" nenoraksta divreiz)
+    if old_status == Order.Status.READY and new_status == Order.Status.DONE:
+        consume_inventory_for_order(order, user=user)
+        record_order_completed(order)
+
+    publish_order_event(order, EVENT_STATUS_CHANGED)
+    return order
+
+@atomic_with_retry
+def bulk_change_order_status(company_id: int, order_ids: list[int], new_status: str, user=None) -> dict[int, dict]:
+    """
+    ORDER_013: vairāku pasūtījumu statusa maiņa vienā transakcijā.
+    Pasūtījumi tiek bloķēti (pēc ID secības) un validēti katrs atsevišķi; nederīgās pārejas un pasūtījumi, kuriem
+    nepietiek noliktavas, tiek izlaisti. Pārējiem - viens statusa UPDATE, viens audita INSERT un (-> Pabeigts)
+    kopēja noliktavas norakstīšana un statistika. Atgriež order_id -> {"ok": True} vai {"ok": False, "code", "detail"}.
+    """
+    results: dict[int, dict] = {}
+    orders = list(
+        Order.objects.select_for_update(of=("self",)).filter(company_id=company_id, id__in=set(order_ids)).order_by("id")
+    )
+    found = {order.id for order in orders}
+    for order_id in order_ids:
+        if order_id not in found:
+            results[order_id] = {"ok": False, "code": "P_010", "detail": "Pasūtījums nav atrasts."}
+
+    valid: list[tuple[Order, str]] = []
+    for order in orders:
+        old_status = order.status
+        try:
+            # Validē secību (NEW->INP->RDY->DONE)
+            order.set_status(new_status)
+        except DjangoValidationError as exc:
+            results[order.id] = {"ok": False, "code": "P_010", "detail": exc.messages[0]}
+            continue
+        valid.append((order, old_status))
+
+    if new_status == Order.Status.DONE:
+        rejected = consume_inventory_for_orders([order for order, _ in valid], user=user)
+        for order_id, detail in rejected.items():
+            results[order_id] = {"ok": False, "code": "P_010", "detail": detail}
+        valid = [(order, old_status) for order, old_status in valid if order.id not in rejected]
+    if not valid:
+        return results
+
+    now = timezone.now()
+    events = []
+    for order, old_status in valid:
+        if new_status == Order.Status.DONE:
+            order.completed_at = now
+        order.updated_at = now
+        events.append(_status_event(order, old_status, user, now))
+    OrderStatusEvent.objects.bulk_create(events)
+    changes = {"status": new_status, "status_changed_at": now, "updated_at": now}
+    if new_status == Order.Status.DONE:
+        changes["completed_at"] = now
+    Order.objects.filter(id__in=[order.id for order, _ in valid]).update(**changes)
+    if new_status == Order.Status.DONE:
+        record_orders_completed([order for order, _ in valid])
+
+    for order, _ in valid:
+        publish_order_event(order, EVENT_STATUS_CHANGED)
+        results[order.id] = {"ok": True}
+    return results
+
+@atomic_with_retry
+def cancel_order(order: Order, user=None):
+    # ORDER_002: atcelšana + rezervāciju atbrīvošana + statistika vienā transakcijā
+    old_status = order.status
+    order.status = Order.Status.CANCELED
+    order.completed_at = timezone.now()
+    record_status_event(order, old_status, user=user)
+    _save_status(order, old_status)
+    release_inventory_for_order(order)
+    record_order_canceled(order)
+    publish_order_event(order, EVENT_CANCELED)
+
+def _consumption_case(required: dict[int, Decimal]) -> Case:
+    # CASE id WHEN .. THEN need .. END - katrai sastāvdaļai savs norakstāmais daudzums
+    return Case(
+        *[When(id=inv_id, then=Value(need)) for inv_id, need in sorted(required.items())],
+        default=Value(Decimal("0")),
+        output_field=DecimalField(max_digits=12, decimal_places=3),
     )
 
-    inv_map = {x.id: x for x in inv_qs}
+def _hold_ttl() -> timedelta:
+    return timedelta(minutes=getattr(settings, "INVENTORY_HOLD_TTL_MINUTES", 120))
+
+@transaction.atomic
+def reserve_inventory_for_order(order: Order, lines: Iterable[tuple[int, int]]):
+    """
+    Noformēšanas brīdī rezervē (hold) sastāvdaļas visām pasūtījuma pozīcijām (product_id, quantity).
+    Noliktavas rindas tiek bloķētas pēc ID secības, tāpēc paralēli pasūtījumi nevar rezervēt vienu un to pašu atlikumu.
+    Ja nepietiek - P_010 (izsaucēja transakcija tiek atcelta).
+    """
+    demand, shortages = check_cart_demand(lines, lock=True)
+    if shortages:
+        raise ValidationError({"code": "P_010", "detail": "Nepietiek noliktavas atlikuma pasūtījumam."})
+
+    expires_at = timezone.now() + _hold_ttl()
+    InventoryReservation.objects.bulk_create(
+        [
+            InventoryReservation(order=order, inventory_item_id=inv_id, amount=amount, expires_at=expires_at)
+            for inv_id, amount in demand.items()
+        ]
+    )
+    record_movements(
+        InventoryMovement(
+            inventory_item_id=inv_id, kind=InventoryMovement.Kind.RESERVATION, quantity_change=-amount,
+            order=order, created_by_id=order.user_id,
+        )
+        for inv_id, amount in demand.items()
+    )
+    schedule_availability_refresh(inventory_item_ids=demand.keys())
 
-    # Pārbauda, vai visas nepieciešamās vienības eksistē un pietiek
-    for inv_id, need in required.items():
-        item = inv_map.get(inv_id)
-        if not item:
-            raise ValidationError({"code": "P_010", "detail": "Noliktavas vienība nav atrasta."})
-        if item.quantity < need:
-            raise ValidationError({"code": "P_010", "detail": "Nepietiek noliktavas atlikuma pasūtījuma pabeigšanai."})
+def release_inventory_for_order(order: Order):
+    # Atceļot pasūtījumu, rezervācijas tiek atbrīvotas
+    holds = list(order.inventory_reservations.values_list("inventory_item_id", "amount"))
+    if not holds:
+        return
+    order.inventory_reservations.all().delete()
+    record_movements(
+        InventoryMovement(
+            inventory_item_id=inv_id, kind=InventoryMovement.Kind.RELEASE, quantity_change=amount, order=order
+        )
+        for inv_id, amount in holds
+    )
+    schedule_availability_refresh(inventory_item_ids=[inv_id for inv_id, _ in holds])
 
-    # Noraksta noliktavu
-    for inv_id, need in required.items():
-        InventoryItem.objects.filter(id=inv_id).update(quantity=F("quantity") - need)
+def expire_inventory_reservations(batch_size: int = 1000) -> int:
+    """
+    Atbrīvo rezervācijas, kurām beidzies termiņš (periodisks uzdevums, sk. komandu expire_inventory_holds).
+    Dzēš porcijās, lai neturētu ilgas slēdzenes. Atgriež atbrīvoto rezervāciju skaitu.
+    """
+    total = 0
+    now = timezone.now()
+    while True:
+        with transaction.atomic():
+            batch = list(
+                InventoryReservation.objects.select_for_update(skip_locked=True)
+                .filter(expires_at__lte=now)
+                .order_by("id")
+                .values_list("id", "inventory_item_id", "order_id", "amount")[:batch_size]
+            )
+            if not batch:
+                break
+            InventoryReservation.objects.filter(id__in=[row[0] for row in batch]).delete()
+            record_movements(
+                InventoryMovement(
+                    inventory_item_id=inv_id, kind=InventoryMovement.Kind.RELEASE, quantity_change=amount,
+                    order_id=order_id,
+                )
+                for _, inv_id, order_id, amount in batch
+            )
+            schedule_availability_refresh(inventory_item_ids={row[1] for row in batch})
+        total += len(batch)
+        if len(batch) < batch_size:
+            break
+    return total
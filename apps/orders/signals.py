@@ -0,0 +1,10 @@
+# apps/orders/signals.py
+from django.dispatch import receiver
+
+from apps.menu.models import Product, product_price_changed
+from .cart import recalculate_cart_totals
+
+@receiver(product_price_changed, sender=Product)
+def _product_price_changed(sender, product, **kwargs):
+    # Grozu kopsummas glabā cenu summu - pārrēķinām tikai grozus, kuros ir šis produkts
+    recalculate_cart_totals(product_ids=[product.id])
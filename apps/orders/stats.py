@@ -0,0 +1,290 @@
+# apps/orders/stats.py
+from __future__ import annotations
+
+from datetime import date, datetime, tzinfo
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Aggregate, Avg, Case, Count, F, FloatField, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Trunc, TruncDate
+from django.utils import timezone
+
+from .models import Order, OrderDailyStats, OrderItem, OrderStatusEvent, ProductDailyStats
+
+# Statistikas kopsavilkumi (rollup): OrderDailyStats / ProductDailyStats.
+# Tiek papildināti inkrementāli pasūtījuma statusa maiņas transakcijā; pilnu pārrēķinu veic komanda rebuild_order_stats.
+# Pārrēķins un inkrementi viena uzņēmuma ietvaros ir serializēti ar transakcijas advisory lock:
+# inkrementi ņem kopīgo (savstarpēji netraucē), pārrēķins - ekskluzīvo. Bez tā pārrēķins uz dzīviem datiem
+# var ieskaitīt pabeigšanu divreiz vai tās pieaugums nonāk izdzēstā rindā un pazūd.
+
+# pg_advisory_xact_lock(klase, company_id) - klase atdala šīs slēdzenes no citām advisory slēdzenēm
+STATS_LOCK_CLASS = 7001
+
+def _lock_company_stats(company_ids, exclusive: bool = False):
+    # Viens vaicājums visiem uzņēmumiem, ID secībā; slēdzene tiek atbrīvota transakcijas beigās
+    function = "pg_advisory_xact_lock" if exclusive else "pg_advisory_xact_lock_shared"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {function}(%s, c) FROM unnest(%s::integer[]) AS c ORDER BY c",
+            [STATS_LOCK_CLASS, sorted(set(company_ids))],
+        )
+
+def _order_day(order: Order) -> date:
+    return timezone.localtime(order.created_at).date()
+
+def _ensure_day_row(company_id: int, day: date):
+    # Rinda ar nullēm, ja vēl nav (paralēli izsaukumi nekonfliktē)
+    OrderDailyStats.objects.bulk_create([OrderDailyStats(company_id=company_id, day=day)], ignore_conflicts=True)
+
+def record_order_completed(order: Order):
+    record_orders_completed([order])
+
+def record_orders_completed(orders: list[Order]):
+    """
+    Pieskaita pabeigtus pasūtījumus dienas kopsavilkumiem un to produktu daudzumus produktu kopsavilkumiem.
+    Pieaugums tiek veikts ar UPDATE ... = col + x, tāpēc paralēlas pabeigšanas nepārraksta cita citu.
+    Vaicājumi - pa vienam katrai (uzņēmums, diena), nevis katram pasūtījumam.
+    """
+    if not orders:
+        return
+    _lock_company_stats(order.company_id for order in orders)
+    day_of = {order.id: (order.company_id, _order_day(order)) for order in orders}
+    totals: dict[tuple[int, date], list] = {}
+    for order in orders:
+        row = totals.setdefault(day_of[order.id], [0, Decimal("0")])
+        row[0] += 1
+        row[1] += order.total_amount
+    OrderDailyStats.objects.bulk_create(
+        [OrderDailyStats(company_id=company_id, day=day) for company_id, day in totals],
+        ignore_conflicts=True,
+    )
+    for (company_id, day), (count, revenue) in totals.items():
+        OrderDailyStats.objects.filter(company_id=company_id, day=day).update(
+            orders_count=F("orders_count") + count,
+            revenue=F("revenue") + revenue,
+        )
+
+    quantities: dict[tuple[int, date], dict[int, int]] = {}
+    for order_id, product_id, qty in (
+        OrderItem.objects.filter(order_id__in=day_of.keys())
+        .values("order_id", "product_id")
+        .annotate(qty=Sum("quantity"))
+        .values_list("order_id", "product_id", "qty")
+    ):
+        by_product = quantities.setdefault(day_of[order_id], {})
+        by_product[product_id] = by_product.get(product_id, 0) + qty
+    if not quantities:
+        return
+    ProductDailyStats.objects.bulk_create(
+        [
+            ProductDailyStats(company_id=company_id, day=day, product_id=pid)
+            for (company_id, day), by_product in quantities.items()
+            for pid in by_product
+        ],
+        ignore_conflicts=True,
+    )
+    # Viens UPDATE visiem dienas produktiem (CASE product_id WHEN .. THEN qty)
+    for (company_id, day), by_product in quantities.items():
+        ProductDailyStats.objects.filter(company_id=company_id, day=day, product_id__in=by_product.keys()).update(
+            quantity=F("quantity") + Case(
+                *[When(product_id=pid, then=Value(qty)) for pid, qty in sorted(by_product.items())],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+
+def record_order_canceled(order: Order):
+    _lock_company_stats([order.company_id])
+    day = _order_day(order)
+    _ensure_day_row(order.company_id, day)
+    OrderDailyStats.objects.filter(company_id=order.company_id, day=day).update(canceled_count=F("canceled_count") + 1)
+
+@transaction.atomic
+def rebuild_order_stats(company_id: int) -> int:
+    """
+    Pārrēķina uzņēmuma kopsavilkumus no visiem pasūtījumiem (sākotnējā aizpilde vai labošana).
+    Gaida, kamēr apstiprinās uzņēmuma nepabeigtās pabeigšanas / atcelšanas, un līdz commit aiztur jaunās.
+    Atgriež izveidoto dienu skaitu.
+    """
+    _lock_company_stats([company_id], exclusive=True)
+    OrderDailyStats.objects.filter(company_id=company_id).delete()
+    ProductDailyStats.objects.filter(company_id=company_id).delete()
+
+    finished = Order.objects.filter(company_id=company_id, status__in=[Order.Status.DONE, Order.Status.CANCELED])
+    days = (
+        finished.annotate(day=TruncDate("created_at"))
+        .values("day")
+        .annotate(
+            orders_count=Count("id", filter=Q(status=Order.Status.DONE)),
+            canceled_count=Count("id", filter=Q(status=Order.Status.CANCELED)),
+            revenue=Sum("total_amount", filter=Q(status=Order.Status.DONE)),
+        )
+        .order_by("day")
+    )
+    OrderDailyStats.objects.bulk_create(
+        [
+            OrderDailyStats(
+                company_id=company_id,
+                day=row["day"],
+                orders_count=row["orders_count"],
+                canceled_count=row["canceled_count"],
+                revenue=row["revenue"] or Decimal("0"),
+            )
+            for row in days
+        ],
+        batch_size=1000,
+    )
+
+    products = (
+        OrderItem.objects.filter(order__company_id=company_id, order__status=Order.Status.DONE)
+        .annotate(day=TruncDate("order__created_at"))
+        .values("day", "product_id")
+        .annotate(qty=Sum("quantity"))
+        .order_by()
+    )
+    ProductDailyStats.objects.bulk_create(
+        [
+            ProductDailyStats(company_id=company_id, day=row["day"], product_id=row["product_id"], quantity=row["qty"])
+            for row in products.iterator()
+        ],
+        batch_size=1000,
+    )
+    return OrderDailyStats.objects.filter(company_id=company_id).count()
+
+def company_stats(company_id: int) -> dict:
+    """
+    ORDER_007 dati tikai no kopsavilkumiem: divi vaicājumi neatkarīgi no pasūtījumu skaita
+    (dienu rindas un produktu TOP 10).
+    """
+    days = list(
+        OrderDailyStats.objects.filter(company_id=company_id)
+        .order_by("day")
+        .values_list("day", "orders_count", "canceled_count", "revenue")
+    )
+    total_orders = sum(row[1] for row in days)
+    total_revenue = sum((row[3] for row in days), Decimal("0"))
+    avg_amount = (total_revenue / total_orders).quantize(Decimal("0.01")) if total_orders else 0
+
+    top_products = list(
+        ProductDailyStats.objects.filter(company_id=company_id)
+        .values("product_id", "product__name")
+        .annotate(total_qty=Sum("quantity"))
+        .order_by("-total_qty", "product_id")[:10]
+    )
+
+    return {
+        "total_orders": total_orders,
+        "canceled_orders": sum(row[2] for row in days),
+        "avg_order_amount": str(avg_amount),
+        "most_popular_product": top_products[0] if top_products else None,
+        "top_products": top_products,
+        # Dienas bez pabeigtiem pasūtījumiem (tikai atcelti) grafikā netiek rādītas
+        "sales_by_day": [{"d": day, "total": revenue} for day, count, _, revenue in days if count],
+    }
+
+def company_window_stats(company_id: int, start: datetime, end: datetime, granularity: str, tz: tzinfo) -> dict:
+    """
+    Statistika intervālam [start, end) ar grupēšanu pa stundām / dienām / nedēļām / mēnešiem vietējā laika joslā.
+    Abi vaicājumi ierobežoti ar (company_id, created_at) indeksu - tiek nolasīts tikai pieprasītais logs.
+    Skaitļi attiecas uz pabeigtajiem pasūtījumiem (kā kopsavilkumos); atceltie tiek skaitīti atsevišķi.
+    """
+    window = Q(company_id=company_id, created_at__gte=start, created_at__lt=end)
+    done = Q(status=Order.Status.DONE)
+
+    buckets = list(
+        Order.objects.filter(window, status__in=[Order.Status.DONE, Order.Status.CANCELED])
+        .annotate(period=Trunc("created_at", granularity, tzinfo=tz))
+        .values("period")
+        .annotate(
+            orders=Count("id", filter=done),
+            canceled=Count("id", filter=Q(status=Order.Status.CANCELED)),
+            total=Sum("total_amount", filter=done),
+        )
+        .order_by("period")
+    )
+    total_orders = sum(b["orders"] for b in buckets)
+    total_revenue = sum((b["total"] or Decimal("0") for b in buckets), Decimal("0"))
+    avg_amount = (total_revenue / total_orders).quantize(Decimal("0.01")) if total_orders else 0
+
+    top_products = list(
+        OrderItem.objects.filter(
+            order__company_id=company_id,
+            order__created_at__gte=start,
+            order__created_at__lt=end,
+            order__status=Order.Status.DONE,
+        )
+        .values("product_id", "product__name")
+        .annotate(total_qty=Sum("quantity"))
+        .order_by("-total_qty", "product_id")[:10]
+    )
+
+    return {
+        "from": start,
+        "to": end,
+        "granularity": granularity,
+        "timezone": str(tz),
+        "total_orders": total_orders,
+        "canceled_orders": sum(b["canceled"] for b in buckets),
+        "avg_order_amount": str(avg_amount),
+        "most_popular_product": top_products[0] if top_products else None,
+        "top_products": top_products,
+        "sales": [
+            {"period": b["period"], "orders": b["orders"], "total": b["total"]} for b in buckets if b["orders"]
+        ],
+    }
+
+class PercentileCont(Aggregate):
+    # PostgreSQL percentile_cont(p) WITHIN GROUP (ORDER BY x) - procentile tiek aprēķināta datubāzē
+    function = "percentile_cont"
+    template = "%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, percentile: float, **extra):
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+# Posms -> statuss, kurā posms beidzas (elapsed_seconds ir laiks iepriekšējā statusā)
+STAGES = {
+    "queue": Order.Status.IN_PROGRESS,  # NEW -> INP
+    "prep": Order.Status.READY,  # INP -> RDY
+    "pickup": Order.Status.DONE,  # RDY -> DON
+}
+
+def _timing_aggregates() -> dict:
+    return {
+        "count": Count("id"),
+        "avg": Avg("elapsed_seconds"),
+        "p50": PercentileCont("elapsed_seconds", 0.5),
+        "p95": PercentileCont("elapsed_seconds", 0.95),
+    }
+
+def company_stage_timings(company_id: int, start: datetime, end: datetime) -> dict:
+    """
+    Posmu ilgumi sekundēs (gaidīšana rindā, pagatavošana, izsniegšana) pārejām intervālā [start, end):
+    count / avg / p50 / p95 kopā un pagatavošanai arī pa produktiem.
+    Dati no OrderStatusEvent ((company, to_status, created_at) indekss), nevis no visiem pasūtījumiem.
+    """
+    events = OrderStatusEvent.objects.filter(
+        company_id=company_id, created_at__gte=start, created_at__lt=end, elapsed_seconds__isnull=False
+    )
+    rows = {
+        row["to_status"]: row
+        for row in events.filter(to_status__in=STAGES.values())
+        .values("to_status")
+        .annotate(**_timing_aggregates())
+        .order_by()
+    }
+    empty = {"count": 0, "avg": None, "p50": None, "p95": None}
+    stages = {}
+    for stage, to_status in STAGES.items():
+        row = rows.get(to_status, empty)
+        stages[stage] = {key: row[key] for key in empty}
+
+    # Pasūtījums ar vairākiem produktiem tiek ieskaitīts katra produkta sadalījumā
+    by_product = list(
+        events.filter(to_status=STAGES["prep"])
+        .values(product_id=F("order__items__product_id"), product_name=F("order__items__product__name"))
+        .annotate(**_timing_aggregates())
+        .order_by("-count", "product_id")
+    )
+
+    return {"from": start, "to": end, "stages": stages, "prep_by_product": by_product}
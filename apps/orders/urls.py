@@ -4,11 +4,17 @@ from .views import (
     CartView,
     CheckoutView,
     ClientOrdersView,
+    ClientOrderDetailView,
     CancelOrderView,
     CompanyOrdersKanbanView,
     CompanyOrderDetailView,
     ChangeOrderStatusView,
+    BulkChangeOrderStatusView,
     CompanyOrderStatsView,
+    CompanyOrderEventsView,
+    CompanyOrderTimingsView,
+    CompanyKitchenLoadView,
+    CompanyWaitEstimateView,
 )
 
 urlpatterns = [
@@ -20,6 +26,7 @@ urlpatterns = [
 
     # ORDER_003 (klients)
     path("orders/my/", ClientOrdersView.as_view()),
+    path("orders/my/<int:order_id>/", ClientOrderDetailView.as_view()),
 
     # ORDER_002 (atcelt)
     path("orders/<int:order_id>/cancel/", CancelOrderView.as_view()),
@@ -33,6 +40,21 @@ urlpatterns = [
     # ORDER_005 (UA/DA status)
     path("company/orders/<int:order_id>/status/", ChangeOrderStatusView.as_view()),
 
+    # ORDER_013 (UA/DA vairāku pasūtījumu status)
+    path("company/orders/status/bulk/", BulkChangeOrderStatusView.as_view()),
+
     # ORDER_007 (UA stats)
     path("company/orders/stats/", CompanyOrderStatsView.as_view()),
+
+    # ORDER_010 (UA posmu ilgumi)
+    path("company/orders/timings/", CompanyOrderTimingsView.as_view()),
+
+    # ORDER_011 (UA/DA virtuves noslodze)
+    path("company/orders/kitchen/", CompanyKitchenLoadView.as_view()),
+
+    # ORDER_012 (publisks gaidīšanas novērtējums ēdienkartei)
+    path("wait/<int:company_id>/", CompanyWaitEstimateView.as_view()),
+
+    # ORDER_009 (UA/DA reāllaika Kanban notikumi, SSE)
+    path("company/orders/events/", CompanyOrderEventsView.as_view()),
 ]
@@ -1,21 +1,45 @@
 # apps/orders/views.py
+import json
+from datetime import timedelta
 from decimal import Decimal
-from django.db import transaction
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db.models import Sum
 from django.utils import timezone
-from django.db.models import Count, Avg, Sum
-from django.db.models.functions import TruncDate
+from django.utils.dateparse import parse_datetime
+from django.views import View
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied, NotFound, ValidationError
+from rest_framework_simplejwt.exceptions import InvalidToken
 
+from apps.accounts.authentication import ClaimsJWTAuthentication, StrictJWTAuthentication
 from apps.accounts.models import User
 from apps.companies.models import Company
+from apps.inventory.transactions import atomic_with_retry
 from apps.menu.models import Product
 from apps.menu.services import compute_available_quantities
-from .models import Cart, CartItem, Order, OrderItem
-from .services import consume_inventory_for_order
+from .models import Order, OrderItem
+from .services import (
+    bulk_change_order_status,
+    cancel_order,
+    change_order_status,
+    record_status_event,
+    reserve_inventory_for_order,
+)
+from .pagination import keyset_page, parse_limit
+from . import idempotency
+from .cart import get_cart_store
+from .idempotency import get_idempotency_key
+from .kitchen import is_cached, kitchen_load, public_wait_estimate
+from .events import EVENT_CREATED, company_channel, get_broker, publish_order_event
+from .stats import company_stage_timings, company_stats, company_window_stats
 from .permissions import IsClient, IsCompanyStaff
 from .serializers import (
     CartItemInputSerializer,
@@ -23,21 +47,17 @@ from .serializers import (
     CartItemViewSerializer,
     CheckoutSerializer,
     OrderClientSerializer,
+    OrderClientSummarySerializer,
+    OrderBulkStatusChangeSerializer,
     OrderKanbanSerializer,
     OrderStatusChangeSerializer,
+    OrderStatsQuerySerializer,
 )
 
 def _client_can_order_company(company_id: int) -> bool:
     # Klients var pasūtīt tikai aktīvā, nebloķētā, ne soft-deleted uzņēmumā
     return Company.objects.filter(id=company_id, deleted_at__isnull=True, is_active=True, is_blocked=False).exists()
 
-def _calc_cart_total(cart: Cart) -> Decimal:
-    # Aprēķina groza kopējo summu
-    total = Decimal("0.00")
-    for item in cart.items.select_related("product").all():
-        total += (item.product.price * item.quantity)
-    return total
-
 class CartView(APIView):
     """
     ORDER_001: veidot pasūtījumu (grozs)
@@ -46,15 +66,14 @@ class CartView(APIView):
     - GET: parāda grozu ar summu
     """
     permission_classes = [IsAuthenticated, IsClient]
+    query_budget = 15
 
     def get(self, request, company_id: int):
         # Parāda grozu konkrētam uzņēmumam
         if not _client_can_order_company(company_id):
             raise PermissionDenied("Uzņēmums nav pieejams pasūtījumiem.")
 
-        cart, _ = Cart.objects.get_or_create(user=request.user, company_id=company_id)
-        total = _calc_cart_total(cart)
-        payload = {"items": cart.items.all(), "total_amount": total}
+        payload = get_cart_store().get_view(request.user, company_id)
         return Response(CartViewSerializer(payload).data, status=status.HTTP_200_OK)
 
     def post(self, request, company_id: int):
@@ -82,14 +101,8 @@ class CartView(APIView):
         if max_available <= 0 or qty > max_available:
             raise ValidationError({"code": "P_010", "detail": "Nepietiek noliktavas atlikuma šim produktam."})
 
-        cart, _ = Cart.objects.get_or_create(user=request.user, company_id=company_id)
-        item, created = CartItem.objects.update_or_create(
-            cart=cart,
-            product=product,
-            defaults={"quantity": qty},
-        )
-
-        total = _calc_cart_total(cart)
+        # Groza glabātuve: DB vai kešs (sk. cart.py)
+        total = get_cart_store().set_item(request.user, company_id, product, qty)
         return Response(
             {"code": "P_015", "detail": "Produkts pievienots pasūtījumam.", "total_amount": str(total)},
             status=status.HTTP_200_OK,
@@ -104,13 +117,10 @@ class CartView(APIView):
         if not product_id:
             return Response({"detail": "product_id ir obligāts."}, status=status.HTTP_400_BAD_REQUEST)
 
-        cart = Cart.objects.filter(user=request.user, company_id=company_id).first()
-        if not cart:
+        total = get_cart_store().remove_item(request.user, company_id, int(product_id))
+        if total is None:
             return Response({"code": "P_016", "detail": "Produkts izņemts no pasūtījuma."}, status=status.HTTP_200_OK)
 
-        CartItem.objects.filter(cart=cart, product_id=int(product_id)).delete()
-
-        total = _calc_cart_total(cart)
         return Response(
             {"code": "P_016", "detail": "Produkts izņemts no pasūtījuma.", "total_amount": str(total)},
             status=status.HTTP_200_OK,
@@ -121,11 +131,22 @@ class CheckoutView(APIView):
     ORDER_008: noformēt pasūtījumu
     - ņem groza saturu no DB (cart)
     - izveido Order ar statusu 'Jauns'
+    - Idempotency-Key galvene: atkārtojums atgriež saglabāto atbildi (sk. idempotency.py)
     """
     permission_classes = [IsAuthenticated, IsClient]
+    query_budget = 26
 
-    @transaction.atomic
+    @atomic_with_retry
     def post(self, request):
+        key = get_idempotency_key(request)
+        if key is None:
+            return self._checkout(request)
+        record, replay = idempotency.begin(request.user, key, request.data)
+        if replay is not None:
+            return replay
+        return idempotency.complete(record, self._checkout(request))
+
+    def _checkout(self, request):
         s = CheckoutSerializer(data=request.data)
         s.is_valid(raise_exception=True)
 
@@ -133,11 +154,17 @@ class CheckoutView(APIView):
         if not _client_can_order_company(company_id):
             raise PermissionDenied("Uzņēmums nav pieejams pasūtījumiem.")
 
-        cart = Cart.objects.filter(user=request.user, company_id=company_id).first()
-        if not cart or cart.items.count() == 0:
+        store = get_cart_store()
+        lines = store.get_lines(request.user, company_id)
+        if not lines:
             # Grozs nedrīkst būt tukšs (P_010)
             raise ValidationError({"code": "P_010", "detail": "Pasūtījuma grozs ir tukšs."})
 
+        # Drošībai pārbaudām pieejamību vēlreiz (produkts var būt arī dzēsts, ja grozs glabājas kešā)
+        products = Product.objects.filter(company_id=company_id).in_bulk(lines.keys())
+        if any(pid not in products or not products[pid].is_available for pid in lines):
+            raise ValidationError({"code": "P_010", "detail": "Grozā ir produkts, kas vairs nav pieejams."})
+
         company = Company.objects.get(id=company_id)
         order = Order.objects.create(
             user=request.user,
@@ -147,37 +174,34 @@ class CheckoutView(APIView):
             status=Order.Status.NEW,
         )
 
+        # Rezervē sastāvdaļas visam grozam kopā (kopīgas sastāvdaļas summējas); nepietiek => P_010 + rollback
+        reserve_inventory_for_order(order, list(lines.items()))
+
         # Fiksē cenas uz pasūtījuma brīdi
         total = Decimal("0.00")
         order_items = []
-        for ci in cart.items.select_related("product").all():
-            # Drošībai pārbaudām pieejamību vēlreiz
-            if not ci.product.is_available:
-                raise ValidationError({"code": "P_010", "detail": "Grozā ir produkts, kas vairs nav pieejams."})
-
-            avail_map = compute_available_quantities([ci.product])
-            max_available = avail_map.get(ci.product.id, 0)
-            if max_available <= 0 or ci.quantity > max_available:
-                raise ValidationError({"code": "P_010", "detail": "Nepietiek noliktavas atlikuma pasūtījumam."})
-
-            line_total = ci.product.price * ci.quantity
+        for product_id, quantity in lines.items():
+            product = products[product_id]
+            line_total = product.price * quantity
             total += line_total
 
             order_items.append(
                 OrderItem(
                     order=order,
-                    product=ci.product,
-                    quantity=ci.quantity,
-                    unit_price=ci.product.price,
+                    product=product,
+                    quantity=quantity,
+                    unit_price=product.price,
                 )
             )
 
         OrderItem.objects.bulk_create(order_items)
         order.total_amount = total
-        order.save(update_fields=["total_amount"])
+        record_status_event(order, "", user=request.user)
+        order.save(update_fields=["total_amount", "status_changed_at", "updated_at"])
+        publish_order_event(order, EVENT_CREATED)
 
         # Notīra grozu pēc pasūtījuma izveides
-        cart.delete()
+        store.clear(request.user, company_id)
 
         return Response({"code": "P_001", "detail": "Pasūtījums ir izveidots.", "order_id": order.id},
                         status=status.HTTP_201_CREATED)
@@ -185,31 +209,74 @@ class CheckoutView(APIView):
 class ClientOrdersView(APIView):
     """
     ORDER_003: apskatīt savus pasūtījumus (aktīvie + pabeigtie)
+    - pabeigtie lapoti ar kursoru (?cursor=, ?limit=)
+    - ?summary=1: bez pozīcijām (tikai item_count), detaļas - ClientOrderDetailView
     """
     permission_classes = [IsAuthenticated, IsClient]
+    query_budget = 6
 
     def get(self, request):
-        qs = Order.objects.filter(user=request.user).prefetch_related("items", "items__product").select_related("company")
-
-        active_statuses = {Order.Status.NEW, Order.Status.IN_PROGRESS, Order.Status.READY}
-        finished_statuses = {Order.Status.DONE, Order.Status.CANCELED}
+        params = request.query_params
+        summary = params.get("summary") in {"1", "true"}
+        limit = parse_limit(params.get("limit"), settings.CLIENT_ORDERS_PAGE_SIZE, settings.CLIENT_ORDERS_MAX_PAGE_SIZE)
+
+        qs = Order.objects.filter(user=request.user).select_related("company")
+        if summary:
+            qs = qs.annotate(item_count=Sum("items__quantity"))
+            serializer_class = OrderClientSummarySerializer
+        else:
+            # Pozīcijas ielādē tikai lapas pasūtījumiem (prefetch izpildās pēc LIMIT)
+            qs = qs.prefetch_related("items", "items__product")
+            serializer_class = OrderClientSerializer
+
+        finished, next_cursor = keyset_page(
+            qs.filter(status__in=[Order.Status.DONE, Order.Status.CANCELED]), params.get("cursor"), limit
+        )
+        if params.get("cursor"):
+            # Nākamā pabeigto lapa
+            return Response(
+                {"finished": serializer_class(finished, many=True).data, "next_cursor": next_cursor},
+                status=status.HTTP_200_OK,
+            )
 
-        active = qs.filter(status__in=active_statuses).order_by("-created_at")
-        finished = qs.filter(status__in=finished_statuses).order_by("-created_at")
+        # Aktīvo ir maz (tikai neizpildītie) - tie netiek lapoti
+        active = qs.filter(
+            status__in=[Order.Status.NEW, Order.Status.IN_PROGRESS, Order.Status.READY]
+        ).order_by("-created_at", "-id")
 
         return Response(
             {
-                "active": OrderClientSerializer(active, many=True).data,
-                "finished": OrderClientSerializer(finished, many=True).data,
+                "active": serializer_class(active, many=True).data,
+                "finished": serializer_class(finished, many=True).data,
+                "next_cursor": next_cursor,
             },
             status=status.HTTP_200_OK,
         )
 
+class ClientOrderDetailView(APIView):
+    """
+    ORDER_003: viena sava pasūtījuma detaļas (ar pozīcijām)
+    """
+    permission_classes = [IsAuthenticated, IsClient]
+    query_budget = 5
+
+    def get(self, request, order_id: int):
+        order = (
+            Order.objects.filter(id=order_id, user=request.user)
+            .select_related("company")
+            .prefetch_related("items", "items__product")
+            .first()
+        )
+        if not order:
+            raise NotFound("Pasūtījums nav atrasts.")
+        return Response(OrderClientSerializer(order).data, status=status.HTTP_200_OK)
+
 class CancelOrderView(APIView):
     """
     ORDER_002: atcelt savu pasūtījumu (tikai, ja statuss 'Jauns')
     """
     permission_classes = [IsAuthenticated, IsClient]
+    query_budget = 12
 
     def post(self, request, order_id: int):
         order = Order.objects.filter(id=order_id, user=request.user).first()
@@ -220,9 +287,7 @@ class CancelOrderView(APIView):
             # P_010: atcelšana nav atļauta
             raise ValidationError({"code": "P_010", "detail": "Pasūtījumu nevar atcelt šajā statusā."})
 
-        order.status = Order.Status.CANCELED
-        order.completed_at = timezone.now()
-        order.save(update_fields=["status", "completed_at"])
+        cancel_order(order, user=request.user)
 
         return Response({"code": "P_014", "detail": "Pasūtījums ir atcelts."},
                         status=status.HTTP_200_OK)
@@ -230,27 +295,74 @@ class CancelOrderView(APIView):
 class CompanyOrdersKanbanView(APIView):
     """
     ORDER_004: uzņēmuma pasūtījumi Kanban skatā (UA/DA)
+    Lapots pēc (created_at, id); pabeigtie tikai laika logā; ?since= atgriež tikai izmaiņas.
     """
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated, IsCompanyStaff]
+    query_budget = 5
 
     def get(self, request):
         user: User = request.user
         if not user.company_id:
             raise PermissionDenied("Lietotājam nav uzņēmuma.")
 
-        qs = Order.objects.filter(company_id=user.company_id).order_by("-created_at")
+        qs = Order.objects.filter(company_id=user.company_id)
+        params = request.query_params
+        now = timezone.now()
+        limit = parse_limit(params.get("limit"), settings.KANBAN_PAGE_SIZE, settings.KANBAN_MAX_PAGE_SIZE)
+
+        # ?since= : tikai kopš tā laika mainītie pasūtījumi (klients nākamreiz padod server_time)
+        if params.get("since"):
+            since = parse_datetime(params["since"])
+            if since is None:
+                raise ValidationError({"code": "P_010", "detail": "Nederīgs since."})
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            # Pārklāšanās: izmaiņas, kuru transakcija commit brīdī vēl nebija redzama
+            overlap = timedelta(seconds=settings.KANBAN_SINCE_OVERLAP_SECONDS)
+            changed = list(qs.filter(updated_at__gt=since - overlap).order_by("updated_at", "id")[: limit + 1])
+            return Response(
+                {
+                    "changed": OrderKanbanSerializer(changed[:limit], many=True).data,
+                    # Par daudz izmaiņu - klientam jāpārlādē viss Kanban
+                    "truncated": len(changed) > limit,
+                    "server_time": now,
+                },
+                status=status.HTTP_200_OK,
+            )
 
-        active_statuses = {Order.Status.NEW, Order.Status.IN_PROGRESS, Order.Status.READY, Order.Status.DONE}
-        finished_statuses = {Order.Status.DONE, Order.Status.CANCELED}
+        active_qs = qs.filter(status__in=[Order.Status.NEW, Order.Status.IN_PROGRESS, Order.Status.READY])
+        # Pabeigtie / atceltie tikai pēdējo N stundu logā (?finished_hours=)
+        hours = parse_limit(
+            params.get("finished_hours"), settings.KANBAN_FINISHED_WINDOW_HOURS, settings.KANBAN_FINISHED_MAX_HOURS,
+            name="finished_hours",
+        )
+        finished_qs = qs.filter(
+            status__in=[Order.Status.DONE, Order.Status.CANCELED], completed_at__gte=now - timedelta(hours=hours)
+        )
 
-        active = qs.filter(status__in=active_statuses)
-        finished = qs.filter(status__in=finished_statuses)
+        # ?cursor=&section=active|finished : nākamā vienas sadaļas lapa
+        if params.get("cursor"):
+            section = params.get("section", "finished")
+            if section not in {"active", "finished"}:
+                raise ValidationError({"code": "P_010", "detail": "Nederīga sadaļa."})
+            rows, next_cursor = keyset_page(active_qs if section == "active" else finished_qs, params["cursor"], limit)
+            return Response(
+                {section: OrderKanbanSerializer(rows, many=True).data, "next_cursor": next_cursor},
+                status=status.HTTP_200_OK,
+            )
 
+        active, active_next = keyset_page(active_qs, None, limit)
+        finished, finished_next = keyset_page(finished_qs, None, limit)
         return Response(
             {
+                # Pabeigtie ir tikai "finished" sarakstā (agrāk DONE tika serializēti divreiz);
+                # kolonnu "Pabeigts" 1 minūti fronts veido pēc completed_at
                 "active": OrderKanbanSerializer(active, many=True).data,
+                "active_next_cursor": active_next,
                 "finished": OrderKanbanSerializer(finished, many=True).data,
-                # Piezīme: “pēc 1 minūtes” (DONE noņemšana) ir fronta uzvedība (taimeris) vai websocket/polling
+                "finished_next_cursor": finished_next,
+                "server_time": now,
             },
             status=status.HTTP_200_OK,
         )
@@ -259,7 +371,9 @@ class CompanyOrderDetailView(APIView):
     """
     ORDER_006: apskatīt pasūtījuma detaļas (UA/DA)
     """
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated, IsCompanyStaff]
+    query_budget = 5
 
     def get(self, request, order_id: int):
         user: User = request.user
@@ -281,6 +395,7 @@ class ChangeOrderStatusView(APIView):
     + norakstīt noliktavu, kad Gatavs -> Pabeigts
     """
     permission_classes = [IsAuthenticated, IsCompanyStaff]
+    query_budget = 8
 
     def post(self, request, order_id: int):
         user: User = request.user
@@ -295,27 +410,49 @@ class ChangeOrderStatusView(APIView):
         s.is_valid(raise_exception=True)
         new_status = s.validated_data["new_status"]
 
-        old_status = order.status
-
         try:
-            # Validē secību (NEW->INP->RDY->DONE)
-            order.set_status(new_status)
-
-            # Ja pāreja ir Gatavs -> Pabeigts, norakstām noliktavu
-            if old_status == Order.Status.READY and new_status == Order.Status.DONE:
-                consume_inventory_for_order(order)
-
-        except Exception:
+            change_order_status(
+                order.id, new_status, user=user, expected_status=s.validated_data.get("expected_status")
+            )
+        except (DjangoValidationError, ValidationError):
+            # Nederīga pāreja vai nepietiek noliktavas (ConcurrentUpdateError / OrderStatusConflict netiek tverti => 409)
             raise ValidationError({"code": "P_010", "detail": "Statusa maiņa nav atļauta vai nepietiek noliktavas atlikuma."})
 
-        order.save(update_fields=["status", "completed_at"])
         return Response({"detail": "Statuss atjaunināts."}, status=status.HTTP_200_OK)
 
+class BulkChangeOrderStatusView(APIView):
+    """
+    ORDER_013: mainīt vairāku pasūtījumu statusu vienā pieprasījumā (UA/DA)
+    Rezultāts katram pasūtījumam; nederīgās pārejas netraucē pārējiem.
+    """
+    permission_classes = [IsAuthenticated, IsCompanyStaff]
+    query_budget = 10
+
+    def post(self, request):
+        user: User = request.user
+        if not user.company_id:
+            raise PermissionDenied("Lietotājam nav uzņēmuma.")
+
+        s = OrderBulkStatusChangeSerializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        order_ids = s.validated_data["order_ids"]
+
+        results = bulk_change_order_status(user.company_id, order_ids, s.validated_data["new_status"], user=user)
+        return Response(
+            {
+                "updated": sum(1 for r in results.values() if r["ok"]),
+                "results": [{"order_id": order_id, **results[order_id]} for order_id in order_ids],
+            },
+            status=status.HTTP_200_OK,
+        )
+
 class CompanyOrderStatsView(APIView):
     """
     ORDER_007: pasūtījumu statistika (UA)
+    ?from=&to=&granularity=hour|day|week|month&tz= - intervāls un grupēšana uzņēmuma laika joslā
     """
     permission_classes = [IsAuthenticated]
+    query_budget = 4
 
     def get(self, request):
         user: User = request.user
@@ -325,38 +462,111 @@ class CompanyOrderStatsView(APIView):
         if not user.company_id:
             raise PermissionDenied("Lietotājam nav uzņēmuma.")
 
-        qs = Order.objects.filter(company_id=user.company_id)
+        # Bez parametriem - visa vēsture no dienas kopsavilkumiem
+        if not any(request.query_params.get(k) for k in ("from", "to", "granularity", "tz")):
+            return Response(company_stats(user.company_id), status=status.HTTP_200_OK)
 
-        total_orders = qs.count()
-        avg_amount = qs.aggregate(a=Avg("total_amount"))["a"] or 0
+        # Ar parametriem - ierobežots logs uzņēmuma laika joslā
+        s = OrderStatsQuerySerializer(data=request.query_params, context={"company_tz": user.company.tzinfo})
+        s.is_valid(raise_exception=True)
+        return Response(company_window_stats(user.company_id, **s.validated_data), status=status.HTTP_200_OK)
 
-        # Populārākais produkts pēc pārdotā daudzuma
-        top = (
-            OrderItem.objects
-            .filter(order__company_id=user.company_id)
-            .values("product_id", "product__name")
-            .annotate(total_qty=Sum("quantity"))
-            .order_by("-total_qty")
-        )
-        most_popular = top.first()
+class CompanyOrderTimingsView(APIView):
+    """
+    ORDER_010: posmu ilgumu procentiles (UA) - gaidīšana rindā, pagatavošana, izsniegšana
+    ?from=&to=&tz= - intervāls (noklusējums: pēdējās 7 dienas uzņēmuma laika joslā)
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 4
 
-        top_products = list(top[:10])
+    def get(self, request):
+        user: User = request.user
+        if user.role != User.Role.COMPANY_ADMIN:
+            raise PermissionDenied("Piekļuve ir liegta.")
 
-        # Pārdošanās grafiks pa dienām (summa)
-        sales_by_day = (
-            qs.annotate(d=TruncDate("created_at"))
-              .values("d")
-              .annotate(total=Sum("total_amount"))
-              .order_by("d")
-        )
+        if not user.company_id:
+            raise PermissionDenied("Lietotājam nav uzņēmuma.")
 
-        return Response(
-            {
-                "total_orders": total_orders,
-                "avg_order_amount": str(avg_amount),
-                "most_popular_product": most_popular,
-                "top_products": top_products,
-                "sales_by_day": list(sales_by_day),
-            },
-            status=status.HTTP_200_OK,
+        s = OrderStatsQuerySerializer(data=request.query_params, context={"company_tz": user.company.tzinfo})
+        s.is_valid(raise_exception=True)
+        data = s.validated_data
+        return Response(company_stage_timings(user.company_id, data["start"], data["end"]), status=status.HTTP_200_OK)
+
+class CompanyKitchenLoadView(APIView):
+    """
+    ORDER_011: virtuves noslodze (UA/DA) - aktīvie pasūtījumi pa statusiem, posmu p50/p95 slīdošajā logā,
+    pabeigtie pasūtījumi stundā un gaidīšanas novērtējums. Dati no keša skaitītājiem (sk. kitchen.py).
+    """
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated, IsCompanyStaff]
+    query_budget = 6
+
+    def get(self, request):
+        user: User = request.user
+        if not user.company_id:
+            raise PermissionDenied("Lietotājam nav uzņēmuma.")
+        return Response(kitchen_load(user.company_id), status=status.HTTP_200_OK)
+
+class CompanyWaitEstimateView(APIView):
+    """
+    ORDER_012: gaidīšanas novērtējums klienta ēdienkartei (publisks, bez DB vaicājumiem, kamēr stāvoklis ir kešā)
+    """
+    permission_classes = [AllowAny]
+    query_budget = 6
+
+    def get(self, request, company_id: int):
+        # Uzņēmumu pārbaudām tikai tad, kad stāvoklis vēl jāielasa no DB
+        if not is_cached(company_id) and not Company.objects.filter(id=company_id, deleted_at__isnull=True).exists():
+            raise NotFound("Uzņēmums nav atrasts.")
+        return Response(public_wait_estimate(company_id), status=status.HTTP_200_OK)
+
+def _authenticate_staff(request):
+    # Tā pati JWT autentifikācija kā DRF skatiem (header vai cookie); atgriež (user, kļūdas statuss)
+    try:
+        result = StrictJWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        result = None
+    if result is None:
+        return None, status.HTTP_401_UNAUTHORIZED
+    user = result[0]
+    if user.role not in {User.Role.COMPANY_ADMIN, User.Role.EMPLOYEE} or not user.company_id:
+        return None, status.HTTP_403_FORBIDDEN
+    return user, None
+
+def _sse_message(message: dict) -> str:
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {json.dumps(message['order'])}\n\n"
+
+class CompanyOrderEventsView(View):
+    """
+    ORDER_009: reāllaika Kanban notikumi (Server-Sent Events) uzņēmuma darbiniekiem (UA/DA)
+    Klients ielādē Kanban ar GET (arī pēc "resync"), tālāk saņem tikai izmaiņas: created, status_changed, canceled.
+    Darbojas tikai ar ASGI serveri (backend/asgi.py, uvicorn) - atvērts savienojums neaizņem pavedienu.
+    WSGI serverī plūsma tiktu savākta visa pirms nosūtīšanas (nekad) un turētu darba pavedienu, tāpēc atbilde ir 204:
+    EventSource vairs nepieslēdzas, un klients pāriet uz periodisku Kanban pārlādi.
+    """
+
+    async def get(self, request):
+        user, error_status = await sync_to_async(_authenticate_staff)(request)
+        if user is None:
+            return JsonResponse({"detail": "Piekļuve ir liegta."}, status=error_status)
+        if not isinstance(request, ASGIRequest):
+            return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+        response = StreamingHttpResponse(
+            self._stream(company_channel(user.company_id)), content_type="text/event-stream"
         )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # nginx nebuferē plūsmu
+        return response
+
+    async def _stream(self, channel: str):
+        heartbeat = getattr(settings, "ORDER_EVENTS_HEARTBEAT_SECONDS", 15)
+        subscription = get_broker().subscribe(channel)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                message = await subscription.get(timeout=heartbeat)
+                # Komentārs uztur savienojumu (proxy taimauti), ja notikumu nav
+                yield ": ping\n\n" if message is None else _sse_message(message)
+        finally:
+            subscription.close()
@@ -3,6 +3,10 @@ ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Kanban reāllaika plūsma (orders/company/orders/events/, SSE) ir asinhrons skats:
+ar ASGI serveri (`uvicorn backend.asgi:application`, sk. docker-compose.yml) atvērts savienojums neaizņem pavedienu.
+WSGI serverī (runserver, gunicorn sync) plūsma atbild ar 204 un frontends pārlādē Kanban periodiski.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
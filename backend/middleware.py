@@ -0,0 +1,89 @@
+# backend/middleware.py
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Pieprasījuma DB vaicājumu uzskaite: skaits, DB laiks un atkārtotas SQL formas (N+1 pazīme).
+# Rezultāts tiek pievienots Server-Timing galvenē (redzams pārlūka DevTools) - tikai ar DEBUG vai SERVER_TIMING_ENABLED.
+# Skats var deklarēt vaicājumu budžetu - APIView klases atribūts query_budget. Pārsniegums:
+#  - QUERY_BUDGET_STRICT (testos, sk. conftest.py) -> QueryBudgetExceeded, tests krīt;
+#  - citādi -> brīdinājums žurnālā.
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_NUMBER = re.compile(r"\b\d+\b")
+
+def sql_shape(sql: str) -> str:
+    # Vaicājuma forma: dažāda garuma IN (...) saraksti un skaitliskie literāļi (LIMIT, savepoint ID) tiek apvienoti
+    return _NUMBER.sub("?", _IN_LIST.sub("IN (...)", sql))
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[sql_shape(sql)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+class QueryCountMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # APIView.as_view() / View.as_view() saglabā klasi funkcijā
+        request._query_budget = getattr(getattr(view_func, "view_class", None), "query_budget", None)
+
+    def __call__(self, request):
+        stats = QueryStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(stats))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        repeated = stats.repeated(getattr(settings, "QUERY_REPEAT_THRESHOLD", 5))
+        if settings.DEBUG or getattr(settings, "SERVER_TIMING_ENABLED", False):
+            timing = (
+                f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries ({len(repeated)} repeated)", '
+                f"app;dur={total * 1000:.1f}"
+            )
+            response["Server-Timing"] = (
+                f"{response['Server-Timing']}, {timing}" if response.has_header("Server-Timing") else timing
+            )
+
+        if repeated:
+            logger.warning(
+                "%s %s: atkārtoti vaicājumi (N+1?): %s",
+                request.method,
+                request.path,
+                "; ".join(f"{n}x {shape[:200]}" for shape, n in repeated),
+            )
+
+        budget = getattr(request, "_query_budget", None)
+        if budget is not None and stats.count > budget:
+            message = f"{request.method} {request.path}: {stats.count} vaicājumi > query_budget {budget}"
+            if getattr(settings, "QUERY_BUDGET_STRICT", False):
+                details = "\n".join(f"{n}x {shape}" for shape, n in stats.shapes.most_common())
+                raise QueryBudgetExceeded(f"{message}\n{details}")
+            logger.warning(message)
+        return response
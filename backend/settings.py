@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Pirmā - uzskaita visus pieprasījuma vaicājumus (Server-Timing, N+1, query_budget)
+    'backend.middleware.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -60,6 +62,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Vaicājumu uzskaite: cik reizes viena SQL forma pieprasījumā skaitās kā N+1; STRICT - query_budget pārsniegums = kļūda
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "0") == "1"
+# Server-Timing galvene (DB laiks, vaicājumu skaits) tikai DEBUG režīmā vai ieslēdzot šo - ražošanā neatklāj iekšējos datus
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "0") == "1"
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -129,6 +137,55 @@ STATIC_URL = 'static/'
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Cache (publiskās ēdienkartes kešs u.c.)
+# Vairākiem procesiem jālieto kopīgs kešs, piem. DJANGO_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", ""),
+    }
+}
+MENU_CACHE_TTL = int(os.getenv("MENU_CACHE_TTL", str(60 * 60)))
+
+# Noliktavas rezervāciju (hold) derīguma termiņš; beigušās atbrīvo `manage.py expire_inventory_holds`
+INVENTORY_HOLD_TTL_MINUTES = int(os.getenv("INVENTORY_HOLD_TTL_MINUTES", "120"))
+# Noliktavas transakciju mēģinājumu skaits deadlock / serialization kļūdu gadījumā
+INVENTORY_TX_ATTEMPTS = int(os.getenv("INVENTORY_TX_ATTEMPTS", "3"))
+
+# Groza glabātuve: DB (noklusējums) vai kešs ar TTL (apps.orders.cart.CacheCartStore, ieteicams ar Redis kešu)
+CART_STORE = os.getenv("CART_STORE", "apps.orders.cart.DatabaseCartStore")
+CART_CACHE_ALIAS = os.getenv("CART_CACHE_ALIAS", "default")
+CART_TTL_SECONDS = int(os.getenv("CART_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+
+# Maksimālais pasūtījumu skaits vienā statusa maiņas pieprasījumā (ORDER_013)
+ORDER_BULK_MAX_ORDERS = int(os.getenv("ORDER_BULK_MAX_ORDERS", "100"))
+
+# Idempotency-Key ierakstu glabāšanas laiks (checkout); beigušos dzēš `manage.py purge_idempotency_keys`
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+
+# Virtuves noslodze (ORDER_011): slīdošais logs, paraugu skaits procentilēm un keša pārlasīšana no DB
+KITCHEN_WINDOW_MINUTES = int(os.getenv("KITCHEN_WINDOW_MINUTES", "60"))
+KITCHEN_MAX_SAMPLES = int(os.getenv("KITCHEN_MAX_SAMPLES", "200"))
+KITCHEN_RESEED_SECONDS = int(os.getenv("KITCHEN_RESEED_SECONDS", "600"))
+
+# Kanban reāllaika plūsma (SSE): brokeris, heartbeat un klienta rindas garums.
+# InProcessBroker - tikai vienam procesam; vairākiem uvicorn procesiem / serveriem - apps.orders.events.PostgresBroker
+ORDER_EVENTS_BROKER = os.getenv("ORDER_EVENTS_BROKER", "apps.orders.events.InProcessBroker")
+ORDER_EVENTS_PG_CHANNEL = os.getenv("ORDER_EVENTS_PG_CHANNEL", "order_events")
+ORDER_EVENTS_HEARTBEAT_SECONDS = int(os.getenv("ORDER_EVENTS_HEARTBEAT_SECONDS", "15"))
+ORDER_EVENTS_MAX_QUEUE = int(os.getenv("ORDER_EVENTS_MAX_QUEUE", "100"))
+
+# Kanban: lapas izmērs, pabeigto pasūtījumu logs (stundās) un ?since= pārklāšanās (sekundēs)
+KANBAN_PAGE_SIZE = int(os.getenv("KANBAN_PAGE_SIZE", "50"))
+KANBAN_MAX_PAGE_SIZE = int(os.getenv("KANBAN_MAX_PAGE_SIZE", "200"))
+KANBAN_FINISHED_WINDOW_HOURS = int(os.getenv("KANBAN_FINISHED_WINDOW_HOURS", "12"))
+KANBAN_FINISHED_MAX_HOURS = int(os.getenv("KANBAN_FINISHED_MAX_HOURS", str(7 * 24)))
+KANBAN_SINCE_OVERLAP_SECONDS = int(os.getenv("KANBAN_SINCE_OVERLAP_SECONDS", "5"))
+
+# Klienta pasūtījumu vēsture: pabeigto lapas izmērs
+CLIENT_ORDERS_PAGE_SIZE = int(os.getenv("CLIENT_ORDERS_PAGE_SIZE", "20"))
+CLIENT_ORDERS_MAX_PAGE_SIZE = int(os.getenv("CLIENT_ORDERS_MAX_PAGE_SIZE", "100"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -148,8 +205,31 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    # Reverse proxy skaits priekšā backend; 0 = klienta IP ir REMOTE_ADDR (X-Forwarded-For netiek ņemts vērā).
+    # Bez šī DRF get_ident() atgriež klienta sūtīto X-Forwarded-For, un IP limitus var apiet
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
 }
 
+# JWT lietotāja (+ uzņēmuma) kešs autentifikācijai; 0 = izslēgts. Kopīgam kešam - alias ar Redis backend
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+AUTH_USER_CACHE_ALIAS = os.getenv("AUTH_USER_CACHE_ALIAS", "default")
+
+# Atsaukto refresh tokenu filtrs (Bloom, procesā): citu procesu atsaukumu ielasīšana un pilna pārbūve (sekundēs);
+# iztecējušos tokenus dzēš `manage.py prune_refresh_tokens`
+BLACKLIST_FILTER_SYNC_SECONDS = int(os.getenv("BLACKLIST_FILTER_SYNC_SECONDS", "2"))
+BLACKLIST_FILTER_REBUILD_SECONDS = int(os.getenv("BLACKLIST_FILTER_REBUILD_SECONDS", "3600"))
+BLACKLIST_FILTER_MIN_CAPACITY = int(os.getenv("BLACKLIST_FILTER_MIN_CAPACITY", "10000"))
+
+# Autentifikācijas galapunktu limiti (token bucket): spaiņa izmērs un papildināšana minūtē pa IP un pa e-pastu / uid
+AUTH_RATE_LIMIT_STORE = os.getenv("AUTH_RATE_LIMIT_STORE", "apps.accounts.throttling.MemoryRateLimitStore")
+AUTH_RATE_IP_BURST = int(os.getenv("AUTH_RATE_IP_BURST", "20"))
+AUTH_RATE_IP_PER_MINUTE = int(os.getenv("AUTH_RATE_IP_PER_MINUTE", "10"))
+AUTH_RATE_IDENTITY_BURST = int(os.getenv("AUTH_RATE_IDENTITY_BURST", "5"))
+AUTH_RATE_IDENTITY_PER_MINUTE = int(os.getenv("AUTH_RATE_IDENTITY_PER_MINUTE", "2"))
+# Paralēli paroles hash aprēķini vienā procesā; ja vieta neatbrīvojas N sekundēs -> 503
+AUTH_MAX_CONCURRENT_HASHES = int(os.getenv("AUTH_MAX_CONCURRENT_HASHES", "2"))
+AUTH_HASH_WAIT_SECONDS = int(os.getenv("AUTH_HASH_WAIT_SECONDS", "2"))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -1,5 +1,5 @@
 //  frontend/src/api/orders.ts
-import { request } from "./client";
+import { api, request } from "./client";
 
 export type CartItem = {
   product_id: number;
@@ -37,11 +37,16 @@ export async function removeCartItem(companyId: number, product_id: number) {
   });
 }
 
-export async function checkout(data: { company_id: number; order_type: "ON" | "TA"; notes?: string }) {
+// idempotencyKey: tā pati atslēga atkārtotiem mēģinājumiem, lai neveidotos dubulti pasūtījumi
+export async function checkout(
+  data: { company_id: number; order_type: "ON" | "TA"; notes?: string },
+  idempotencyKey?: string
+) {
   return request({
     url: "/orders/orders/checkout/",
     method: "POST",
     data,
+    headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : undefined,
   });
 }
 
@@ -63,10 +68,29 @@ export type ClientOrder = {
   items: OrderItem[];
 };
 
+// Saraksta rinda bez pozīcijām (?summary=1); detaļas - fetchMyOrder
+export type ClientOrderSummary = Omit<ClientOrder, "items" | "notes"> & { item_count: number };
+
 export async function fetchMyOrders() {
-  return request<{ active: ClientOrder[]; finished: ClientOrder[] }>({
+  return request<{ active: ClientOrderSummary[]; finished: ClientOrderSummary[]; next_cursor: string | null }>({
+    url: "/orders/orders/my/",
+    method: "GET",
+    params: { summary: 1 },
+  });
+}
+
+export async function fetchMyFinishedOrders(cursor: string) {
+  return request<{ finished: ClientOrderSummary[]; next_cursor: string | null }>({
     url: "/orders/orders/my/",
     method: "GET",
+    params: { summary: 1, cursor },
+  });
+}
+
+export async function fetchMyOrder(orderId: number) {
+  return request<ClientOrder>({
+    url: `/orders/orders/my/${orderId}/`,
+    method: "GET",
   });
 }
 
@@ -81,23 +105,90 @@ export async function cancelOrder(orderId: number) {
 export type CompanyOrder = {
   id: number;
   created_at: string;
+  completed_at: string | null;
+  updated_at: string;
   order_type: "ON" | "TA";
   total_amount: string;
   status: "NEW" | "INP" | "RDY" | "DON" | "CAN";
 };
 
+export type CompanyOrdersResponse = {
+  active: CompanyOrder[];
+  active_next_cursor: string | null;
+  finished: CompanyOrder[];
+  finished_next_cursor: string | null;
+  server_time: string;
+};
+
 export async function fetchCompanyOrders() {
-  return request<{ active: CompanyOrder[]; finished: CompanyOrder[] }>({
+  return request<CompanyOrdersResponse>({
+    url: "/orders/company/orders/",
+    method: "GET",
+  });
+}
+
+// Nākamā vienas sadaļas lapa (keyset kursors)
+export async function fetchCompanyOrdersPage(section: "active" | "finished", cursor: string) {
+  return request<{ active?: CompanyOrder[]; finished?: CompanyOrder[]; next_cursor: string | null }>({
     url: "/orders/company/orders/",
     method: "GET",
+    params: { section, cursor },
   });
 }
 
-export async function changeOrderStatus(orderId: number, new_status: CompanyOrder["status"]) {
+// Reāllaika Kanban notikumi (SSE). Pēc atkārtotas pieslēgšanās vai "resync" jāpārlādē saraksts.
+// Ja plūsma nav pieejama (serveris bez ASGI atbild 204, EventSource tiek aizvērts), saraksts tiek pārlādēts periodiski.
+const ORDER_EVENTS_POLL_MS = 15000;
+export type CompanyOrderEvent =
+  | { event: "created" | "status_changed" | "canceled"; order: CompanyOrder }
+  | { event: "resync"; order: null };
+
+export function subscribeCompanyOrderEvents(onEvent: (e: CompanyOrderEvent) => void) {
+  const source = new EventSource(`${api.defaults.baseURL}/orders/company/orders/events/`, { withCredentials: true });
+  (["created", "status_changed", "canceled"] as const).forEach((name) =>
+    source.addEventListener(name, (e) => onEvent({ event: name, order: JSON.parse((e as MessageEvent).data) }))
+  );
+  source.addEventListener("resync", () => onEvent({ event: "resync", order: null }));
+  let opened = false;
+  let poll: ReturnType<typeof setInterval> | null = null;
+  source.onopen = () => {
+    // Savienojuma pārtraukuma laikā notikumi varēja pazust
+    if (opened) onEvent({ event: "resync", order: null });
+    opened = true;
+  };
+  source.onerror = () => {
+    // CONNECTING = pārlūks pieslēgsies atkārtoti pats; CLOSED = plūsmas nebūs
+    if (source.readyState === EventSource.CLOSED && poll === null) {
+      poll = setInterval(() => onEvent({ event: "resync", order: null }), ORDER_EVENTS_POLL_MS);
+    }
+  };
+  return () => {
+    source.close();
+    if (poll !== null) clearInterval(poll);
+  };
+}
+
+// expected_status: statuss, ko redz kartīte; ja cits lietotājs to jau mainījis, atbilde ir 409
+export async function changeOrderStatus(
+  orderId: number,
+  new_status: CompanyOrder["status"],
+  expected_status?: CompanyOrder["status"]
+) {
   return request({
     url: `/orders/company/orders/${orderId}/status/`,
     method: "POST",
-    data: { new_status },
+    data: { new_status, expected_status },
+  });
+}
+
+export type BulkStatusResult = { order_id: number; ok: boolean; code?: string; detail?: string };
+
+// Vairāku pasūtījumu statusa maiņa vienā pieprasījumā (piem., visi gatavie -> pabeigti)
+export async function bulkChangeOrderStatus(order_ids: number[], new_status: CompanyOrder["status"]) {
+  return request<{ updated: number; results: BulkStatusResult[] }>({
+    url: "/orders/company/orders/status/bulk/",
+    method: "POST",
+    data: { order_ids, new_status },
   });
 }
 
@@ -110,6 +201,7 @@ export async function fetchOrderDetail(orderId: number) {
 
 export type OrderStats = {
   total_orders: number;
+  canceled_orders: number;
   avg_order_amount: string;
   most_popular_product: { product_id: number; product__name: string; total_qty: string } | null;
   top_products: Array<{ product_id: number; product__name: string; total_qty: string }>;
@@ -122,3 +214,42 @@ export async function fetchOrderStats() {
     method: "GET",
   });
 }
+
+export type StageTiming = { count: number; avg: number | null; p50: number | null; p95: number | null };
+
+export type OrderTimings = {
+  from: string;
+  to: string;
+  stages: { queue: StageTiming; prep: StageTiming; pickup: StageTiming };
+  prep_by_product: Array<StageTiming & { product_id: number; product_name: string }>;
+};
+
+export async function fetchOrderTimings(params?: { from?: string; to?: string; tz?: string }) {
+  return request<OrderTimings>({
+    url: "/orders/company/orders/timings/",
+    method: "GET",
+    params,
+  });
+}
+
+export type KitchenLoad = {
+  window_minutes: number;
+  active: Record<"NEW" | "INP" | "RDY", number>;
+  stages: Record<"queue" | "prep" | "pickup", { count: number; p50: number | null; p95: number | null }>;
+  orders_per_hour: number;
+  estimated_wait_seconds: number | null;
+};
+
+export async function fetchKitchenLoad() {
+  return request<KitchenLoad>({
+    url: "/orders/company/orders/kitchen/",
+    method: "GET",
+  });
+}
+
+export async function fetchWaitEstimate(companyId: number) {
+  return request<{ estimated_wait_seconds: number | null; active_orders: number }>({
+    url: `/orders/wait/${companyId}/`,
+    method: "GET",
+  });
+}
@@ -1,5 +1,5 @@
 //  frontend/src/pages/CheckoutPage.tsx
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import { useNavigate, useParams } from "react-router-dom";
 import { FiMinus, FiPlus, FiTrash2, FiEdit3 } from "react-icons/fi";
 import Card from "../components/ui/Card";
@@ -19,6 +19,8 @@ export default function CheckoutPage() {
   const [error, setError] = useState<string | null>(null);
   const [message, setMessage] = useState<string | null>(null);
   const [loading, setLoading] = useState<boolean>(true);
+  // Viena atslēga vienam pasūtījuma mēģinājumam (arī atkārtojumiem pēc tīkla kļūdas)
+  const idempotencyKey = useRef<string>(crypto.randomUUID());
 
   useEffect(() => {
     if (!companyId) return;
@@ -46,11 +48,13 @@ export default function CheckoutPage() {
     } else {
       await setCartItem(companyId, item.product_id, next);
     }
+    idempotencyKey.current = crypto.randomUUID();
     await loadCart();
   };
 
   const deleteItem = async (item: CartItem) => {
     await removeCartItem(companyId, item.product_id);
+    idempotencyKey.current = crypto.randomUUID();
     await loadCart();
   };
 
@@ -60,7 +64,7 @@ export default function CheckoutPage() {
 
   const onCheckout = async () => {
     setError(null);
-    const res = await checkout({ company_id: companyId, order_type: orderType, notes });
+    const res = await checkout({ company_id: companyId, order_type: orderType, notes }, idempotencyKey.current);
     if (!res.ok) {
       setError(res.data?.detail || JSON.stringify(res.data));
       return;
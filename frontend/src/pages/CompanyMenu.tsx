@@ -4,7 +4,7 @@ import { useNavigate, useParams } from "react-router-dom";
 import { FiInfo, FiMinus, FiPlus } from "react-icons/fi";
 import Button from "../components/ui/Button";
 import { fetchMenu, type MenuCategoryPublic } from "../api/menu";
-import { fetchCart, removeCartItem, setCartItem } from "../api/orders";
+import { fetchCart, fetchWaitEstimate, removeCartItem, setCartItem } from "../api/orders";
 import "../styles/profile.css";
 
 export default function CompanyMenu() {
@@ -18,6 +18,7 @@ export default function CompanyMenu() {
   const [error, setError] = useState<string | null>(null);
   const [toast, setToast] = useState<string | null>(null);
   const [totalAmount, setTotalAmount] = useState<number>(0);
+  const [waitMinutes, setWaitMinutes] = useState<number | null>(null);
 
   const loadMenu = async () => {
     if (!companyId) return;
@@ -40,9 +41,17 @@ export default function CompanyMenu() {
     }
   };
 
+  const loadWait = async () => {
+    if (!companyId) return;
+    const res = await fetchWaitEstimate(companyId);
+    const seconds = res.ok ? res.data.estimated_wait_seconds : null;
+    setWaitMinutes(seconds == null ? null : Math.max(1, Math.round(seconds / 60)));
+  };
+
   useEffect(() => {
     void loadMenu();
     void loadCart();
+    void loadWait();
   }, [companyId]);
 
   const totalItems = useMemo(() => Object.values(qty).reduce((a, b) => a + b, 0), [qty]);
@@ -75,6 +84,7 @@ export default function CompanyMenu() {
   return (
     <div className="profile-wrap" style={{ alignItems: "stretch" }}>
       <div className="page-heading">Ēdienkarte</div>
+      {waitMinutes != null && <div style={{ padding: "0 12px" }}>Aptuvenais gaidīšanas laiks: ~{waitMinutes} min</div>}
       {error && <div style={{ color: "red", padding: 12 }}>{error}</div>}
       {loading && <div style={{ padding: 12 }}>Ielāde...</div>}
 
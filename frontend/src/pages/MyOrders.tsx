@@ -1,6 +1,13 @@
 // MyOrders.tsx
 import { useEffect, useState } from "react";
-import { cancelOrder, fetchMyOrders, type ClientOrder } from "../api/orders";
+import {
+  cancelOrder,
+  fetchMyFinishedOrders,
+  fetchMyOrder,
+  fetchMyOrders,
+  type ClientOrder,
+  type ClientOrderSummary,
+} from "../api/orders";
 import Card from "../components/ui/Card";
 import Button from "../components/ui/Button";
 
@@ -123,9 +130,64 @@ function OrderBlock({ order, onCancel }: { order: ClientOrder; onCancel?: (id: n
   );
 }
 
+// Saraksta rinda (bez pozīcijām); pozīcijas ielādē tikai atverot detaļas
+function OrderSummaryBlock({ order, onCancel }: { order: ClientOrderSummary; onCancel?: (id: number) => void }) {
+  const [detail, setDetail] = useState<ClientOrder | null>(null);
+  const [loading, setLoading] = useState(false);
+
+  const toggle = async () => {
+    if (detail) {
+      setDetail(null);
+      return;
+    }
+    setLoading(true);
+    const res = await fetchMyOrder(order.id);
+    if (res.ok) setDetail(res.data);
+    setLoading(false);
+  };
+
+  if (detail) {
+    return (
+      <div>
+        <OrderBlock order={detail} onCancel={onCancel} />
+        <Button variant="ghost" onClick={toggle} className="btn-full">
+          Paslēpt detaļas
+        </Button>
+      </div>
+    );
+  }
+
+  return (
+    <Card style={{ marginBottom: 14, boxShadow: "0 18px 32px rgba(30,115,216,0.12)" }}>
+      <div style={{ display: "flex", justifyContent: "space-between", marginBottom: 8, alignItems: "center" }}>
+        <div style={{ display: "flex", gap: 14, flexWrap: "wrap", fontWeight: 700, color: "#0f172a" }}>
+          <span>Pasūtījums #{order.id}</span>
+          <span>{formatDate(order.created_at)}</span>
+          <span>Restorāns “{order.company_name}”</span>
+        </div>
+        <div className="badge gray">{statusLabel[order.status] || order.status}</div>
+      </div>
+      <div style={{ fontWeight: 800, color: "#0f172a" }}>
+        {order.item_count} prod. · Kopsumma: {Number(order.total_amount).toFixed(2)} €
+      </div>
+      <div style={{ display: "flex", gap: 10, marginTop: 10 }}>
+        <Button variant="ghost" onClick={toggle} className="btn-full">
+          {loading ? "Ielāde..." : "Detaļas"}
+        </Button>
+        {onCancel && order.status === "NEW" && (
+          <Button variant="ghost" onClick={() => onCancel(order.id)} className="btn-full">
+            Atcelt
+          </Button>
+        )}
+      </div>
+    </Card>
+  );
+}
+
 export default function MyOrders() {
-  const [active, setActive] = useState<ClientOrder[]>([]);
-  const [finished, setFinished] = useState<ClientOrder[]>([]);
+  const [active, setActive] = useState<ClientOrderSummary[]>([]);
+  const [finished, setFinished] = useState<ClientOrderSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
 
   const load = async () => {
@@ -134,11 +196,21 @@ export default function MyOrders() {
     if (res.ok) {
       setActive(res.data.active);
       setFinished(res.data.finished);
+      setNextCursor(res.data.next_cursor);
     } else {
       setError(res.data?.detail || "Neizdevās ielādēt pasūtījumus");
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    const res = await fetchMyFinishedOrders(nextCursor);
+    if (res.ok) {
+      setFinished((prev) => [...prev, ...res.data.finished]);
+      setNextCursor(res.data.next_cursor);
+    }
+  };
+
   useEffect(() => {
     void load();
   }, []);
@@ -160,7 +232,7 @@ export default function MyOrders() {
           </div>
           {active.length === 0 && <div style={{ padding: 8 }}>Nav aktīvu pasūtījumu.</div>}
           {active.map((o) => (
-            <OrderBlock key={o.id} order={o} onCancel={onCancel} />
+            <OrderSummaryBlock key={o.id} order={o} onCancel={onCancel} />
           ))}
         </Card>
 
@@ -170,8 +242,13 @@ export default function MyOrders() {
           </div>
           {finished.length === 0 && <div style={{ padding: 8 }}>Nav pabeigtu pasūtījumu.</div>}
           {finished.map((o) => (
-            <OrderBlock key={o.id} order={o} />
+            <OrderSummaryBlock key={o.id} order={o} />
           ))}
+          {nextCursor && (
+            <Button variant="ghost" onClick={() => void loadMore()} className="btn-full">
+              Ielādēt vairāk
+            </Button>
+          )}
         </Card>
       </div>
     </div>
@@ -2,7 +2,15 @@
 import { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import Button from "../components/ui/Button";
-import { fetchCompanyOrders, changeOrderStatus, type CompanyOrder } from "../api/orders";
+import {
+  fetchCompanyOrders,
+  fetchCompanyOrdersPage,
+  bulkChangeOrderStatus,
+  changeOrderStatus,
+  subscribeCompanyOrderEvents,
+  type CompanyOrder,
+  type CompanyOrderEvent,
+} from "../api/orders";
 import { useMe } from "../auth/useMe";
 import "../styles/menu.css";
 
@@ -82,7 +90,8 @@ export default function OrdersBoard() {
   const [loading, setLoading] = useState<boolean>(true);
   const [dragItem, setDragItem] = useState<DragPayload | null>(null);
   const [statusError, setStatusError] = useState<string | null>(null);
-  const [doneSeenAt, setDoneSeenAt] = useState<Record<number, number>>({});
+  const [activeNext, setActiveNext] = useState<string | null>(null);
+  const [finishedNext, setFinishedNext] = useState<string | null>(null);
   const [nowTs, setNowTs] = useState<number>(Date.now());
 
   const load = async () => {
@@ -90,34 +99,86 @@ export default function OrdersBoard() {
     setError(null);
     const res = await fetchCompanyOrders();
     if (res.ok) {
-      const newMap = { ...doneSeenAt };
-      res.data.active
-        .filter((o) => o.status === "DON")
-        .forEach((o) => {
-          if (!newMap[o.id]) newMap[o.id] = Date.now();
-        });
-      setDoneSeenAt(newMap);
       setActive(res.data.active);
+      setActiveNext(res.data.active_next_cursor);
       setFinished(res.data.finished);
+      setFinishedNext(res.data.finished_next_cursor);
     } else {
       setError(res.data?.detail || "Neizdevās ielādēt pasūtījumus.");
     }
     setLoading(false);
   };
 
+  const loadMore = async (section: "active" | "finished") => {
+    const cursor = section === "active" ? activeNext : finishedNext;
+    if (!cursor) return;
+    const res = await fetchCompanyOrdersPage(section, cursor);
+    if (!res.ok) return;
+    if (section === "active") {
+      setActive((prev) => [...prev, ...(res.data.active ?? [])]);
+      setActiveNext(res.data.next_cursor);
+    } else {
+      setFinished((prev) => [...prev, ...(res.data.finished ?? [])]);
+      setFinishedNext(res.data.next_cursor);
+    }
+  };
+
   useEffect(() => {
     void load();
   }, []);
 
+  // Reāllaika izmaiņas (SSE); ja plūsma nav pieejama - periodiska pārlāde (resync)
+  useEffect(() => {
+    const withoutOrder = (list: CompanyOrder[], id: number) => list.filter((o) => o.id !== id);
+    const onEvent = (e: CompanyOrderEvent) => {
+      if (e.event === "resync") {
+        void load();
+        return;
+      }
+      const order = e.order;
+      if (e.event === "created") {
+        setActive((prev) => [order, ...withoutOrder(prev, order.id)]);
+      } else if (e.event === "status_changed") {
+        if (order.status === "DON") {
+          setActive((prev) => withoutOrder(prev, order.id));
+          setFinished((prev) => [order, ...withoutOrder(prev, order.id)]);
+        } else {
+          setActive((prev) => prev.map((o) => (o.id === order.id ? order : o)));
+        }
+      } else if (e.event === "canceled") {
+        setActive((prev) => withoutOrder(prev, order.id));
+        setFinished((prev) => [order, ...withoutOrder(prev, order.id)]);
+      }
+    };
+    return subscribeCompanyOrderEvents(onEvent);
+  }, []);
+
   useEffect(() => {
     const t = setInterval(() => setNowTs(Date.now()), 1000);
     return () => clearInterval(t);
   }, []);
 
+  const showConflict = (res: { ok: boolean; status: number }) => {
+    if (res.ok || res.status !== 409) return;
+    setStatusError("Pasūtījuma statusu jau mainīja cits lietotājs");
+    setTimeout(() => setStatusError(null), 1800);
+  };
+
   const advance = async (orderId: number, current: CompanyOrder["status"]) => {
     const next = nextStatus[current];
     if (!next) return;
-    await changeOrderStatus(orderId, next);
+    showConflict(await changeOrderStatus(orderId, next, current));
+    await load();
+  };
+
+  const completeAllReady = async () => {
+    const ids = active.filter((o) => o.status === "RDY").map((o) => o.id);
+    if (!ids.length) return;
+    const res = await bulkChangeOrderStatus(ids, "DON");
+    if (res.ok && res.data.updated < ids.length) {
+      setStatusError(`Pabeigti ${res.data.updated} no ${ids.length} pasūtījumiem`);
+      setTimeout(() => setStatusError(null), 2500);
+    }
     await load();
   };
 
@@ -131,7 +192,7 @@ export default function OrdersBoard() {
       setDragItem(null);
       return;
     }
-    await changeOrderStatus(dragItem.id, targetStatus);
+    showConflict(await changeOrderStatus(dragItem.id, targetStatus, dragItem.status));
     setDragItem(null);
     await load();
   };
@@ -220,18 +281,34 @@ export default function OrdersBoard() {
           {renderColumn(
             "Pabeigts",
             "DON",
-            active.filter(
-              (o) => o.status === "DON" && nowTs - (doneSeenAt[o.id] ?? nowTs) < 60_000
+            // Pabeigtie aktīvajā skatā redzami 1 minūti pēc pabeigšanas
+            finished.filter(
+              (o) => o.status === "DON" && o.completed_at && nowTs - Date.parse(o.completed_at) < 60_000
             )
           )}
         </div>
       )}
+      {!loading && tab === "active" && active.some((o) => o.status === "RDY") && (
+        <Button variant="ghost" onClick={() => void completeAllReady()}>
+          Pabeigt visus gatavos
+        </Button>
+      )}
+      {!loading && tab === "active" && activeNext && (
+        <Button variant="ghost" onClick={() => void loadMore("active")}>
+          Ielādēt vairāk
+        </Button>
+      )}
       {!loading && tab === "finished" && (
         <div className="kanban-grid">
           {renderColumn("Pabeigts", "DON", finished)}
           {renderColumn("Atcelts", "CAN", finished)}
         </div>
       )}
+      {!loading && tab === "finished" && finishedNext && (
+        <Button variant="ghost" onClick={() => void loadMore("finished")}>
+          Ielādēt vairāk
+        </Button>
+      )}
       {statusError && <div className="toast">{statusError}</div>}
     </div>
   );
@@ -3,13 +3,35 @@ import uuid
 import pytest
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 
+from apps.accounts import throttling
 from apps.companies.models import Company
 from apps.inventory.models import InventoryItem
 from apps.menu.models import MenuCategory, Product, RecipeItem
 from apps.orders.models import Cart, Order
 
 
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    # Kešs (LocMem) dzīvo visu procesu - katram testam sākam no tukša
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _reset_rate_limits(monkeypatch):
+    # Autentifikācijas limiti (procesa spaiņi) - katram testam no jauna
+    monkeypatch.setattr(throttling, "_store", None)
+
+
+@pytest.fixture(autouse=True)
+def _strict_query_budget(settings):
+    # Skatu query_budget pārsniegums testos = kļūda (sk. backend/middleware.py)
+    settings.QUERY_BUDGET_STRICT = True
+
+
 @pytest.fixture
 def client_api():
     return APIClient()
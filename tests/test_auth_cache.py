@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def _auth_queries(ctx):
+    return [q["sql"] for q in ctx.captured_queries if "accounts_user" in q["sql"] or "companies_company" in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_cached_user_skips_user_and_company_queries(client_api, user_factory, company):
+    staff = user_factory(role="employee", company=company)
+    client_api.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(staff)}")
+    url = "/orders/company/orders/kitchen/"
+
+    with CaptureQueriesContext(connection) as first:
+        assert client_api.get(url).status_code == 200
+    assert len(_auth_queries(first)) == 1  # lietotājs + uzņēmums vienā vaicājumā
+
+    with CaptureQueriesContext(connection) as second:
+        assert client_api.get(url).status_code == 200
+    assert _auth_queries(second) == []
+
+
+@pytest.mark.django_db
+def test_user_block_invalidates_cache(client_api, user_factory, django_capture_on_commit_callbacks):
+    user = user_factory(role="client")
+    client_api.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    assert client_api.get("/accounts/me/").status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_blocked = True
+        user.save(update_fields=["is_blocked"])
+    assert client_api.get("/accounts/me/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_company_block_and_role_change_invalidate_cache(
+    client_api, user_factory, company, django_capture_on_commit_callbacks
+):
+    admin = user_factory(role="company_admin", company=company)
+    client_api.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(admin)}")
+    url = "/inventory/"
+    assert client_api.get(url).status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        company.is_blocked = True
+        company.save(update_fields=["is_blocked"])
+    assert client_api.get(url).status_code == 403
+
+    with django_capture_on_commit_callbacks(execute=True):
+        company.is_blocked = False
+        company.save(update_fields=["is_blocked"])
+    assert client_api.get(url).status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        admin.role = "client"
+        admin.save(update_fields=["role"])
+    assert client_api.get(url).status_code == 403
+
+
+@pytest.mark.django_db
+def test_cache_holds_only_auth_snapshot(user_factory, company):
+    from apps.accounts.auth_cache import get_auth_user
+    from apps.accounts.models import User
+
+    user = user_factory(role="employee", company=company)
+    token = AccessToken.for_user(user)
+    get_auth_user(user.id, token, lambda: User.objects.select_related("company").get(pk=user.id))
+
+    cached = get_auth_user(user.id, token, lambda: pytest.fail("lietotājs ielādēts no DB"))
+    assert "password" not in cached.__dict__
+    assert "secret_answer" not in cached.__dict__
+    assert (cached.role, cached.company_id, cached.company.is_active) == ("employee", company.id, True)
+    # Pārējie lauki tiek ielādēti pēc pieprasījuma
+    assert cached.email == user.email
+
+
+@pytest.mark.django_db
+def test_profile_update_does_not_write_back_stale_auth_state(client_api, user_factory):
+    from apps.accounts.models import User
+
+    user = user_factory(role="client")
+    client_api.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    assert client_api.get("/accounts/me/").status_code == 200
+    # Maiņa, ko kešotais momentuzņēmums vēl neredz
+    User.objects.filter(id=user.id).update(is_blocked=True, token_epoch=5)
+
+    res = client_api.patch("/accounts/me/", {"first_name": "Anna"}, format="json")
+    assert res.status_code == 200
+    user.refresh_from_db()
+    assert (user.first_name, user.is_blocked, user.token_epoch) == ("Anna", True, 5)
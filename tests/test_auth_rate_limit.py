@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+from apps.accounts import throttling
+from apps.accounts.throttling import CacheRateLimitStore, MemoryRateLimitStore, RateLimitStore
+
+
+def _login(client_api, email, password="Pass1234!"):
+    return client_api.post("/accounts/auth/login/", {"email": email, "password": password}, format="json")
+
+
+@pytest.mark.django_db
+def test_login_is_limited_per_email(client_api, user_factory, settings):
+    settings.AUTH_RATE_IDENTITY_BURST = 3
+    user = user_factory()
+    for _ in range(3):
+        assert _login(client_api, user.email, "bad").status_code == 400
+
+    res = _login(client_api, user.email.upper())
+    assert res.status_code == 429
+    assert int(res["Retry-After"]) > 0
+    # Cita identitāte no tās pašas IP vēl ir atļauta
+    assert _login(client_api, user_factory().email).status_code == 200
+
+
+@pytest.mark.django_db
+def test_login_is_limited_per_ip_with_cache_store(client_api, user_factory, settings, monkeypatch):
+    monkeypatch.setattr(throttling, "_store", CacheRateLimitStore())
+    settings.AUTH_RATE_IP_BURST = 2
+    assert _login(client_api, "a@example.com").status_code == 400
+    assert _login(client_api, "b@example.com").status_code == 400
+    assert _login(client_api, "c@example.com").status_code == 429
+    assert client_api.post("/accounts/auth/register/", {}, format="json").status_code == 429
+
+
+@pytest.mark.django_db
+def test_spoofed_forwarded_for_does_not_reset_ip_bucket(client_api, settings):
+    settings.AUTH_RATE_IP_BURST = 2
+    for i in range(2):
+        res = client_api.post(
+            "/accounts/auth/login/",
+            {"email": f"user{i}@example.com", "password": "x"},
+            format="json",
+            HTTP_X_FORWARDED_FOR=f"203.0.113.{i}",
+        )
+        assert res.status_code == 400
+
+    res = client_api.post(
+        "/accounts/auth/login/",
+        {"email": "user9@example.com", "password": "x"},
+        format="json",
+        HTTP_X_FORWARDED_FOR="203.0.113.9",
+    )
+    assert res.status_code == 429
+
+
+def test_ip_keys_do_not_evict_identity_buckets():
+    store = MemoryRateLimitStore(max_keys=2)
+    assert store.consume("id:victim", 1, 0.001) == 0
+    for i in range(10):
+        store.consume(f"ip:10.0.0.{i}", 1, 0.001)
+    # Identitātes spainis joprojām tukšs
+    assert store.consume("id:victim", 1, 0.001) > 0
+
+
+def test_rate_limit_store_requires_consume():
+    with pytest.raises(TypeError):
+        type("EmptyStore", (RateLimitStore,), {})()
+
+
+@pytest.mark.django_db
+def test_login_sheds_load_when_hash_slots_are_busy(client_api, user_factory, settings, monkeypatch):
+    settings.AUTH_HASH_WAIT_SECONDS = 0
+    busy = threading.BoundedSemaphore(1)
+    busy.acquire()
+    monkeypatch.setattr(throttling, "_hash_semaphore", busy)
+    user = user_factory()
+
+    res = _login(client_api, user.email)
+    assert res.status_code == 503
+    assert res["Retry-After"] == "1"
+
+    busy.release()
+    assert _login(client_api, user.email).status_code == 200
@@ -0,0 +1,81 @@
+import pytest
+from decimal import Decimal
+
+from apps.inventory.models import InventoryItem
+from apps.orders import cart as cart_module
+from apps.orders.cart import CacheCartStore, CartStore
+from apps.orders.models import Cart, Order
+
+
+@pytest.fixture
+def cache_store(monkeypatch):
+    store = CacheCartStore()
+    monkeypatch.setattr(cart_module, "_store", store)
+    return store
+
+
+@pytest.mark.django_db
+def test_cache_store_cart_never_touches_cart_tables(
+    client_api, user_factory, company, product, inventory_item, recipe_item, cache_store,
+    django_capture_on_commit_callbacks,
+):
+    user = user_factory(role="client")
+    client_api.force_authenticate(user=user)
+    url = f"/orders/cart/{company.id}/"
+
+    assert client_api.post(url, {"product_id": product.id, "quantity": 3}).data["total_amount"] == "15.00"
+    assert not Cart.objects.exists()
+
+    product.price = Decimal("6.00")
+    product.save()
+    res = client_api.get(url)
+    assert res.data["total_amount"] == "18.00"
+    assert [(i["product_id"], i["quantity"], i["unit_price"]) for i in res.data["items"]] == [(product.id, 3, "6.00")]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        res = client_api.post("/orders/orders/checkout/", {"company_id": company.id, "order_type": "ON"}, format="json")
+    assert res.status_code == 201
+    order = Order.objects.get(user=user)
+    assert order.total_amount == Decimal("18.00")
+    assert cache_store.get_lines(user, company.id) == {}
+
+
+@pytest.mark.django_db
+def test_cache_store_failed_checkout_keeps_cart(
+    client_api, user_factory, company, product, inventory_item, recipe_item, cache_store
+):
+    user = user_factory(role="client")
+    client_api.force_authenticate(user=user)
+    client_api.post(f"/orders/cart/{company.id}/", {"product_id": product.id, "quantity": 50})
+    InventoryItem.objects.filter(id=inventory_item.id).update(quantity=10)
+
+    res = client_api.post("/orders/orders/checkout/", {"company_id": company.id, "order_type": "ON"}, format="json")
+    assert res.status_code == 400
+    assert cache_store.get_lines(user, company.id) == {product.id: 50}
+
+
+@pytest.mark.django_db
+def test_cache_store_remove_item(user_factory, company, product, cache_store):
+    user = user_factory(role="client")
+    assert cache_store.remove_item(user, company.id, product.id) is None
+    cache_store.set_item(user, company.id, product, 2)
+    assert cache_store.remove_item(user, company.id, product.id) == Decimal("0.00")
+    assert cache_store.get_view(user, company.id) == {"items": [], "total_amount": Decimal("0.00")}
+
+
+def test_cart_store_without_clear_cannot_be_instantiated():
+    class IncompleteStore(CartStore):
+        def get_lines(self, user, company_id):
+            return {}
+
+        def get_view(self, user, company_id):
+            return {"items": [], "total_amount": Decimal("0.00")}
+
+        def set_item(self, user, company_id, product, quantity):
+            return Decimal("0.00")
+
+        def remove_item(self, user, company_id, product_id):
+            return None
+
+    with pytest.raises(TypeError):
+        IncompleteStore()
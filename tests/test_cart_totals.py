@@ -0,0 +1,77 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.menu.models import Product, RecipeItem
+from apps.orders.cart import DatabaseCartStore, recalculate_cart_totals
+from apps.orders.models import Cart, CartItem
+
+
+@pytest.mark.django_db
+def test_cart_totals_follow_add_update_remove(client_api, user_factory, company, category, product, inventory_item, recipe_item):
+    tea = Product.objects.create(company=company, category=category, name="Tea", price=Decimal("2.50"))
+    RecipeItem.objects.create(product=tea, inventory_item=inventory_item, amount=1)
+    user = user_factory(role="client")
+    client_api.force_authenticate(user=user)
+    url = f"/orders/cart/{company.id}/"
+
+    assert client_api.post(url, {"product_id": product.id, "quantity": 2}).data["total_amount"] == "10.00"
+    assert client_api.post(url, {"product_id": tea.id, "quantity": 4}).data["total_amount"] == "20.00"
+    assert client_api.post(url, {"product_id": product.id, "quantity": 1}).data["total_amount"] == "15.00"
+    assert client_api.delete(f"{url}?product_id={tea.id}").data["total_amount"] == "5.00"
+
+    cart = Cart.objects.get(user=user, company=company)
+    assert (cart.item_count, cart.total_amount) == (1, Decimal("5.00"))
+    res = client_api.get(url)
+    assert res.data["total_amount"] == "5.00"
+    assert len(res.data["items"]) == 1
+
+
+@pytest.mark.django_db
+def test_price_change_recalculates_carts_with_product(user_factory, company, category, product):
+    other = Product.objects.create(company=company, category=category, name="Tea", price=Decimal("2"))
+    with_product = Cart.objects.create(user=user_factory(), company=company)
+    CartItem.objects.create(cart=with_product, product=product, quantity=3)
+    without = Cart.objects.create(user=user_factory(), company=company)
+    CartItem.objects.create(cart=without, product=other, quantity=1)
+    recalculate_cart_totals()
+
+    product = Product.objects.get(id=product.id)
+    product.price = Decimal("7.00")
+    product.save()
+
+    with_product.refresh_from_db()
+    without.refresh_from_db()
+    assert (with_product.item_count, with_product.total_amount) == (3, Decimal("21.00"))
+    assert without.total_amount == Decimal("2.00")
+
+
+@pytest.mark.django_db
+def test_cart_add_uses_price_read_under_cart_lock(user_factory, company, product):
+    # Skats produktu ielādēja pirms cenas maiņas; kopsumma tomēr jārēķina pēc aktuālās cenas
+    Product.objects.filter(id=product.id).update(price=Decimal("8.00"))
+    user = user_factory(role="client")
+
+    assert DatabaseCartStore().set_item(user, company.id, product, 2) == Decimal("16.00")
+    assert Cart.objects.get(user=user).total_amount == Decimal("16.00")
+
+
+@pytest.mark.django_db
+def test_cart_write_does_not_read_whole_cart(client_api, user_factory, company, category, product, inventory_item, recipe_item):
+    user = user_factory(role="client")
+    client_api.force_authenticate(user=user)
+    url = f"/orders/cart/{company.id}/"
+    client_api.post(url, {"product_id": product.id, "quantity": 1})
+
+    def write_queries(qty):
+        with CaptureQueriesContext(connection) as ctx:
+            client_api.post(url, {"product_id": product.id, "quantity": qty})
+        return len(ctx)
+
+    before = write_queries(2)
+    cart = Cart.objects.get(user=user)
+    for i in range(5):
+        p = Product.objects.create(company=company, category=category, name=f"P{i}", price=1)
+        CartItem.objects.create(cart=cart, product=p, quantity=1)
+    assert write_queries(3) == before
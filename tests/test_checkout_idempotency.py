@@ -0,0 +1,54 @@
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.orders.models import CartItem, IdempotencyKey, Order
+
+
+def _checkout(client_api, company, key=None, **extra):
+    headers = {"HTTP_IDEMPOTENCY_KEY": key} if key else {}
+    data = {"company_id": company.id, "order_type": "ON", **extra}
+    return client_api.post("/orders/orders/checkout/", data, format="json", **headers)
+
+
+@pytest.mark.django_db
+def test_replayed_key_returns_stored_response(client_api, company, product, inventory_item, recipe_item, cart):
+    CartItem.objects.create(cart=cart, product=product, quantity=2)
+    client_api.force_authenticate(user=cart.user)
+
+    first = _checkout(client_api, company, key="abc-1")
+    assert first.status_code == 201
+    # Grozs jau izdzēsts - bez atslēgas atkārtojums būtu "grozs ir tukšs"
+    second = _checkout(client_api, company, key="abc-1")
+    assert second.status_code == 201
+    assert second.data == first.data
+    assert second["Idempotent-Replayed"] == "true"
+    assert Order.objects.filter(user=cart.user).count() == 1
+
+    assert _checkout(client_api, company).status_code == 400
+
+
+@pytest.mark.django_db
+def test_key_reused_with_other_payload_is_rejected(client_api, company, product, inventory_item, recipe_item, cart):
+    CartItem.objects.create(cart=cart, product=product, quantity=1)
+    client_api.force_authenticate(user=cart.user)
+
+    assert _checkout(client_api, company, key="k").status_code == 201
+    res = _checkout(client_api, company, key="k", notes="cits")
+    assert res.status_code == 400
+    assert res.data["code"] == "P_010"
+
+
+@pytest.mark.django_db
+def test_failed_checkout_does_not_store_key_and_purge(client_api, company, product, inventory_item, recipe_item, cart):
+    client_api.force_authenticate(user=cart.user)
+    assert _checkout(client_api, company, key="retry-me").status_code == 400
+    assert not IdempotencyKey.objects.exists()
+
+    CartItem.objects.create(cart=cart, product=product, quantity=1)
+    assert _checkout(client_api, company, key="retry-me").status_code == 201
+
+    IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+    call_command("purge_idempotency_keys")
+    assert not IdempotencyKey.objects.exists()
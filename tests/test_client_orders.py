@@ -0,0 +1,62 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+
+from apps.orders.models import Order, OrderItem
+
+MY_ORDERS_URL = "/orders/orders/my/"
+
+
+@pytest.fixture
+def client_user(user_factory, company):
+    return user_factory(role="client", company=company)
+
+
+def _finished(client_user, company, product, minutes_ago):
+    order = Order.objects.create(
+        user=client_user, company=company, order_type="ON", status=Order.Status.DONE,
+        created_at=timezone.now() - timedelta(minutes=minutes_ago),
+    )
+    OrderItem.objects.create(order=order, product=product, quantity=2, unit_price=5)
+    return order
+
+
+@pytest.mark.django_db
+def test_client_history_paginated_summary(client_api, client_user, company, product, django_assert_max_num_queries):
+    orders = [_finished(client_user, company, product, minutes_ago=i) for i in range(5)]
+    Order.objects.create(user=client_user, company=company, order_type="TA", status=Order.Status.NEW)
+    client_api.force_authenticate(user=client_user)
+
+    # Lapa + aktīvie; vaicājumu skaits nav atkarīgs no vēstures garuma
+    with django_assert_max_num_queries(2):
+        res = client_api.get(MY_ORDERS_URL, {"summary": 1, "limit": 2})
+    assert res.status_code == 200
+    assert len(res.data["active"]) == 1
+    assert [o["id"] for o in res.data["finished"]] == [orders[0].id, orders[1].id]
+    assert res.data["finished"][0]["item_count"] == 2
+    assert "items" not in res.data["finished"][0]
+
+    seen = [o["id"] for o in res.data["finished"]]
+    cursor = res.data["next_cursor"]
+    while cursor:
+        page = client_api.get(MY_ORDERS_URL, {"summary": 1, "limit": 2, "cursor": cursor})
+        seen += [o["id"] for o in page.data["finished"]]
+        cursor = page.data["next_cursor"]
+    assert seen == [o.id for o in orders]
+
+
+@pytest.mark.django_db
+def test_client_history_full_mode_and_detail(client_api, client_user, user_factory, company, product):
+    order = _finished(client_user, company, product, minutes_ago=1)
+    client_api.force_authenticate(user=client_user)
+
+    res = client_api.get(MY_ORDERS_URL)
+    assert res.data["finished"][0]["items"][0]["product_name"] == "Coffee"
+    assert res.data["next_cursor"] is None
+
+    res = client_api.get(f"{MY_ORDERS_URL}{order.id}/")
+    assert res.status_code == 200
+    assert res.data["items"][0]["quantity"] == 2
+
+    client_api.force_authenticate(user=user_factory(role="client", company=company))
+    assert client_api.get(f"{MY_ORDERS_URL}{order.id}/").status_code == 404
@@ -0,0 +1,94 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
+
+from apps.inventory.ledger import stock_at, take_snapshots
+from apps.inventory.models import InventoryItem, InventoryMovement, InventorySnapshot
+from apps.orders.models import OrderItem
+from apps.orders.services import consume_inventory_for_order, release_inventory_for_order, reserve_inventory_for_order
+
+
+@pytest.mark.django_db
+def test_consume_and_reservation_are_recorded(inventory_item, product, recipe_item, order):
+    reserve_inventory_for_order(order, [(product.id, 3)])
+    OrderItem.objects.create(order=order, product=product, quantity=3, unit_price=1)
+    consume_inventory_for_order(order, user=order.user)
+
+    kinds = dict(
+        InventoryMovement.objects.filter(order=order).values_list("kind", "quantity_change")
+    )
+    assert kinds == {
+        InventoryMovement.Kind.RESERVATION: Decimal("-30"),
+        InventoryMovement.Kind.CONSUMPTION: Decimal("-30"),
+        InventoryMovement.Kind.RELEASE: Decimal("30"),
+    }
+
+
+@pytest.mark.django_db
+def test_release_is_recorded(inventory_item, product, recipe_item, order):
+    reserve_inventory_for_order(order, [(product.id, 2)])
+    release_inventory_for_order(order)
+    assert InventoryMovement.objects.filter(order=order, kind=InventoryMovement.Kind.RELEASE).count() == 1
+
+
+@pytest.mark.django_db
+def test_stock_at_uses_snapshot_and_tail(company):
+    t0 = timezone.now() - timedelta(hours=3)
+    item = InventoryItem.objects.create(company=company, name="Milk", unit="ml", quantity=100, created_at=t0)
+    InventoryMovement.objects.create(
+        inventory_item=item, kind=InventoryMovement.Kind.CONSUMPTION, quantity_change=-40,
+        created_at=t0 + timedelta(hours=1),
+    )
+    # Rezervācijas atlikumu neietekmē
+    InventoryMovement.objects.create(
+        inventory_item=item, kind=InventoryMovement.Kind.RESERVATION, quantity_change=-10,
+        created_at=t0 + timedelta(hours=1),
+    )
+    item.quantity = 60
+    item.save()
+
+    assert take_snapshots() == 1
+    # Nav jaunu ierakstu - otrs momentuzņēmums netiek veidots
+    assert take_snapshots() == 0
+
+    InventoryMovement.objects.create(inventory_item=item, kind=InventoryMovement.Kind.RECEIPT, quantity_change=15)
+
+    assert stock_at(t0 + timedelta(minutes=30), company_id=company.id) == {item.id: Decimal("100")}
+    assert stock_at(t0 + timedelta(hours=2), company_id=company.id) == {item.id: Decimal("60")}
+    assert stock_at(timezone.now(), company_id=company.id) == {item.id: Decimal("75")}
+    # Sākotnējais (izveides) + periodiskais
+    assert InventorySnapshot.objects.filter(inventory_item=item).count() == 2
+
+
+@pytest.mark.django_db
+def test_stock_at_excludes_items_before_first_snapshot(company):
+    item = InventoryItem.objects.create(company=company, name="Milk", unit="ml", quantity=100)
+    # Kā žurnāla ieviešanas migrācijā: esošajai vienībai sākuma momentuzņēmums ir vēlāks par izveidi
+    item.created_at = timezone.now() - timedelta(days=1)
+    item.save(update_fields=["created_at"])
+
+    assert stock_at(timezone.now() - timedelta(hours=1), company_id=company.id) == {}
+    assert stock_at(timezone.now(), company_id=company.id) == {item.id: Decimal("100")}
+
+
+@pytest.mark.django_db
+def test_inventory_api_records_adjustment_and_receipt(client_api, user_factory, company, inventory_item):
+    admin = user_factory(role="company_admin", company=company)
+    client_api.force_authenticate(user=admin)
+
+    res = client_api.put(f"/inventory/{inventory_item.id}/update/", {"name": "Beans", "unit": "g", "quantity": "800"}, format="json")
+    assert res.status_code == 200
+    res = client_api.post(f"/inventory/{inventory_item.id}/receive/", {"quantity": "50"}, format="json")
+    assert res.status_code == 200
+
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == Decimal("850")
+    changes = list(
+        InventoryMovement.objects.filter(inventory_item=inventory_item).order_by("id").values_list("kind", "quantity_change")
+    )
+    assert changes == [(InventoryMovement.Kind.ADJUSTMENT, Decimal("-200")), (InventoryMovement.Kind.RECEIPT, Decimal("50"))]
+
+    res = client_api.get("/inventory/stock-at/", {"at": timezone.now().isoformat()})
+    assert res.status_code == 200
+    assert res.data["items"] == [{"id": inventory_item.id, "name": "Beans", "unit": "g", "quantity": "850.000"}]
@@ -0,0 +1,82 @@
+import pytest
+from decimal import Decimal
+from django.db import OperationalError
+from psycopg import errors as pg_errors
+
+from apps.inventory.transactions import (
+    ConcurrentUpdateError,
+    atomic_with_retry,
+    get_transaction_stats,
+    reset_transaction_stats,
+)
+from apps.orders.models import Order, OrderItem
+from apps.orders.services import change_order_status
+
+
+def _deadlock():
+    exc = OperationalError("deadlock detected")
+    exc.__cause__ = pg_errors.DeadlockDetected("deadlock detected")
+    return exc
+
+
+@pytest.mark.django_db(transaction=True)
+def test_retry_on_deadlock_then_success():
+    reset_transaction_stats()
+    calls = []
+
+    @atomic_with_retry(base_delay=0)
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _deadlock()
+        return "ok"
+
+    assert flaky() == "ok"
+    assert len(calls) == 3
+    stats = get_transaction_stats()
+    assert stats["deadlocks"] == 2
+    assert stats["retries"] == 2
+    assert stats["gave_up"] == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_retry_gives_up_with_conflict():
+    reset_transaction_stats()
+
+    @atomic_with_retry(attempts=2, base_delay=0)
+    def always_deadlocks():
+        raise _deadlock()
+
+    with pytest.raises(ConcurrentUpdateError) as exc:
+        always_deadlocks()
+    assert exc.value.status_code == 409
+    assert get_transaction_stats()["gave_up"] == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_non_transient_error_not_retried():
+    calls = []
+
+    @atomic_with_retry(base_delay=0)
+    def broken():
+        calls.append(1)
+        raise OperationalError("connection lost")
+
+    with pytest.raises(OperationalError):
+        broken()
+    assert len(calls) == 1
+
+
+@pytest.mark.django_db
+def test_change_order_status_consumes_on_done(inventory_item, product, recipe_item, order):
+    OrderItem.objects.create(order=order, product=product, quantity=10, unit_price=1)
+    order.status = Order.Status.READY
+    order.save(update_fields=["status"])
+
+    change_order_status(order.id, Order.Status.DONE)
+
+    order.refresh_from_db()
+    inventory_item.refresh_from_db()
+    assert order.status == Order.Status.DONE
+    assert order.completed_at is not None
+    assert inventory_item.quantity == Decimal("900")
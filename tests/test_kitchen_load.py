@@ -0,0 +1,75 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+
+from apps.orders.kitchen import kitchen_load
+from apps.orders.models import Order, OrderStatusEvent
+from apps.orders.services import cancel_order, change_order_status
+
+
+def _advance(order, new_status, callbacks):
+    with callbacks(execute=True):
+        change_order_status(order.id, new_status)
+
+
+@pytest.mark.django_db
+def test_kitchen_load_seeds_once_then_counts_incrementally(
+    user_factory, company, product, inventory_item, recipe_item, order, django_capture_on_commit_callbacks,
+    django_assert_num_queries,
+):
+    Order.objects.filter(id=order.id).update(status_changed_at=timezone.now() - timedelta(minutes=4))
+    second = Order.objects.create(user=order.user, company=company, order_type="ON", status="NEW")
+
+    load = kitchen_load(company.id)
+    assert load["active"] == {"NEW": 2, "INP": 0, "RDY": 0}
+    assert load["estimated_wait_seconds"] is None
+
+    _advance(order, Order.Status.IN_PROGRESS, django_capture_on_commit_callbacks)
+    _advance(order, Order.Status.READY, django_capture_on_commit_callbacks)
+    _advance(order, Order.Status.DONE, django_capture_on_commit_callbacks)
+    with django_capture_on_commit_callbacks(execute=True):
+        cancel_order(second)
+
+    with django_assert_num_queries(0):
+        load = kitchen_load(company.id)
+    assert load["active"] == {"NEW": 0, "INP": 0, "RDY": 0}
+    assert load["stages"]["queue"]["count"] == 1
+    assert load["stages"]["queue"]["p50"] == pytest.approx(240, abs=5)
+    assert load["orders_per_hour"] == 1
+    assert load["estimated_wait_seconds"] is not None
+
+
+@pytest.mark.django_db
+def test_kitchen_load_seed_reads_recent_events(company, order):
+    now = timezone.now()
+    for seconds in (100, 200, 300):
+        OrderStatusEvent.objects.create(
+            order=order, company=company, from_status="INP", to_status="RDY", elapsed_seconds=seconds,
+            created_at=now - timedelta(minutes=5),
+        )
+    OrderStatusEvent.objects.create(
+        order=order, company=company, from_status="INP", to_status="RDY", elapsed_seconds=5000,
+        created_at=now - timedelta(hours=3),
+    )
+
+    load = kitchen_load(company.id)
+    assert load["stages"]["prep"] == {"count": 3, "p50": 200, "p95": pytest.approx(290)}
+    # Viens NEW pasūtījums rindā + pagatavošanas p50
+    assert load["estimated_wait_seconds"] == 200
+
+
+@pytest.mark.django_db
+def test_wait_estimate_endpoint(client_api, user_factory, company, django_assert_num_queries):
+    assert client_api.get("/orders/wait/999999/").status_code == 404
+
+    res = client_api.get(f"/orders/wait/{company.id}/")
+    assert res.status_code == 200
+    assert res.data == {"estimated_wait_seconds": None, "active_orders": 0}
+    with django_assert_num_queries(0):
+        assert client_api.get(f"/orders/wait/{company.id}/").status_code == 200
+
+    assert client_api.get("/orders/company/orders/kitchen/").status_code == 401
+    client_api.force_authenticate(user=user_factory(role="employee", company=company))
+    res = client_api.get("/orders/company/orders/kitchen/")
+    assert res.status_code == 200
+    assert res.data["window_minutes"] == 60
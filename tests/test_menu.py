@@ -37,3 +37,50 @@ def test_menu_public_blocked_company_denied(client_api, company):
     company.save(update_fields=["is_blocked"])
     resp = client_api.get(f"/menu/{company.id}/")
     assert resp.status_code in (401, 403)
+
+
+@pytest.mark.django_db
+def test_menu_public_hides_unmakeable_products(client_api, company, category, product, recipe_item):
+    Product.objects.create(company=company, category=category, name="No recipe", price=2)
+    resp = client_api.get(f"/menu/{company.id}/")
+    assert resp.status_code == 200
+    cats = resp.data["categories"]
+    assert [c["id"] for c in cats] == [category.id]
+    assert [p["id"] for p in cats[0]["products"]] == [product.id]
+    assert cats[0]["products"][0]["available_quantity"] == 100
+
+
+@pytest.mark.django_db
+def test_menu_public_query_count_independent_of_categories(client_api, company, inventory_item, django_assert_max_num_queries, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        for i in range(10):
+            cat = MenuCategory.objects.create(company=company, name=f"Cat {i}")
+            p = Product.objects.create(company=company, category=cat, name=f"Item {i}", price=1)
+            RecipeItem.objects.create(product=p, inventory_item=inventory_item, amount=1)
+    with django_assert_max_num_queries(3):
+        resp = client_api.get(f"/menu/{company.id}/")
+    assert resp.status_code == 200
+    assert sum(len(c["products"]) for c in resp.data["categories"]) == 10
+
+
+@pytest.mark.django_db
+def test_menu_public_cached_and_etag(client_api, company, product, recipe_item, django_assert_num_queries):
+    first = client_api.get(f"/menu/{company.id}/")
+    etag = first["ETag"]
+    with django_assert_num_queries(0):
+        again = client_api.get(f"/menu/{company.id}/")
+    assert again.data == first.data
+    not_modified = client_api.get(f"/menu/{company.id}/", HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304
+
+
+@pytest.mark.django_db
+def test_menu_public_cache_invalidated_by_inventory(client_api, company, product, inventory_item, recipe_item, django_capture_on_commit_callbacks):
+    first = client_api.get(f"/menu/{company.id}/")
+    assert first.data["categories"][0]["products"][0]["available_quantity"] == 100
+    with django_capture_on_commit_callbacks(execute=True):
+        inventory_item.quantity = 50
+        inventory_item.save()
+    second = client_api.get(f"/menu/{company.id}/")
+    assert second["ETag"] != first["ETag"]
+    assert second.data["categories"][0]["products"][0]["available_quantity"] == 5
@@ -0,0 +1,58 @@
+import pytest
+from apps.menu.models import Product, RecipeItem
+from apps.menu.services import find_cart_shortages
+
+
+@pytest.mark.django_db
+def test_cart_shortages_shared_ingredient(company, category, product, inventory_item, recipe_item):
+    latte = Product.objects.create(company=company, category=category, name="Latte", price=6)
+    RecipeItem.objects.create(product=latte, inventory_item=inventory_item, amount=10)
+    # Katrs atsevišķi der (60 * 10 <= 1000), kopā nē (1200 > 1000)
+    assert find_cart_shortages([(product.id, 60)]) == set()
+    assert find_cart_shortages([(product.id, 60), (latte.id, 60)]) == {product.id, latte.id}
+
+
+@pytest.mark.django_db
+def test_cart_shortages_product_without_recipe(product):
+    assert find_cart_shortages([(product.id, 1)]) == {product.id}
+
+
+@pytest.mark.django_db
+def test_cart_shortages_fixed_query_count(company, category, inventory_item, django_assert_num_queries):
+    lines = []
+    for i in range(5):
+        p = Product.objects.create(company=company, category=category, name=f"P{i}", price=1)
+        RecipeItem.objects.create(product=p, inventory_item=inventory_item, amount=1)
+        lines.append((p.id, 1))
+    with django_assert_num_queries(1):
+        assert find_cart_shortages(lines) == set()
+
+
+@pytest.mark.django_db
+def test_availability_refreshed_only_for_affected_products(company, category, product, inventory_item, recipe_item, django_capture_on_commit_callbacks):
+    from apps.inventory.models import InventoryItem
+    from apps.menu.models import ProductAvailability
+
+    milk = InventoryItem.objects.create(company=company, name="Milk", unit="ml", quantity=100)
+    tea = Product.objects.create(company=company, category=category, name="Tea", price=2)
+    with django_capture_on_commit_callbacks(execute=True):
+        RecipeItem.objects.create(product=tea, inventory_item=milk, amount=10)
+    assert ProductAvailability.objects.get(product=tea).quantity == 10
+    assert not ProductAvailability.objects.filter(product=product).exists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        inventory_item.quantity = 500
+        inventory_item.save()
+    assert ProductAvailability.objects.get(product=product).quantity == 50
+    assert ProductAvailability.objects.get(product=tea).quantity == 10
+
+
+@pytest.mark.django_db
+def test_compute_available_quantities_reads_table(product, recipe_item, django_assert_num_queries):
+    from apps.menu.models import ProductAvailability
+    from apps.menu.services import compute_available_quantities, refresh_product_availability
+
+    refresh_product_availability(product_ids=[product.id])
+    assert ProductAvailability.objects.get(product=product).quantity == 100
+    with django_assert_num_queries(1):
+        assert compute_available_quantities([product]) == {product.id: 100}
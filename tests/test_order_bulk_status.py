@@ -0,0 +1,75 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.inventory.models import InventoryMovement
+from apps.orders.models import Order, OrderDailyStats, OrderItem, OrderStatusEvent
+from apps.orders.services import bulk_change_order_status
+
+
+def _ready_orders(user_factory, company, product, quantities):
+    orders = []
+    for qty in quantities:
+        order = Order.objects.create(
+            user=user_factory(), company=company, order_type="ON", status=Order.Status.READY, total_amount=qty
+        )
+        OrderItem.objects.create(order=order, product=product, quantity=qty, unit_price=1)
+        orders.append(order)
+    return orders
+
+
+@pytest.mark.django_db
+def test_bulk_done_aggregates_consumption_and_reports_per_order(
+    user_factory, company, product, inventory_item, recipe_item, order
+):
+    # Noliktavā 1000, receptē 10 uz gabalu: 40 + 50 der, 20 vairs nepietiek
+    ok_a, ok_b, too_big = _ready_orders(user_factory, company, product, [40, 50, 20])
+
+    results = bulk_change_order_status(company.id, [ok_a.id, too_big.id, ok_b.id, order.id, 999999], Order.Status.DONE)
+
+    assert results[ok_a.id] == {"ok": True}
+    assert results[ok_b.id] == {"ok": True}
+    assert results[too_big.id]["ok"] is False
+    assert results[order.id]["ok"] is False  # NEW -> DON nav atļauts
+    assert results[999999]["detail"] == "Pasūtījums nav atrasts."
+
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == Decimal("100")
+    assert set(Order.objects.filter(status=Order.Status.DONE).values_list("id", flat=True)) == {ok_a.id, ok_b.id}
+    assert Order.objects.get(id=too_big.id).status == Order.Status.READY
+    assert InventoryMovement.objects.filter(kind=InventoryMovement.Kind.CONSUMPTION).count() == 2
+    assert OrderStatusEvent.objects.filter(to_status=Order.Status.DONE).count() == 2
+    day = OrderDailyStats.objects.get(company=company)
+    assert (day.orders_count, day.revenue) == (2, Decimal("90.00"))
+
+
+@pytest.mark.django_db
+def test_bulk_query_count_does_not_grow_with_orders(user_factory, company, product, inventory_item, recipe_item):
+    small = [o.id for o in _ready_orders(user_factory, company, product, [1, 1])]
+    large = [o.id for o in _ready_orders(user_factory, company, product, [1, 1, 1, 1, 1, 1])]
+
+    with CaptureQueriesContext(connection) as first:
+        bulk_change_order_status(company.id, small, Order.Status.DONE)
+    with CaptureQueriesContext(connection) as second:
+        bulk_change_order_status(company.id, large, Order.Status.DONE)
+    assert len(second) == len(first)
+
+
+@pytest.mark.django_db
+def test_bulk_status_endpoint(client_api, user_factory, company, other_company, order):
+    foreign = Order.objects.create(user=order.user, company=other_company, order_type="ON", status="NEW")
+    client_api.force_authenticate(user=user_factory(role="employee", company=company))
+
+    res = client_api.post(
+        "/orders/company/orders/status/bulk/",
+        {"order_ids": [order.id, foreign.id, order.id], "new_status": "INP"},
+        format="json",
+    )
+    assert res.status_code == 200
+    assert res.data["updated"] == 1
+    assert [(r["order_id"], r["ok"]) for r in res.data["results"]] == [(order.id, True), (foreign.id, False)]
+    assert Order.objects.get(id=foreign.id).status == Order.Status.NEW
+
+    res = client_api.post("/orders/company/orders/status/bulk/", {"order_ids": [], "new_status": "INP"}, format="json")
+    assert res.status_code == 400
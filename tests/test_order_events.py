@@ -0,0 +1,127 @@
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.test import AsyncRequestFactory, RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.orders.events import EVENT_RESYNC, EVENT_STATUS_CHANGED, InProcessBroker, OrderEventBroker, PostgresBroker
+from apps.orders.models import Order
+from apps.orders.services import change_order_status
+from apps.orders.views import CompanyOrderEventsView
+
+
+def test_in_process_broker_cross_thread_publish_and_overflow():
+    broker = InProcessBroker(max_queue=2)
+
+    async def scenario():
+        sub = broker.subscribe("company:1")
+        t = threading.Thread(target=broker.publish, args=("company:1", {"id": 1, "event": "created", "order": {}}))
+        t.start()
+        t.join()
+        first = await sub.get(timeout=1)
+        # Cits kanāls netiek saņemts; heartbeat timeout => None
+        broker.publish("company:2", {"id": 2, "event": "created", "order": {}})
+        empty = await sub.get(timeout=0.01)
+        for i in range(3):
+            broker.publish("company:1", {"id": 10 + i, "event": "created", "order": {}})
+        await asyncio.sleep(0)
+        overflow = await sub.get(timeout=1)
+        sub.close()
+        return first, empty, overflow
+
+    first, empty, overflow = asyncio.run(scenario())
+    assert first["id"] == 1
+    assert empty is None
+    assert overflow["event"] == "resync"
+    assert broker.subscriber_count("company:1") == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_postgres_broker_delivers_notifications_from_other_connections():
+    broker = PostgresBroker(pg_channel="order_events_test")
+
+    async def scenario():
+        sub = broker.subscribe("company:1")
+        assert await asyncio.to_thread(broker._listening.wait, 5)
+        # Pēc pieslēgšanās abonenti saņem resync
+        first = await sub.get(timeout=5)
+        # publish no cita pavediena / DB savienojuma (kā cits process)
+        message = {"id": 7, "event": "created", "order": {"id": 3}}
+        await asyncio.to_thread(_publish_and_close, broker, "company:1", message)
+        await asyncio.to_thread(_publish_and_close, broker, "company:2", {"id": 8, "event": "created", "order": {}})
+        second = await sub.get(timeout=5)
+        other_channel = await sub.get(timeout=0.5)
+        sub.close()
+        return first, second, other_channel
+
+    try:
+        first, second, other_channel = asyncio.run(scenario())
+    finally:
+        broker.close()
+    assert first["event"] == EVENT_RESYNC
+    assert second == {"id": 7, "event": "created", "order": {"id": 3}}
+    assert other_channel is None
+
+
+def _publish_and_close(broker, channel, message):
+    try:
+        broker.publish(channel, message)
+    finally:
+        connection.close()
+
+
+@pytest.mark.django_db
+def test_events_stream_requires_staff(user_factory, company):
+    client = user_factory(role="client", company=company)
+    request = RequestFactory().get("/orders/company/orders/events/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(client)}")
+    response = async_to_sync(CompanyOrderEventsView.as_view())(request)
+    assert response.status_code == 403
+
+    response = async_to_sync(CompanyOrderEventsView.as_view())(RequestFactory().get("/orders/company/orders/events/"))
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_events_stream_tells_wsgi_clients_to_poll(user_factory, company):
+    staff = user_factory(role="employee", company=company)
+    request = RequestFactory().get("/orders/company/orders/events/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(staff)}")
+    response = async_to_sync(CompanyOrderEventsView.as_view())(request)
+    assert response.status_code == 204
+
+
+@pytest.mark.django_db
+def test_events_stream_pushes_status_change(user_factory, company, order, django_capture_on_commit_callbacks):
+    staff = user_factory(role="employee", company=company)
+    request = AsyncRequestFactory().get(
+        "/orders/company/orders/events/", headers={"Authorization": f"Bearer {AccessToken.for_user(staff)}"}
+    )
+
+    def advance():
+        with django_capture_on_commit_callbacks(execute=True):
+            change_order_status(order.id, Order.Status.IN_PROGRESS)
+
+    async def scenario():
+        response = await CompanyOrderEventsView.as_view()(request)
+        assert response["Content-Type"] == "text/event-stream"
+        stream = response.streaming_content
+        assert (await anext(stream)).startswith(b"retry:")
+        await sync_to_async(advance)()
+        chunk = await asyncio.wait_for(anext(stream), 2)
+        await stream.aclose()
+        return chunk.decode()
+
+    chunk = async_to_sync(scenario)()
+    assert f"event: {EVENT_STATUS_CHANGED}" in chunk
+    assert f'"id": {order.id}' in chunk and '"status": "INP"' in chunk
+
+
+def test_broker_without_subscribe_cannot_be_instantiated():
+    class PublishOnlyBroker(OrderEventBroker):
+        def publish(self, channel, message):
+            pass
+
+    with pytest.raises(TypeError):
+        PublishOnlyBroker()
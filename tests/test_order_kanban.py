@@ -0,0 +1,67 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+
+from apps.orders.models import Order
+
+KANBAN_URL = "/orders/company/orders/"
+
+
+@pytest.fixture
+def staff_client(client_api, user_factory, company):
+    client_api.force_authenticate(user=user_factory(role="employee", company=company))
+    return client_api
+
+
+def _order(company, status, **kwargs):
+    return Order.objects.create(company=company, order_type="ON", status=status, **kwargs)
+
+
+@pytest.mark.django_db
+def test_kanban_splits_lists_and_windows_finished(staff_client, company):
+    now = timezone.now()
+    new = _order(company, Order.Status.NEW)
+    done = _order(company, Order.Status.DONE, completed_at=now - timedelta(minutes=5))
+    _order(company, Order.Status.CANCELED, completed_at=now - timedelta(days=3))
+
+    res = staff_client.get(KANBAN_URL)
+    assert res.status_code == 200
+    assert [o["id"] for o in res.data["active"]] == [new.id]
+    # DONE tikai vienā sarakstā; sens atcelts ārpus loga
+    assert [o["id"] for o in res.data["finished"]] == [done.id]
+
+    res = staff_client.get(KANBAN_URL, {"finished_hours": 100})
+    assert len(res.data["finished"]) == 2
+
+
+@pytest.mark.django_db
+def test_kanban_keyset_pagination(staff_client, company):
+    base = timezone.now() - timedelta(hours=1)
+    ids = [_order(company, Order.Status.NEW, created_at=base + timedelta(minutes=i)).id for i in range(5)]
+
+    res = staff_client.get(KANBAN_URL, {"limit": 2})
+    seen = [o["id"] for o in res.data["active"]]
+    cursor = res.data["active_next_cursor"]
+    while cursor:
+        page = staff_client.get(KANBAN_URL, {"limit": 2, "section": "active", "cursor": cursor})
+        assert page.status_code == 200
+        seen += [o["id"] for o in page.data["active"]]
+        cursor = page.data["next_cursor"]
+    assert seen == list(reversed(ids))
+
+    assert staff_client.get(KANBAN_URL, {"cursor": "not-a-cursor"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_kanban_since_returns_only_changes(staff_client, company, settings):
+    settings.KANBAN_SINCE_OVERLAP_SECONDS = 0
+    old = _order(company, Order.Status.NEW)
+    Order.objects.filter(id=old.id).update(updated_at=timezone.now() - timedelta(minutes=10))
+    server_time = timezone.now() - timedelta(minutes=1)
+    fresh = _order(company, Order.Status.NEW)
+
+    res = staff_client.get(KANBAN_URL, {"since": server_time.isoformat()})
+    assert res.status_code == 200
+    assert [o["id"] for o in res.data["changed"]] == [fresh.id]
+    assert res.data["truncated"] is False
+    assert "server_time" in res.data
@@ -0,0 +1,158 @@
+import threading
+import time
+
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.orders.models import Order, OrderDailyStats, OrderItem, ProductDailyStats
+from apps.orders.services import cancel_order, change_order_status
+from apps.orders.stats import company_stats, rebuild_order_stats
+
+
+def _ready_order(user_factory, company, product, qty, price):
+    order = Order.objects.create(
+        user=user_factory(), company=company, order_type="ON", status=Order.Status.READY, total_amount=qty * price
+    )
+    OrderItem.objects.create(order=order, product=product, quantity=qty, unit_price=price)
+    return order
+
+
+@pytest.mark.django_db
+def test_rollups_updated_on_done_and_cancel(user_factory, company, product, inventory_item, recipe_item, order):
+    first = _ready_order(user_factory, company, product, 2, Decimal("5"))
+    second = _ready_order(user_factory, company, product, 3, Decimal("5"))
+    change_order_status(first.id, Order.Status.DONE)
+    change_order_status(second.id, Order.Status.DONE)
+    cancel_order(order)
+
+    day = OrderDailyStats.objects.get(company=company)
+    assert (day.orders_count, day.canceled_count, day.revenue) == (2, 1, Decimal("25.00"))
+    assert ProductDailyStats.objects.get(company=company, product=product).quantity == 5
+
+    stats = company_stats(company.id)
+    assert stats["total_orders"] == 2
+    assert stats["canceled_orders"] == 1
+    assert stats["avg_order_amount"] == "12.50"
+    assert stats["most_popular_product"]["total_qty"] == 5
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental(user_factory, company, product, inventory_item, recipe_item):
+    for qty in (1, 4):
+        change_order_status(_ready_order(user_factory, company, product, qty, Decimal("2")).id, Order.Status.DONE)
+    before = company_stats(company.id)
+
+    OrderDailyStats.objects.all().delete()
+    ProductDailyStats.objects.all().delete()
+    call_command("rebuild_order_stats", company=company.id)
+
+    assert company_stats(company.id) == before
+
+
+@pytest.mark.django_db(transaction=True)
+def test_completion_waits_for_running_rebuild(user_factory, company, product, inventory_item, recipe_item):
+    change_order_status(_ready_order(user_factory, company, product, 1, Decimal("2")).id, Order.Status.DONE)
+    # Cita diena - pabeigšana nepieskaras pārrēķina rindām, gaida tikai uzņēmuma slēdzeni
+    late = _ready_order(user_factory, company, product, 3, Decimal("2"))
+    Order.objects.filter(id=late.id).update(created_at=timezone.now() - timedelta(days=2))
+
+    rebuilt = threading.Event()
+    timings = {}
+
+    def rebuild():
+        try:
+            with transaction.atomic():
+                rebuild_order_stats(company.id)
+                rebuilt.set()
+                time.sleep(0.5)
+            timings["rebuild_committed"] = time.monotonic()
+        finally:
+            rebuilt.set()
+            connection.close()
+
+    def complete():
+        try:
+            rebuilt.wait()
+            change_order_status(late.id, Order.Status.DONE)
+            timings["completed"] = time.monotonic()
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=rebuild), threading.Thread(target=complete)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert timings["completed"] >= timings["rebuild_committed"]
+    stats = company_stats(company.id)
+    assert (stats["total_orders"], stats["most_popular_product"]["total_qty"]) == (2, 4)
+
+
+@pytest.mark.django_db
+def test_stats_endpoint_reads_rollups_only(client_api, user_factory, company, product, django_assert_num_queries):
+    admin = user_factory(role="company_admin", company=company)
+    OrderDailyStats.objects.create(company=company, day="2026-01-01", orders_count=4, revenue=Decimal("40"))
+    ProductDailyStats.objects.create(company=company, day="2026-01-01", product=product, quantity=6)
+    client_api.force_authenticate(user=admin)
+
+    with django_assert_num_queries(2):
+        res = client_api.get("/orders/company/orders/stats/")
+    assert res.status_code == 200
+    assert res.data["total_orders"] == 4
+    assert res.data["avg_order_amount"] == "10.00"
+    assert res.data["top_products"] == [{"product_id": product.id, "product__name": "Coffee", "total_qty": 6}]
+    assert len(res.data["sales_by_day"]) == 1
+
+
+@pytest.mark.django_db
+def test_stats_window_local_timezone_buckets(client_api, user_factory, company, product):
+    from datetime import datetime
+    from zoneinfo import ZoneInfo
+
+    company.time_zone = "Europe/Riga"
+    company.save()
+    admin = user_factory(role="company_admin", company=company)
+    utc = ZoneInfo("UTC")
+    # 2026-03-01 22:30 UTC = 2026-03-02 00:30 Rīgā
+    for created_at, st in [
+        (datetime(2026, 3, 1, 22, 30, tzinfo=utc), Order.Status.DONE),
+        (datetime(2026, 3, 1, 12, 0, tzinfo=utc), Order.Status.DONE),
+        (datetime(2026, 3, 1, 13, 0, tzinfo=utc), Order.Status.CANCELED),
+        (datetime(2026, 2, 20, 12, 0, tzinfo=utc), Order.Status.DONE),
+    ]:
+        Order.objects.create(company=company, order_type="ON", status=st, total_amount=10, created_at=created_at)
+    client_api.force_authenticate(user=admin)
+
+    res = client_api.get("/orders/company/orders/stats/", {"from": "2026-03-01", "to": "2026-03-02"})
+    assert res.status_code == 200
+    assert res.data["timezone"] == "Europe/Riga"
+    assert res.data["total_orders"] == 2
+    assert res.data["canceled_orders"] == 1
+    assert [(s["period"].date().isoformat(), s["orders"]) for s in res.data["sales"]] == [
+        ("2026-03-01", 1),
+        ("2026-03-02", 1),
+    ]
+
+    res = client_api.get("/orders/company/orders/stats/", {"from": "2026-03-01", "to": "2026-03-01", "tz": "UTC"})
+    assert res.data["total_orders"] == 2
+
+
+@pytest.mark.django_db
+def test_stats_window_validation(client_api, user_factory, company):
+    admin = user_factory(role="company_admin", company=company)
+    client_api.force_authenticate(user=admin)
+
+    assert client_api.get("/orders/company/orders/stats/", {"granularity": "year"}).status_code == 400
+    assert client_api.get("/orders/company/orders/stats/", {"tz": "Mars/Base"}).status_code == 400
+    assert client_api.get("/orders/company/orders/stats/", {"from": "2026-13-45"}).status_code == 400
+    assert client_api.get("/orders/company/orders/stats/", {"from": "2026-03-05", "to": "2026-03-01"}).status_code == 400
+    res = client_api.get("/orders/company/orders/stats/", {"from": "2026-01-01", "to": "2026-03-01", "granularity": "hour"})
+    assert res.status_code == 400
+    res = client_api.get("/orders/company/orders/stats/", {"granularity": "hour"})
+    assert res.status_code == 200
+    assert res.data["sales"] == []
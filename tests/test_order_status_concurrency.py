@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+from decimal import Decimal
+from django.db import connection, transaction
+from rest_framework.test import APIClient
+
+from apps.inventory.models import InventoryReservation
+from apps.orders.models import Cart, CartItem, Order, OrderItem, OrderStatusEvent
+from apps.orders.services import OrderStatusConflict, cancel_order, change_order_status, reserve_inventory_for_order
+
+
+@pytest.mark.django_db
+def test_stale_cancel_conflicts_after_status_change(order):
+    stale = Order.objects.get(id=order.id)
+    change_order_status(order.id, Order.Status.IN_PROGRESS)
+
+    with pytest.raises(OrderStatusConflict):
+        cancel_order(stale)
+    order.refresh_from_db()
+    assert order.status == Order.Status.IN_PROGRESS
+    assert OrderStatusEvent.objects.filter(order=order).count() == 1
+
+
+@pytest.mark.django_db
+def test_expected_status_mismatch_returns_409(client_api, user_factory, company, order):
+    client_api.force_authenticate(user=user_factory(role="employee", company=company))
+    url = f"/orders/company/orders/{order.id}/status/"
+
+    res = client_api.post(url, {"new_status": "INP", "expected_status": "NEW"}, format="json")
+    assert res.status_code == 200
+    res = client_api.post(url, {"new_status": "RDY", "expected_status": "NEW"}, format="json")
+    assert res.status_code == 409
+    order.refresh_from_db()
+    assert order.status == Order.Status.IN_PROGRESS
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_done_consumes_inventory_once(company, product, inventory_item, recipe_item, order):
+    OrderItem.objects.create(order=order, product=product, quantity=10, unit_price=1)
+    Order.objects.filter(id=order.id).update(status=Order.Status.READY)
+
+    barrier = threading.Barrier(2)
+    results = []
+
+    def worker():
+        try:
+            barrier.wait()
+            change_order_status(order.id, Order.Status.DONE)
+            results.append("ok")
+        except Exception as exc:
+            results.append(type(exc).__name__)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count("ok") == 1
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == Decimal("900")
+    assert OrderStatusEvent.objects.filter(order=order, to_status=Order.Status.DONE).count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_checkouts_cannot_reserve_the_last_unit_twice(user_factory, company, product, inventory_item, recipe_item):
+    # Atlikums pietiek tieši vienai porcijai
+    inventory_item.quantity = Decimal("10")
+    inventory_item.save()
+    first_user = user_factory(role="client")
+    second_user = user_factory(role="client")
+    cart = Cart.objects.create(user=second_user, company=company)
+    CartItem.objects.create(cart=cart, product=product, quantity=1)
+
+    locked = threading.Event()
+    results = {}
+
+    def first_checkout():
+        # Rezervē un tur slēdzeni, kamēr otrs checkout gaida uz to pašu noliktavas rindu
+        try:
+            with transaction.atomic():
+                order = Order.objects.create(user=first_user, company=company, order_type="ON")
+                reserve_inventory_for_order(order, [(product.id, 1)])
+                locked.set()
+                time.sleep(0.5)
+            results["first"] = "ok"
+        finally:
+            locked.set()
+            connection.close()
+
+    def second_checkout():
+        try:
+            locked.wait()
+            client = APIClient()
+            client.force_authenticate(user=second_user)
+            res = client.post("/orders/orders/checkout/", {"company_id": company.id, "order_type": "ON"})
+            results["second"] = res.status_code
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=first_checkout), threading.Thread(target=second_checkout)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {"first": "ok", "second": 400}
+    assert list(InventoryReservation.objects.values_list("amount", flat=True)) == [Decimal("10.000")]
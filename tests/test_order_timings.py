@@ -0,0 +1,81 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
+
+from apps.orders.models import Order, OrderItem, OrderStatusEvent
+from apps.orders.services import cancel_order, change_order_status
+from apps.orders.stats import company_stage_timings
+
+
+@pytest.mark.django_db
+def test_status_changes_write_audit_events(user_factory, company, product, inventory_item, recipe_item, order):
+    staff = user_factory(role="employee", company=company)
+    OrderItem.objects.create(order=order, product=product, quantity=1, unit_price=1)
+    Order.objects.filter(id=order.id).update(status_changed_at=timezone.now() - timedelta(minutes=3))
+
+    change_order_status(order.id, Order.Status.IN_PROGRESS, user=staff)
+    change_order_status(order.id, Order.Status.READY, user=staff)
+
+    events = list(OrderStatusEvent.objects.filter(order=order).order_by("id"))
+    assert [(e.from_status, e.to_status) for e in events] == [
+        (Order.Status.NEW, Order.Status.IN_PROGRESS),
+        (Order.Status.IN_PROGRESS, Order.Status.READY),
+    ]
+    assert events[0].elapsed_seconds == pytest.approx(180, abs=5)
+    assert events[0].changed_by == staff
+    order.refresh_from_db()
+    assert order.status_changed_at == events[1].created_at
+
+
+@pytest.mark.django_db
+def test_cancel_and_checkout_write_events(client_api, user_factory, company, product, inventory_item, recipe_item, cart, order):
+    cancel_order(order)
+    event = OrderStatusEvent.objects.get(order=order)
+    assert (event.from_status, event.to_status) == (Order.Status.NEW, Order.Status.CANCELED)
+    assert event.created_at == Order.objects.get(id=order.id).completed_at
+
+    cart.items.create(product=product, quantity=1)
+    client_api.force_authenticate(user=cart.user)
+    res = client_api.post("/orders/orders/checkout/", {"company_id": company.id, "order_type": "ON"}, format="json")
+    assert res.status_code == 201
+    created = OrderStatusEvent.objects.get(order__user=cart.user)
+    assert (created.from_status, created.to_status, created.elapsed_seconds) == ("", Order.Status.NEW, None)
+
+
+@pytest.mark.django_db
+def test_stage_timings_percentiles(client_api, user_factory, company, product, order):
+    now = timezone.now()
+    for seconds in (60, 120, 180, 240, 300):
+        OrderStatusEvent.objects.create(
+            order=order, company=company, from_status=Order.Status.IN_PROGRESS, to_status=Order.Status.READY,
+            elapsed_seconds=seconds, created_at=now - timedelta(minutes=1),
+        )
+    OrderStatusEvent.objects.create(
+        order=order, company=company, from_status=Order.Status.NEW, to_status=Order.Status.IN_PROGRESS,
+        elapsed_seconds=30, created_at=now - timedelta(minutes=1),
+    )
+    # Ārpus intervāla
+    OrderStatusEvent.objects.create(
+        order=order, company=company, from_status=Order.Status.NEW, to_status=Order.Status.IN_PROGRESS,
+        elapsed_seconds=9999, created_at=now - timedelta(days=30),
+    )
+    OrderItem.objects.create(order=order, product=product, quantity=1, unit_price=Decimal("2"))
+
+    data = company_stage_timings(company.id, now - timedelta(days=1), now)
+    assert data["stages"]["prep"]["count"] == 5
+    assert data["stages"]["prep"]["p50"] == pytest.approx(180)
+    assert data["stages"]["prep"]["p95"] == pytest.approx(288)
+    assert data["stages"]["queue"] == {"count": 1, "avg": 30, "p50": 30, "p95": 30}
+    assert data["stages"]["pickup"]["count"] == 0
+    assert data["prep_by_product"][0]["product_id"] == product.id
+    assert data["prep_by_product"][0]["p50"] == pytest.approx(180)
+
+    admin = user_factory(role="company_admin", company=company)
+    client_api.force_authenticate(user=admin)
+    res = client_api.get("/orders/company/orders/timings/")
+    assert res.status_code == 200
+    assert res.data["stages"]["prep"]["count"] == 5
+
+    client_api.force_authenticate(user=user_factory(role="employee", company=company))
+    assert client_api.get("/orders/company/orders/timings/").status_code == 403
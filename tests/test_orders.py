@@ -46,3 +46,39 @@ def test_checkout_empty_cart_returns_error(client_api, user_factory, company):
     client_api.force_authenticate(user=user)
     resp = client_api.post("/orders/orders/checkout/", {"company_id": company.id, "order_type": "ON"})
     assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_checkout_rejects_shared_ingredient_oversell(client_api, user_factory, company, category, product, inventory_item, recipe_item):
+    from apps.menu.models import Product, RecipeItem
+    from apps.orders.models import Cart, CartItem
+
+    latte = Product.objects.create(company=company, category=category, name="Latte", price=6)
+    RecipeItem.objects.create(product=latte, inventory_item=inventory_item, amount=10)
+    user = user_factory(role="client")
+    cart = Cart.objects.create(user=user, company=company)
+    CartItem.objects.create(cart=cart, product=product, quantity=60)
+    CartItem.objects.create(cart=cart, product=latte, quantity=60)
+
+    client_api.force_authenticate(user=user)
+    resp = client_api.post("/orders/orders/checkout/", {"company_id": company.id, "order_type": "ON"})
+    assert resp.status_code == 400
+    assert Order.objects.filter(user=user).count() == 0
+
+
+@pytest.mark.django_db
+def test_checkout_reserves_and_cancel_releases(client_api, user_factory, company, product, inventory_item, recipe_item):
+    from apps.menu.services import find_cart_shortages
+    from apps.orders.models import Cart, CartItem
+
+    user = user_factory(role="client")
+    cart = Cart.objects.create(user=user, company=company)
+    CartItem.objects.create(cart=cart, product=product, quantity=100)
+    client_api.force_authenticate(user=user)
+    resp = client_api.post("/orders/orders/checkout/", {"company_id": company.id, "order_type": "ON"})
+    assert resp.status_code == 201
+    assert find_cart_shortages([(product.id, 1)]) == {product.id}
+
+    resp = client_api.post(f"/orders/orders/{resp.data['order_id']}/cancel/")
+    assert resp.status_code == 200
+    assert find_cart_shortages([(product.id, 100)]) == set()
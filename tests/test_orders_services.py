@@ -25,3 +25,65 @@ def test_consume_inventory_ok(inventory_item, product, recipe_item, order):
     consume_inventory_for_order(order)
     inventory_item.refresh_from_db()
     assert inventory_item.quantity == Decimal("900")
+
+
+@pytest.mark.django_db
+def test_reservation_blocks_second_order(inventory_item, product, recipe_item, order, user_factory, company):
+    from apps.orders.models import Order
+    from apps.orders.services import reserve_inventory_for_order
+
+    reserve_inventory_for_order(order, [(product.id, 80)])
+    other = Order.objects.create(user=user_factory(), company=company, order_type="ON")
+    with pytest.raises(ValidationError):
+        reserve_inventory_for_order(other, [(product.id, 30)])
+    reserve_inventory_for_order(other, [(product.id, 20)])
+
+
+@pytest.mark.django_db
+def test_consume_converts_reservation(inventory_item, product, recipe_item, order):
+    from apps.orders.services import reserve_inventory_for_order
+
+    OrderItem.objects.create(order=order, product=product, quantity=100, unit_price=1)
+    reserve_inventory_for_order(order, [(product.id, 100)])
+    consume_inventory_for_order(order)
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == Decimal("0")
+    assert not order.inventory_reservations.exists()
+
+
+@pytest.mark.django_db
+def test_release_and_expire_reservations(inventory_item, product, recipe_item, order, user_factory, company):
+    from datetime import timedelta
+    from django.core.management import call_command
+    from django.utils import timezone
+    from apps.inventory.models import InventoryReservation
+    from apps.orders.models import Order
+    from apps.orders.services import release_inventory_for_order, reserve_inventory_for_order
+
+    reserve_inventory_for_order(order, [(product.id, 10)])
+    release_inventory_for_order(order)
+    assert not InventoryReservation.objects.exists()
+
+    other = Order.objects.create(user=user_factory(), company=company, order_type="ON")
+    reserve_inventory_for_order(other, [(product.id, 10)])
+    InventoryReservation.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+    call_command("expire_inventory_holds")
+    assert not InventoryReservation.objects.exists()
+
+
+@pytest.mark.django_db
+def test_consume_inventory_query_count_fixed(company, category, order, django_assert_num_queries):
+    from apps.inventory.models import InventoryItem
+    from apps.menu.models import Product, RecipeItem
+
+    items = [InventoryItem.objects.create(company=company, name=f"Ing {i}", unit="g", quantity=100) for i in range(4)]
+    for i in range(4):
+        p = Product.objects.create(company=company, category=category, name=f"Dish {i}", price=1)
+        for inv in items:
+            RecipeItem.objects.create(product=p, inventory_item=inv, amount=1)
+        OrderItem.objects.create(order=order, product=p, quantity=2, unit_price=1)
+
+    # pozīcijas, receptes, bloķēšana, atlikums ar rezervācijām, rezervācijas, UPDATE, žurnāla INSERT (+ savepoint)
+    with django_assert_num_queries(9):
+        consume_inventory_for_order(order)
+    assert {i.quantity for i in InventoryItem.objects.filter(id__in=[x.id for x in items])} == {Decimal("92")}
@@ -0,0 +1,69 @@
+import logging
+
+import pytest
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import User
+from apps.inventory.views import InventoryListView
+from backend.middleware import QueryBudgetExceeded, QueryStats, sql_shape
+
+
+def test_sql_shape_collapses_in_lists_and_numbers():
+    a = sql_shape('SELECT "x" FROM "t" WHERE "id" IN (%s, %s) LIMIT 21')
+    b = sql_shape('SELECT "x" FROM "t" WHERE "id" IN (%s) LIMIT 1')
+    assert a == b == 'SELECT "x" FROM "t" WHERE "id" IN (...) LIMIT ?'
+
+
+def test_query_stats_reports_repeated_shapes():
+    stats = QueryStats()
+    for pk in range(6):
+        stats(lambda *args: None, 'SELECT * FROM "t" WHERE "id" = %s', (pk,), False, {})
+    stats(lambda *args: None, 'SELECT 1', (), False, {})
+    assert stats.count == 7
+    assert stats.repeated(5) == [('SELECT * FROM "t" WHERE "id" = %s', 6)]
+
+
+@pytest.mark.django_db
+def test_server_timing_header(client_api, user_factory, company, settings):
+    client_api.force_authenticate(user=user_factory(role="employee", company=company))
+    settings.DEBUG = False
+    settings.SERVER_TIMING_ENABLED = False
+    assert not client_api.get("/inventory/").has_header("Server-Timing")
+
+    settings.SERVER_TIMING_ENABLED = True
+    res = client_api.get("/inventory/")
+    assert res.status_code == 200
+    db, app = res["Server-Timing"].split(", ")
+    assert db.startswith("db;dur=") and db.endswith('queries (0 repeated)"')
+    assert app.startswith("app;dur=")
+
+
+@pytest.mark.django_db
+def test_budget_exceeded_fails_in_strict_mode_and_logs_otherwise(
+    client_api, user_factory, company, settings, monkeypatch, caplog
+):
+    monkeypatch.setattr(InventoryListView, "query_budget", 0)
+    client_api.force_authenticate(user=user_factory(role="employee", company=company))
+    with pytest.raises(QueryBudgetExceeded):
+        client_api.get("/inventory/")
+
+    settings.QUERY_BUDGET_STRICT = False
+    with caplog.at_level(logging.WARNING, logger="backend.middleware"):
+        assert client_api.get("/inventory/").status_code == 200
+    assert "query_budget 0" in caplog.text
+
+
+@pytest.mark.django_db
+def test_company_soft_delete_does_not_loop_over_users(
+    client_api, user_factory, company, django_capture_on_commit_callbacks
+):
+    admin = user_factory(role="company_admin", company=company)
+    staff = [user_factory(role="employee", company=company) for _ in range(15)]
+    client_api.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(admin)}")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        res = client_api.post("/companies/me/delete/")
+    assert res.status_code == 200, res.data
+    assert not User.objects.filter(id__in=[u.id for u in staff + [admin]]).exists()
+    assert set(User.objects.all_with_deleted().filter(company=company).values_list("token_epoch", flat=True)) == {1}
+    assert client_api.get("/accounts/me/").status_code == 401
@@ -0,0 +1,114 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.accounts.blacklist import BloomFilter, revoked_tokens
+from apps.accounts.tokens import AuthRefreshToken
+
+
+@pytest.fixture(autouse=True)
+def _reset_filter():
+    # Filtrs dzīvo visu procesu - katram testam no jauna
+    revoked_tokens.reset()
+    yield
+    revoked_tokens.reset()
+
+
+def _blacklist_queries(ctx):
+    return [q["sql"] for q in ctx.captured_queries if "token_blacklist_blacklistedtoken" in q["sql"]]
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    items = [uuid.uuid4().hex for _ in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(2000))
+    assert false_positives < 100
+
+
+@pytest.mark.django_db
+def test_refresh_skips_blacklist_query_for_unrevoked_token(client_api, user_factory, settings):
+    settings.BLACKLIST_FILTER_SYNC_SECONDS = 60
+    user = user_factory()
+    client_api.cookies["refresh_token"] = str(AuthRefreshToken.for_user(user))
+    assert client_api.post("/accounts/auth/refresh/").status_code == 200
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert client_api.post("/accounts/auth/refresh/").status_code == 200
+    assert _blacklist_queries(ctx) == []
+
+
+@pytest.mark.django_db
+def test_logged_out_refresh_token_is_rejected(client_api, user_factory, settings):
+    settings.BLACKLIST_FILTER_SYNC_SECONDS = 60
+    user = user_factory()
+    refresh = str(AuthRefreshToken.for_user(user))
+    client_api.cookies["refresh_token"] = refresh
+    assert client_api.post("/accounts/auth/refresh/").status_code == 200
+
+    client_api.cookies["refresh_token"] = refresh
+    client_api.force_authenticate(user=user)
+    assert client_api.post("/accounts/auth/logout/").status_code == 200
+    client_api.force_authenticate(user=None)
+    client_api.cookies["refresh_token"] = refresh
+    assert client_api.post("/accounts/auth/refresh/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_revocation_from_other_process_is_picked_up_on_sync(client_api, user_factory, settings):
+    settings.BLACKLIST_FILTER_SYNC_SECONDS = 0
+    user = user_factory()
+    refresh = AuthRefreshToken.for_user(user)
+    assert not revoked_tokens.might_be_revoked(refresh["jti"])
+
+    # Cits process ieraksta DB tieši (šī procesa filtrs par to nezina)
+    BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=refresh["jti"]))
+    client_api.cookies["refresh_token"] = str(refresh)
+    assert client_api.post("/accounts/auth/refresh/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_rebuild_does_not_hold_filter_lock(client_api, user_factory, settings, monkeypatch):
+    settings.BLACKLIST_FILTER_SYNC_SECONDS = 60
+    refresh = AuthRefreshToken.for_user(user_factory())
+    assert not revoked_tokens.might_be_revoked(refresh["jti"])
+
+    build = revoked_tokens._build
+    during_build = []
+
+    def checked_build():
+        # Pārbūves laikā citi pieprasījumi lieto veco filtru, nevis gaida
+        during_build.append((revoked_tokens._lock.locked(), revoked_tokens.might_be_revoked(refresh["jti"])))
+        return build()
+
+    monkeypatch.setattr(revoked_tokens, "_build", checked_build)
+    settings.BLACKLIST_FILTER_REBUILD_SECONDS = 0
+    refresh.blacklist()
+    assert revoked_tokens.might_be_revoked(refresh["jti"])
+    assert during_build == [(False, True)]
+
+
+@pytest.mark.django_db
+def test_prune_refresh_tokens_deletes_only_expired(user_factory):
+    user = user_factory()
+    now = timezone.now()
+    expired = [
+        OutstandingToken.objects.create(user=user, jti=uuid.uuid4().hex, token="x", expires_at=now - timedelta(days=1))
+        for _ in range(3)
+    ]
+    BlacklistedToken.objects.create(token=expired[0])
+    alive = OutstandingToken.objects.create(user=user, jti=uuid.uuid4().hex, token="x", expires_at=now + timedelta(days=1))
+    BlacklistedToken.objects.create(token=alive)
+
+    call_command("prune_refresh_tokens", batch_size=2)
+
+    assert list(OutstandingToken.objects.values_list("id", flat=True)) == [alive.id]
+    assert list(BlacklistedToken.objects.values_list("token_id", flat=True)) == [alive.id]
@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def _login(client_api, user):
+    res = client_api.post("/accounts/auth/login/", {"email": user.email, "password": "Pass1234!"}, format="json")
+    assert res.status_code == 200
+    return AccessToken(res.cookies["access_token"].value)
+
+
+def _db_auth_queries(ctx):
+    return [q["sql"] for q in ctx.captured_queries if "accounts_user" in q["sql"] or "companies_company" in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_access_token_claims_authenticate_without_user_queries(client_api, user_factory, company):
+    staff = user_factory(role="employee", company=company)
+    token = _login(client_api, staff)
+    assert (token["role"], token["company_id"], token["company_active"], token["epoch"]) == ("employee", company.id, True, 0)
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert client_api.get("/inventory/").status_code == 200
+    assert _db_auth_queries(ctx) == []
+
+
+@pytest.mark.django_db
+def test_company_block_revokes_tokens_until_refresh(
+    client_api, user_factory, company, django_capture_on_commit_callbacks
+):
+    staff = user_factory(role="employee", company=company)
+    _login(client_api, staff)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        company.is_blocked = True
+        company.save(update_fields=["is_blocked"])
+    staff.refresh_from_db()
+    assert staff.token_epoch == 1
+    res = client_api.get("/inventory/")
+    assert res.status_code == 401
+
+    # Refresh izsniedz tokenu ar aktuālajiem claims - uzņēmums bloķēts
+    assert client_api.post("/accounts/auth/refresh/").status_code == 200
+    assert AccessToken(client_api.cookies["access_token"].value)["company_active"] is False
+    assert client_api.get("/inventory/").status_code == 403
+
+
+@pytest.mark.django_db
+def test_role_change_revokes_token_on_db_path(client_api, user_factory, company, django_capture_on_commit_callbacks):
+    admin = user_factory(role="company_admin", company=company)
+    _login(client_api, admin)
+    assert client_api.get("/accounts/me/").status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        admin.role = "employee"
+        admin.save()
+    assert client_api.get("/accounts/me/").status_code == 401
+
+    # Saglabāšana bez piekļuves stāvokļa izmaiņām tokenus neatsauc
+    res = client_api.post("/accounts/auth/refresh/")
+    assert res.status_code == 200, res.data
+    assert client_api.get("/accounts/me/").status_code == 200
+    with django_capture_on_commit_callbacks(execute=True):
+        admin.first_name = "Anna"
+        admin.save()
+    assert client_api.get("/accounts/me/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_token_without_claims_falls_back_to_db(client_api, user_factory, company):
+    staff = user_factory(role="employee", company=company)
+    client_api.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(staff)}")
+    assert client_api.get("/inventory/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_stale_instance_save_does_not_undo_revocation(user_factory):
+    from apps.accounts.models import User
+    from apps.accounts.tokens import revoke_user_tokens
+
+    user = user_factory(role="client")
+    stale = User.objects.get(pk=user.pk)
+    assert revoke_user_tokens([user.pk]) == {user.pk: 1}
+
+    stale.first_name = "Anna"
+    stale.save()
+    user.refresh_from_db()
+    assert (user.first_name, user.token_epoch) == ("Anna", 1)